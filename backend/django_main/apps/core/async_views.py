@@ -0,0 +1,157 @@
+"""
+Async Orthanc DICOM proxy views (ASGI).
+
+Same URLs and responses as the APIView classes in views.py, but the Orthanc
+calls are awaited on a shared httpx pool instead of blocking a worker thread.
+Enabled with ASYNC_PROXY_VIEWS=True (see apps/core/urls.py) and meant to be
+served by an ASGI worker (gunicorn -k uvicorn.workers.UvicornWorker).
+
+DRF 3.14 APIViews cannot be async, so these are plain Django views that run the
+configured DRF authenticators (JWT) in a thread before awaiting Orthanc.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.core.services.orthanc_service_async import async_orthanc_service
+
+logger = logging.getLogger(__name__)
+
+
+def _authenticate_sync(request):
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except APIException:
+        return None
+    return user if user and user.is_authenticated else None
+
+
+async def _authenticate(request):
+    """IsAuthenticated equivalent: returns the user or None"""
+    return await sync_to_async(_authenticate_sync)(request)
+
+
+def _unauthorized():
+    return JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=401
+    )
+
+
+@require_GET
+async def orthanc_study(request, study_uid=None):
+    """Get study information by DICOM Study Instance UID."""
+    if await _authenticate(request) is None:
+        return _unauthorized()
+
+    study_uid = study_uid or request.GET.get('uid')
+    if not study_uid:
+        return JsonResponse({'error': 'study_uid parameter is required'}, status=400)
+
+    study = await async_orthanc_service.get_study_by_uid(study_uid)
+    if not study:
+        return JsonResponse({'error': 'Study not found'}, status=404)
+    return JsonResponse(study)
+
+
+@require_GET
+async def orthanc_series(request, series_uid=None):
+    """Get series information by DICOM Series Instance UID."""
+    if await _authenticate(request) is None:
+        return _unauthorized()
+
+    series_uid = series_uid or request.GET.get('uid')
+    if not series_uid:
+        return JsonResponse({'error': 'series_uid parameter is required'}, status=400)
+
+    series = await async_orthanc_service.get_series_by_uid(series_uid)
+    if not series:
+        return JsonResponse({'error': 'Series not found'}, status=404)
+    return JsonResponse(series)
+
+
+@require_GET
+async def orthanc_instance_preview(request, instance_id):
+    """Get preview image (JPEG) for a DICOM instance."""
+    if await _authenticate(request) is None:
+        return _unauthorized()
+
+    try:
+        quality = int(request.GET.get('quality', 90))
+    except ValueError:
+        return JsonResponse({'error': 'quality must be an integer'}, status=400)
+
+    image_data = await async_orthanc_service.get_instance_preview(instance_id, quality)
+    if not image_data:
+        return JsonResponse({'error': 'Failed to get preview image'}, status=404)
+    return HttpResponse(image_data, content_type='image/jpeg')
+
+
+@require_GET
+async def orthanc_instance_file(request, instance_id):
+    """Download DICOM file (streamed from Orthanc without buffering the whole file)."""
+    if await _authenticate(request) is None:
+        return _unauthorized()
+
+    upstream = await async_orthanc_service.open_instance_file(instance_id)
+    if upstream is None:
+        return JsonResponse({'error': 'Failed to download DICOM file'}, status=404)
+
+    response = StreamingHttpResponse(
+        async_orthanc_service.iter_instance_file(upstream),
+        content_type='application/dicom'
+    )
+    if upstream.headers.get('Content-Length'):
+        response['Content-Length'] = upstream.headers['Content-Length']
+    response['Content-Disposition'] = f'attachment; filename="instance_{instance_id}.dcm"'
+    return response
+
+
+def _patient_for_user_sync(user, patient_id):
+    """Patient lookup + the same access rule as OrthancPatientStudiesView"""
+    from apps.core.views import OrthancPatientStudiesView
+    from apps.emr.models import Patient
+
+    try:
+        patient = Patient.objects.select_related('doctor').get(id=patient_id)
+    except Patient.DoesNotExist:
+        return None, 404
+    if not OrthancPatientStudiesView()._can_access_patient_data(user, patient):
+        return None, 403
+    return patient, 200
+
+
+@require_GET
+async def orthanc_patient_studies(request, patient_id):
+    """Get all DICOM studies for a patient (study details fetched concurrently)."""
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+
+    patient, code = await sync_to_async(_patient_for_user_sync)(user, patient_id)
+    if code == 404:
+        return JsonResponse({'error': 'Patient not found'}, status=404)
+    if code == 403:
+        return JsonResponse(
+            {'error': 'Permission denied. You do not have access to this patient\'s medical imaging data.'},
+            status=403
+        )
+
+    study_ids = await async_orthanc_service.get_patient_studies(patient.pid)
+    if not study_ids:
+        return JsonResponse({'studies': []})
+
+    studies = await asyncio.gather(*[
+        async_orthanc_service.get_study(study_id) for study_id in study_ids
+    ])
+    return JsonResponse({'studies': [study for study in studies if study]})
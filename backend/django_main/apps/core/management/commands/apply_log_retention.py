@@ -0,0 +1,48 @@
+"""
+Management command to apply the log retention policies (settings.LOG_RETENTION_POLICIES).
+
+Run it periodically (e.g. nightly cron). Expired rows are archived to compressed
+day-partitioned files and/or deleted in small batches, so it is safe to run while
+the application is serving traffic.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.services.retention import apply_retention, archive_summary
+
+
+class Command(BaseCommand):
+    help = 'Archive / delete expired rows of high-volume log tables in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models',
+                            help='Policy label (e.g. core.APIUsageLog). Repeatable, default: all policies')
+        parser.add_argument('--dry-run', action='store_true', help='Only count expired rows')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop each policy after N batches (spread a large backlog over several runs)')
+        parser.add_argument('--summary', action='store_true', help='Print the archive summary and exit')
+
+    def handle(self, *args, **options):
+        if options['summary']:
+            self.stdout.write(json.dumps(archive_summary(), indent=2, ensure_ascii=False))
+            return
+
+        try:
+            results = apply_retention(
+                options['models'], dry_run=options['dry_run'], max_batches=options['max_batches']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for result in results:
+            if result['status'] == 'skipped':
+                self.stdout.write(self.style.WARNING(f"{result['model']}: skipped ({result['reason']})"))
+            elif options['dry_run']:
+                self.stdout.write(f"{result['model']}: {result['eligible']} rows older than {result['cutoff']}")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{result['model']}: {result['action']} {result['deleted']} rows "
+                    f"({result['batches']} batches, {result['archived_files']} archive files, "
+                    f"{result['elapsed_s']}s)"
+                ))
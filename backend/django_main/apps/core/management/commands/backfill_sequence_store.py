@@ -0,0 +1,96 @@
+"""
+Management command to move inline sequences of existing rows into the sequence store.
+
+Rows written before the content-addressed store existed still carry the full
+sequence text (InferenceLog.input_data["sequence"], AntigenAnalysisResult.input_sequence).
+This pages through them by primary key, interns the sequences and rewrites the rows
+to reference StoredSequence. Safe to re-run: already converted rows are skipped.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.core.services.sequence_store import intern_sequences, payload_sequences, store_report
+from apps.custom.models import AntigenAnalysisResult
+from apps.ml_proxy.models import InferenceLog, dedupe_log_sequences
+
+
+class Command(BaseCommand):
+    help = 'Backfill the content-addressed sequence store from existing InferenceLog / AntigenAnalysisResult rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=['all', 'inference_log', 'antigen'], default='all')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--start-id', type=int, default=0, help='Resume after this primary key')
+        parser.add_argument('--dry-run', action='store_true', help='Only count rows that would be converted')
+        parser.add_argument('--report-only', action='store_true', help='Print the store report and exit')
+
+    def handle(self, *args, **options):
+        if not options['report_only']:
+            if options['model'] in ('all', 'inference_log'):
+                self._backfill_inference_logs(options)
+            if options['model'] in ('all', 'antigen'):
+                self._backfill_antigen_results(options)
+
+        self.stdout.write(json.dumps(store_report(), indent=2, ensure_ascii=False))
+
+    def _backfill_inference_logs(self, options):
+        last_id = options['start_id']
+        scanned = converted = 0
+        while True:
+            batch = list(
+                InferenceLog.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .only('id', 'input_data', 'sequence')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            scanned += len(batch)
+
+            pending = [log for log in batch if payload_sequences(log.input_data)]
+            converted += len(pending)
+            if pending and not options['dry_run']:
+                with transaction.atomic():
+                    dedupe_log_sequences(pending)
+                    InferenceLog.objects.bulk_update(pending, ['input_data', 'sequence'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"InferenceLog: scanned {scanned}, "
+            f"{'would convert' if options['dry_run'] else 'converted'} {converted} (last id {last_id})"
+        ))
+
+    def _backfill_antigen_results(self, options):
+        last_id = options['start_id']
+        converted = 0
+        while True:
+            batch = list(
+                AntigenAnalysisResult.objects.filter(pk__gt=last_id)
+                .exclude(input_sequence='')
+                .order_by('pk')
+                .only('id', 'input_sequence', 'sequence')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            converted += len(batch)
+            if options['dry_run']:
+                continue
+
+            with transaction.atomic():
+                stored = intern_sequences([result.input_sequence for result in batch])
+                updated = []
+                for result in batch:
+                    sequence = stored.get(result.input_sequence)
+                    if sequence is None:
+                        continue
+                    result.sequence = sequence
+                    result.input_sequence = ''
+                    updated.append(result)
+                AntigenAnalysisResult.objects.bulk_update(updated, ['sequence', 'input_sequence'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"AntigenAnalysisResult: "
+            f"{'would convert' if options['dry_run'] else 'converted'} {converted} (last id {last_id})"
+        ))
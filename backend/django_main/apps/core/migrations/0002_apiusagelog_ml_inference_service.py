@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apiusagelog',
+            name='service',
+            field=models.CharField(choices=[('drugbank', 'DrugBank'), ('alphafold', 'AlphaFold'), ('pubchem', 'PubChem'), ('rcsb_pdb', 'RCSB PDB'), ('firebase', 'Firebase FCM'), ('ml_inference', 'ML Inference (Flask)')], db_index=True, help_text='외부 API 서비스 이름', max_length=50),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-19 14:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_apiusagelog_ml_inference_service"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredSequence",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("digest", models.CharField(help_text="정규화한 서열의 sha256 (hex)", max_length=64, unique=True)),
+                ("seq_type", models.CharField(default="unknown", help_text="dna / rna / protein / unknown", max_length=10)),
+                ("length", models.PositiveIntegerField(help_text="정규화한 서열 길이 (문자 수)")),
+                ("compressed", models.BinaryField(help_text="zlib 압축한 정규화 서열")),
+                ("stored_size", models.PositiveIntegerField(help_text="압축 후 크기 (bytes)")),
+                ("hit_count", models.PositiveIntegerField(default=0, help_text="이 서열을 참조하도록 저장된 횟수 (중복 제거율 집계용)")),
+                ("first_seen_at", models.DateTimeField(default=django.utils.timezone.now, help_text="처음 저장된 시각")),
+                ("last_seen_at", models.DateTimeField(default=django.utils.timezone.now, help_text="마지막으로 참조된 시각")),
+            ],
+            options={
+                "verbose_name": "서열 저장소",
+                "verbose_name_plural": "서열 저장소",
+                "db_table": "core_stored_sequence",
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0 on 2026-10-19 16:40
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_normalized_digest(apps, schema_editor):
+    # 원문 보존 이전 행은 정규화한 서열을 저장했으므로 digest 가 곧 정규화 digest
+    StoredSequence = apps.get_model("core", "StoredSequence")
+    StoredSequence.objects.filter(normalized_digest="").update(normalized_digest=F("digest"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_storedsequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="storedsequence",
+            name="normalized_digest",
+            field=models.CharField(db_index=True, default="", help_text="정규화한 서열의 sha256 (hex), 표기만 다른 같은 서열 조회용", max_length=64),
+        ),
+        migrations.AlterField(
+            model_name="storedsequence",
+            name="compressed",
+            field=models.BinaryField(help_text="zlib 압축한 입력 원문 서열"),
+        ),
+        migrations.AlterField(
+            model_name="storedsequence",
+            name="digest",
+            field=models.CharField(help_text="입력 원문 서열의 sha256 (hex)", max_length=64, unique=True),
+        ),
+        migrations.RunPython(fill_normalized_digest, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@ from django.db import models
 from django.utils import timezone
 from typing import Optional
 import logging
+import zlib
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +109,7 @@ class APIUsageLog(models.Model):
         ('pubchem', 'PubChem'),
         ('rcsb_pdb', 'RCSB PDB'),
         ('firebase', 'Firebase FCM'),
+        ('ml_inference', 'ML Inference (Flask)'),
     ]
 
     user = models.ForeignKey(
@@ -178,3 +180,71 @@ class APIUsageLog(models.Model):
         status = f"{self.status_code}" if self.status_code else "pending"
         cached_str = " (cached)" if self.cached else ""
         return f"{self.service} - {self.endpoint} [{status}]{cached_str}"
+
+
+class StoredSequence(models.Model):
+    """
+    Content-addressed 서열 저장소
+    입력 원문(FASTA 헤더 / 개행 / 대소문자 포함)의 sha256 을 key 로 1번만 (zlib 압축) 저장하고
+    InferenceLog / AntigenAnalysisResult 는 FK (또는 payload 의 sequence_ref) 로 참조합니다.
+    → 감사 로그 / 재생 때 요청 원문을 그대로 복원
+    normalized_digest 조회로 표기만 다른 같은 서열까지 "이전에 분석한 서열인지" 확인할 수 있습니다.
+    """
+
+    digest = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="입력 원문 서열의 sha256 (hex)"
+    )
+
+    normalized_digest = models.CharField(
+        max_length=64,
+        db_index=True,
+        default='',
+        help_text="정규화한 서열의 sha256 (hex), 표기만 다른 같은 서열 조회용"
+    )
+
+    seq_type = models.CharField(
+        max_length=10,
+        default='unknown',
+        help_text="dna / rna / protein / unknown"
+    )
+
+    length = models.PositiveIntegerField(
+        help_text="정규화한 서열 길이 (문자 수)"
+    )
+
+    compressed = models.BinaryField(
+        help_text="zlib 압축한 입력 원문 서열"
+    )
+
+    stored_size = models.PositiveIntegerField(
+        help_text="압축 후 크기 (bytes)"
+    )
+
+    hit_count = models.PositiveIntegerField(
+        default=0,
+        help_text="이 서열을 참조하도록 저장된 횟수 (중복 제거율 집계용)"
+    )
+
+    first_seen_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="처음 저장된 시각"
+    )
+
+    last_seen_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="마지막으로 참조된 시각"
+    )
+
+    class Meta:
+        db_table = 'core_stored_sequence'
+        verbose_name = '서열 저장소'
+        verbose_name_plural = '서열 저장소'
+
+    def __str__(self):
+        return f"{self.seq_type}:{self.digest[:12]} ({self.length} chars, x{self.hit_count})"
+
+    @property
+    def text(self) -> str:
+        return zlib.decompress(bytes(self.compressed)).decode('utf-8')
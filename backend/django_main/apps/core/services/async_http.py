@@ -0,0 +1,37 @@
+"""
+ASGI 용 httpx.AsyncClient 관리
+
+httpx.AsyncClient 는 만들어진 event loop 에 묶이므로 loop 별로 1개씩 만들어 재사용합니다.
+uvicorn worker 는 프로세스당 loop 가 1개 → 프로세스 전체가 커넥션 풀 1개를 공유.
+(WSGI 에서 async view 를 호출하면 요청마다 loop 가 새로 생기므로 풀 재사용 효과가 없음)
+"""
+import asyncio
+import threading
+import weakref
+
+import httpx
+
+
+class LoopBoundClient:
+    """event loop 별 httpx.AsyncClient (factory 로 생성)"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._clients = weakref.WeakKeyDictionary()
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._clients.get(loop)
+                if client is None or client.is_closed:
+                    client = self._factory()
+                    self._clients[loop] = client
+        return client
+
+    async def aclose(self):
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
@@ -0,0 +1,507 @@
+"""
+Flask ML 추론 서버 호출 클라이언트 (Django → Flask)
+
+- 프로세스당 requests.Session 1개를 공유 → keep-alive / 커넥션 풀 재사용
+- 엔드포인트별 (connect, read) timeout
+- 멱등 요청(GET / HEAD / DELETE)만 제한된 횟수로 재시도
+  (POST 는 연결 자체가 실패한 경우에만 재시도 — 요청이 전송되지 않았으므로 안전)
+- 호출별 지연 / 오류를 APIUsageLog(service='ml_inference') 에 기록
+  → 관리자 성능 대시보드의 service_usage 에 그대로 집계됨
+
+여러 Flask replica (FLASK_INFERENCE_URLS=http://a:9000,http://b:9000):
+- power-of-two-choices: 사용 가능한 replica 2개를 무작위로 골라 진행 중 요청이 적은 쪽으로 보냄
+- background probe 가 주기적으로 /ready 를 확인 → warm-up / 재로딩 중인 replica 는 제외
+- 연결 실패 / timeout 이 난 replica 는 즉시 제외(eject)하고, probe 가 다시 ready 를 확인하면 복귀
+- 멱등 요청과 추론 요청(부작용 없음)은 다른 replica 로 failover
+"""
+
+import os
+import logging
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+
+from ..models import APIUsageLog
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'ml_inference'
+
+# 엔드포인트별 read timeout (초). ML_GATEWAY_TIMEOUT_<이름 대문자> 로 덮어쓸 수 있음
+DEFAULT_READ_TIMEOUTS = {
+    'ready': 2,
+    'health': 5,
+    'status': 10,
+    'schema': 10,
+    'example_data': 10,
+    'predict': 60,
+    'predict_stream': 60,   # 스트리밍은 줄 사이 최대 대기 시간
+    'predict_person': 60,
+    'explain': 120,         # backward 포함이라 추론보다 오래 걸림
+    'reload_model': 300,    # 재학습은 시간이 오래 걸릴 수 있음
+    'jobs': 30,
+    'job_detail': 10,
+}
+DEFAULT_READ_TIMEOUT = 30
+
+# 폴링성 호출은 사용 로그에 남기지 않음 (몇 초마다 호출되어 통계를 왜곡)
+UNLOGGED_ENDPOINTS = {'ready'}
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'DELETE'})
+
+# POST 지만 Flask 쪽에 상태를 남기지 않는 추론 요청 → 다른 replica 로 다시 보내도 안전
+IDEMPOTENT_POST_ENDPOINTS = frozenset({'predict', 'predict_stream', 'predict_person', 'explain'})
+
+
+def _env_float(key, default):
+    try:
+        return float(os.getenv(key, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+def _env_int(key, default):
+    try:
+        return int(os.getenv(key, default))
+    except (TypeError, ValueError):
+        return int(default)
+
+
+def _env_urls():
+    urls = os.getenv('FLASK_INFERENCE_URLS', '')
+    if not urls.strip():
+        urls = os.getenv('FLASK_INFERENCE_URL', 'http://127.0.0.1:9000')
+    return [u.strip() for u in urls.split(',') if u.strip()]
+
+
+def _request_not_sent(exc) -> bool:
+    """연결 단계에서 실패해 요청이 Flask 에 도달하지 않은 경우"""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+class Replica:
+    """Flask replica 1개의 라우팅 상태 (MLGatewayClient._lock 으로 보호)"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        self.healthy = True       # probe 전에는 정상으로 가정
+        self.ready = True
+        self.draining = False     # 재로딩 중 → 새 요청을 보내지 않음
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.failures = 0
+        self.last_error = ''
+        self.last_probe = None
+
+    def available(self, now: float) -> bool:
+        return self.healthy and self.ready and not self.draining and self.ejected_until <= now
+
+    def state(self, now: float) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'available': self.available(now),
+            'healthy': self.healthy,
+            'ready': self.ready,
+            'draining': self.draining,
+            'ejected': self.ejected_until > now,
+            'ejections': self.ejections,
+            'outstanding': self.outstanding,
+            'last_error': self.last_error,
+            'last_probe': self.last_probe,
+        }
+
+
+class MLGatewayClient:
+    """Flask ML 서버 공용 HTTP 클라이언트 (thread-safe, 프로세스당 커넥션 풀 1개)"""
+
+    def __init__(
+        self,
+        base_urls: Optional[List[str]] = None,
+        api_key: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        probe_interval: Optional[float] = None,
+        eject_seconds: Optional[float] = None,
+    ):
+        if isinstance(base_urls, str):
+            base_urls = [u for u in base_urls.split(',') if u.strip()]
+        self.replicas = [Replica(url) for url in (base_urls or _env_urls())]
+        self.api_key = api_key if api_key is not None else os.getenv('FLASK_API_KEY', '')
+        self.pool_size = pool_size or _env_int('ML_GATEWAY_POOL_SIZE', 20)
+        self.max_retries = (
+            max_retries if max_retries is not None else _env_int('ML_GATEWAY_MAX_RETRIES', 2)
+        )
+        self.connect_timeout = connect_timeout or _env_float('ML_GATEWAY_CONNECT_TIMEOUT', 3)
+        self.probe_interval = (
+            probe_interval if probe_interval is not None
+            else _env_float('ML_GATEWAY_PROBE_INTERVAL', 5)
+        )
+        self.eject_seconds = (
+            eject_seconds if eject_seconds is not None
+            else _env_float('ML_GATEWAY_EJECT_SECONDS', 30)
+        )
+
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self._session = None
+        self._session_pid = None
+        self._prober = None
+        self._prober_pid = None
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def base_url(self) -> str:
+        return self.replicas[0].url
+
+    # ---------------------------------------------------------------- session
+
+    def _build_session(self) -> requests.Session:
+        # replica 가 여럿이면 연결 실패는 같은 host 재시도 대신 다른 replica 로 failover
+        connect_retries = 0 if len(self.replicas) > 1 else self.max_retries
+        retry = Retry(
+            total=self.max_retries,
+            connect=connect_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            allowed_methods=IDEMPOTENT_METHODS,
+            status_forcelist=(502, 504),
+            backoff_factor=0.1,
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=len(self.replicas),
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if self.api_key:
+            session.headers['X-API-Key'] = self.api_key
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        # gunicorn 등에서 fork 된 worker 가 부모의 소켓을 공유하지 않도록 pid 별로 생성
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    def timeout_for(self, endpoint: str):
+        read = _env_float(
+            f'ML_GATEWAY_TIMEOUT_{endpoint.upper()}',
+            DEFAULT_READ_TIMEOUTS.get(endpoint, DEFAULT_READ_TIMEOUT),
+        )
+        return (self.connect_timeout, read)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    # ---------------------------------------------------------------- 라우팅
+
+    def _find(self, url: Optional[str]) -> Optional[Replica]:
+        if not url:
+            return None
+        url = url.rstrip('/')
+        for replica in self.replicas:
+            if replica.url == url:
+                return replica
+        return None
+
+    def _acquire(self, exclude, pinned: Optional[Replica] = None) -> Optional[Replica]:
+        """power-of-two-choices 로 replica 선택 후 outstanding 증가"""
+        now = time.monotonic()
+        with self._lock:
+            if pinned is not None:
+                chosen = pinned
+            else:
+                remaining = [r for r in self.replicas if r not in exclude]
+                candidates = [r for r in remaining if r.available(now)]
+                if not candidates:
+                    # 전부 not-ready / 제외 상태면 eject 되지 않은 replica 라도 시도
+                    candidates = [
+                        r for r in remaining if r.ejected_until <= now and not r.draining
+                    ] or remaining
+                if not candidates:
+                    return None
+                if len(candidates) == 1:
+                    chosen = candidates[0]
+                else:
+                    a, b = self._rng.sample(candidates, 2)
+                    chosen = a if a.outstanding <= b.outstanding else b
+            chosen.outstanding += 1
+            return chosen
+
+    def _release(self, replica: Replica, error: Optional[str] = None, eject: bool = False):
+        """
+        outstanding 감소. error 는 예외 이름,
+        eject=True (연결 실패 / timeout) 면 eject_seconds 동안 라우팅에서 제외
+        """
+        with self._lock:
+            replica.outstanding = max(0, replica.outstanding - 1)
+            if error is None:
+                replica.failures = 0
+                return
+            replica.failures += 1
+            replica.last_error = error
+            if eject:
+                replica.ejected_until = time.monotonic() + self.eject_seconds
+                replica.ejections += 1
+        if eject:
+            logger.warning(f"ML replica ejected: {replica.url} ({error})")
+
+    # ---------------------------------------------------------------- probe
+
+    def probe(self, replica: Replica):
+        """replica /ready 확인 → healthy / ready 갱신, 정상이면 eject 해제"""
+        try:
+            response = self.session.get(
+                f"{replica.url}/ready",
+                timeout=(self.connect_timeout, DEFAULT_READ_TIMEOUTS['ready']),
+            )
+            healthy = True
+            # /ready 가 없는 이전 버전 Flask 서버는 살아있으면 ready 로 간주
+            ready = response.status_code in (200, 404)
+            error = '' if ready else f"HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            healthy, ready, error = False, False, type(e).__name__
+
+        with self._lock:
+            replica.healthy = healthy
+            replica.ready = ready
+            replica.last_probe = time.time()
+            if error:
+                replica.last_error = error
+            if healthy and ready and replica.ejected_until:
+                replica.ejected_until = 0.0
+                replica.failures = 0
+                logger.info(f"ML replica restored: {replica.url}")
+
+    def probe_all(self):
+        for replica in self.replicas:
+            self.probe(replica)
+
+    def _probe_loop(self):
+        while True:
+            try:
+                self.probe_all()
+            except Exception as e:
+                logger.error(f"ML replica probe failed: {e}")
+            time.sleep(self.probe_interval)
+
+    def _ensure_prober(self):
+        if self.probe_interval <= 0:
+            return
+        pid = os.getpid()
+        if self._prober is not None and self._prober_pid == pid and self._prober.is_alive():
+            return
+        with self._lock:
+            if self._prober is not None and self._prober_pid == pid and self._prober.is_alive():
+                return
+            self._prober = threading.Thread(
+                target=self._probe_loop, name='ml-gateway-probe', daemon=True
+            )
+            self._prober_pid = pid
+            self._prober.start()
+
+    # ---------------------------------------------------------------- 요청
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        path: str,
+        timeout=None,
+        user=None,
+        replica: Optional[str] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Flask 로 요청을 보내고 응답을 그대로 반환합니다.
+        연결 실패 / timeout 은 requests 예외를 그대로 올립니다 (기록 후).
+        응답의 ml_replica 속성에 실제로 처리한 replica URL 이 들어갑니다.
+
+        Args:
+            endpoint: 메트릭 / timeout 구분용 이름 (DEFAULT_READ_TIMEOUTS 키)
+            path: Flask 경로 (예: '/api/predict')
+            replica: 특정 replica 로 고정 (비동기 작업 조회 등). 모르는 URL 이면 무시
+        """
+        self._ensure_prober()
+        method = method.upper()
+        pinned = self._find(replica)
+        can_failover = (
+            pinned is None
+            and (method in IDEMPOTENT_METHODS or endpoint in IDEMPOTENT_POST_ENDPOINTS)
+        )
+        timeout = timeout or self.timeout_for(endpoint)
+
+        tried = []
+        last_error = None
+        for _ in range(1 if pinned else len(self.replicas)):
+            target = self._acquire(tried, pinned)
+            if target is None:
+                break
+            tried.append(target)
+
+            started = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method, f"{target.url}{path}", timeout=timeout, **kwargs
+                )
+            except requests.exceptions.RequestException as e:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._release(
+                    target,
+                    type(e).__name__,
+                    eject=isinstance(
+                        e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                    ),
+                )
+                self._record(endpoint, path, method, None, elapsed_ms, type(e).__name__, user)
+                last_error = e
+                if can_failover or _request_not_sent(e):
+                    continue
+                raise
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            error = '' if response.status_code < 400 else f"HTTP {response.status_code}"
+            self._record(endpoint, path, method, response.status_code, elapsed_ms, error, user)
+            response.ml_replica = target.url
+            if kwargs.get('stream'):
+                # 스트리밍은 본문을 다 흘려보낼 때까지 진행 중 요청으로 계산
+                self._release_on_close(response, target)
+            else:
+                self._release(target)
+            return response
+
+        if last_error is None:
+            raise requests.exceptions.ConnectionError("No ML inference replica configured")
+        raise last_error
+
+    def _release_on_close(self, response, replica: Replica):
+        close = response.close
+        released = []
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    self._release(replica)
+
+        response.close = close_and_release
+
+    def get(self, endpoint: str, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', endpoint, path, **kwargs)
+
+    def post(self, endpoint: str, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', endpoint, path, **kwargs)
+
+    def broadcast(self, method: str, endpoint: str, path: str, **kwargs) -> List[Dict[str, Any]]:
+        """
+        모든 replica 에 하나씩 순서대로 요청 (모델 재로딩 등)
+        진행 중인 replica 는 draining 으로 표시해 새 요청을 받지 않게 하므로
+        나머지 replica 가 계속 트래픽을 처리합니다.
+
+        Returns:
+            [{'replica': url, 'response': Response 또는 None, 'error': 예외 또는 None}, ...]
+        """
+        results = []
+        for target in self.replicas:
+            with self._lock:
+                target.draining = True
+            try:
+                response = self.request(method, endpoint, path, replica=target.url, **kwargs)
+                results.append({'replica': target.url, 'response': response, 'error': None})
+            except requests.exceptions.RequestException as e:
+                results.append({'replica': target.url, 'response': None, 'error': e})
+            finally:
+                with self._lock:
+                    target.draining = False
+        return results
+
+    # ---------------------------------------------------------------- 메트릭
+
+    def _record(self, endpoint, path, method, status_code, elapsed_ms, error, user):
+        log = self._usage_log(endpoint, path, method, status_code, elapsed_ms, error, user)
+        if log is None:
+            return
+        try:
+            log.save()
+        except Exception as e:
+            logger.error(f"Failed to log ML gateway usage: {e}")
+
+    def _usage_log(self, endpoint, path, method, status_code, elapsed_ms, error, user):
+        """
+        프로세스 메트릭 갱신 + 저장하지 않은 APIUsageLog 반환 (기록하지 않는 엔드포인트면 None)
+        async gateway 는 이 객체를 write-behind 버퍼에 넣음
+        """
+        with self._lock:
+            stats = self._metrics.setdefault(endpoint, {
+                'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            })
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if error:
+                stats['errors'] += 1
+
+        if endpoint in UNLOGGED_ENDPOINTS:
+            return None
+        return APIUsageLog(
+            user=user if getattr(user, 'is_authenticated', False) else None,
+            service=SERVICE_NAME,
+            endpoint=path,
+            method=method,
+            status_code=status_code,
+            response_time_ms=int(elapsed_ms),
+            error_message=error,
+        )
+
+    def replica_states(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [replica.state(now) for replica in self.replicas]
+
+    def metrics(self) -> Dict[str, Any]:
+        """현재 프로세스의 엔드포인트별 호출 통계 + replica 상태"""
+        with self._lock:
+            endpoints = {
+                name: {
+                    'count': s['count'],
+                    'errors': s['errors'],
+                    'avg_ms': round(s['total_ms'] / s['count'], 2) if s['count'] else 0,
+                    'max_ms': round(s['max_ms'], 2),
+                }
+                for name, s in self._metrics.items()
+            }
+        return {
+            'base_url': self.base_url,
+            'pid': os.getpid(),
+            'pool_size': self.pool_size,
+            'max_retries': self.max_retries,
+            'replicas': self.replica_states(),
+            'endpoints': endpoints,
+        }
+
+
+# 싱글톤 인스턴스
+ml_gateway = MLGatewayClient()
@@ -0,0 +1,153 @@
+"""
+Flask ML 추론 서버 async 클라이언트 (ASGI async view 용)
+
+라우팅 상태(replica 목록, outstanding, eject, probe)와 메트릭은 동기 ml_gateway 와 공유하고,
+전송만 httpx.AsyncClient (event loop 당 커넥션 풀 1개) 로 합니다.
+→ worker 1개가 느린 추론 요청 수백 개를 동시에 기다릴 수 있음
+
+호출별 APIUsageLog 는 INSERT 하지 않고 write-behind 버퍼(usage_log_buffer)에 넣음
+(sync_to_async 공유 thread 에서 호출마다 DB 쓰기를 하면 동시 요청이 DB 쓰기 1건씩 줄을 섬)
+"""
+import logging
+import time
+from typing import Optional
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from .async_http import LoopBoundClient
+from .ml_gateway import (
+    IDEMPOTENT_METHODS,
+    IDEMPOTENT_POST_ENDPOINTS,
+    MLGatewayClient,
+    ml_gateway,
+)
+from .usage_log_buffer import usage_log_buffer
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMLGatewayClient:
+    """MLGatewayClient 의 라우팅을 그대로 쓰는 async 버전"""
+
+    def __init__(self, gateway: MLGatewayClient):
+        self.gateway = gateway
+        self._clients = LoopBoundClient(self._build_client)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        gateway = self.gateway
+        headers = {'X-API-Key': gateway.api_key} if gateway.api_key else {}
+        return httpx.AsyncClient(
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=None,  # 동시 요청 수는 Flask admission control 이 제한
+                max_keepalive_connections=gateway.pool_size,
+            ),
+            # 연결 실패만 재시도 (요청이 전송되지 않았으므로 POST 도 안전)
+            transport=httpx.AsyncHTTPTransport(retries=gateway.max_retries),
+        )
+
+    def _timeout(self, endpoint: str, timeout=None) -> httpx.Timeout:
+        if timeout is None:
+            timeout = self.gateway.timeout_for(endpoint)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        path: str,
+        timeout=None,
+        user=None,
+        replica: Optional[str] = None,
+        stream: bool = False,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        MLGatewayClient.request 와 같은 규칙으로 replica 를 골라 전송합니다.
+        stream=True 면 본문을 읽지 않은 응답을 반환하므로 반드시 aclose(response) 를 호출해야 합니다.
+        """
+        gateway = self.gateway
+        gateway._ensure_prober()
+        method = method.upper()
+        pinned = gateway._find(replica)
+        can_failover = (
+            pinned is None
+            and (method in IDEMPOTENT_METHODS or endpoint in IDEMPOTENT_POST_ENDPOINTS)
+        )
+        client = self._clients.get()
+        timeout = self._timeout(endpoint, timeout)
+
+        tried = []
+        last_error = None
+        for _ in range(1 if pinned else len(gateway.replicas)):
+            target = gateway._acquire(tried, pinned)
+            if target is None:
+                break
+            tried.append(target)
+
+            started = time.perf_counter()
+            try:
+                req = client.build_request(
+                    method, f"{target.url}{path}", timeout=timeout, **kwargs
+                )
+                response = await client.send(req, stream=stream)
+            except httpx.HTTPError as e:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                eject = isinstance(e, (httpx.TimeoutException, httpx.NetworkError))
+                gateway._release(target, type(e).__name__, eject=eject)
+                await self._record(
+                    endpoint, path, method, None, elapsed_ms, type(e).__name__, user
+                )
+                last_error = e
+                if can_failover or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                    continue
+                raise
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            error = '' if response.status_code < 400 else f"HTTP {response.status_code}"
+            await self._record(
+                endpoint, path, method, response.status_code, elapsed_ms, error, user
+            )
+            response.extensions['ml_replica'] = target.url
+            if stream:
+                # 스트리밍은 본문을 다 흘려보낼 때까지 진행 중 요청으로 계산
+                response.extensions['ml_release'] = lambda r=target: gateway._release(r)
+            else:
+                gateway._release(target)
+            return response
+
+        if last_error is None:
+            raise httpx.ConnectError("No ML inference replica configured")
+        raise last_error
+
+    async def _record(self, *args):
+        """메트릭 갱신 + APIUsageLog 를 버퍼에 적재 (버퍼를 못 쓰면 공유 thread 밖에서 저장)"""
+        log = self.gateway._usage_log(*args)
+        if log is None or usage_log_buffer.put(log):
+            return
+        try:
+            await sync_to_async(log.save, thread_sensitive=False)()
+        except Exception as e:
+            logger.error(f"Failed to log ML gateway usage: {e}")
+
+    async def aclose(self, response: httpx.Response):
+        try:
+            await response.aclose()
+        finally:
+            release = response.extensions.pop('ml_release', None)
+            if release is not None:
+                release()
+
+    async def get(self, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', endpoint, path, **kwargs)
+
+    async def post(self, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', endpoint, path, **kwargs)
+
+
+# 싱글톤 인스턴스 (동기 ml_gateway 와 replica 상태 공유)
+async_ml_gateway = AsyncMLGatewayClient(ml_gateway)
@@ -0,0 +1,147 @@
+"""
+Orthanc DICOM Server async client (for ASGI async views).
+Same endpoints as OrthancService, sent through a shared httpx.AsyncClient pool.
+"""
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+from django.conf import settings
+
+from .async_http import LoopBoundClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOrthancService:
+    """
+    Async counterpart of OrthancService.
+    One connection pool per event loop (i.e. per uvicorn worker).
+    """
+
+    def __init__(self):
+        self.base_url = settings.ORTHANC_URL
+        self._clients = LoopBoundClient(self._build_client)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=httpx.BasicAuth(settings.ORTHANC_USERNAME, settings.ORTHANC_PASSWORD),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=20),
+            transport=httpx.AsyncHTTPTransport(retries=1),
+        )
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> Optional[Any]:
+        """
+        Make HTTP request to Orthanc API with error handling.
+
+        Returns:
+            JSON response or None if error
+        """
+        try:
+            response = await self._clients.get().request(method, endpoint, **kwargs)
+            response.raise_for_status()
+
+            # Some endpoints return empty response
+            if response.status_code == 204 or not response.content:
+                return {}
+
+            return response.json()
+
+        except httpx.HTTPError as e:
+            logger.error(f"Orthanc API error ({method} {endpoint}): {e}")
+            return None
+
+    async def _find_one(self, level: str, query: Dict[str, str]) -> Optional[str]:
+        result = await self._make_request('POST', '/tools/find', json={
+            'Level': level,
+            'Query': query
+        })
+        if result and len(result) > 0:
+            return result[0]
+        return None
+
+    # ==================== Studies / Series ====================
+
+    async def get_study(self, study_id: str) -> Optional[Dict[str, Any]]:
+        return await self._make_request('GET', f'/studies/{study_id}')
+
+    async def get_patient_studies(self, patient_id: str) -> list:
+        result = await self._make_request('POST', '/tools/find', json={
+            'Level': 'Study',
+            'Query': {'PatientID': patient_id}
+        })
+        return result if result else []
+
+    async def get_study_by_uid(self, study_uid: str) -> Optional[Dict[str, Any]]:
+        study_id = await self._find_one('Study', {'StudyInstanceUID': study_uid})
+        if study_id is None:
+            return None
+        return await self.get_study(study_id)
+
+    async def get_series_by_uid(self, series_uid: str) -> Optional[Dict[str, Any]]:
+        series_id = await self._find_one('Series', {'SeriesInstanceUID': series_uid})
+        if series_id is None:
+            return None
+        return await self._make_request('GET', f'/series/{series_id}')
+
+    # ==================== Instances ====================
+
+    async def get_instance_preview(
+        self,
+        instance_id: str,
+        quality: int = 90
+    ) -> Optional[bytes]:
+        """
+        Get preview image (JPEG) of an instance.
+        """
+        try:
+            response = await self._clients.get().get(
+                f'/instances/{instance_id}/preview',
+                params={'quality': quality}
+            )
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get preview image: {e}")
+            return None
+
+    async def open_instance_file(self, instance_id: str) -> Optional[httpx.Response]:
+        """
+        Open a streamed DICOM file download.
+        The caller iterates iter_instance_file() and the response is closed at the end.
+
+        Returns:
+            Streaming response or None if error
+        """
+        client = self._clients.get()
+        try:
+            response = await client.send(
+                client.build_request('GET', f'/instances/{instance_id}/file'),
+                stream=True
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to download DICOM file: {e}")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Failed to download DICOM file: HTTP {response.status_code}")
+            await response.aclose()
+            return None
+        return response
+
+    async def iter_instance_file(self, response: httpx.Response) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in response.aiter_bytes():
+                yield chunk
+        finally:
+            await response.aclose()
+
+
+# Singleton instance
+async_orthanc_service = AsyncOrthancService()
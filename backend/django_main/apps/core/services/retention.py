@@ -0,0 +1,404 @@
+"""
+로그 테이블 보관(retention) / 아카이브 엔진
+
+InferenceLog / APIUsageLog / NotificationLog / ProteinViewLog 처럼 계속 쌓이기만 하는
+로그 테이블을 모델별 정책 (settings.LOG_RETENTION_POLICIES) 에 따라 정리합니다.
+
+- 보관 기간이 지난 행을 날짜 컬럼 + pk 순서로 batch_size 건씩 처리
+  (batch 마다 짧은 transaction 으로 삭제 → 긴 lock / 거대한 DELETE 없음, batch 사이 잠깐 쉼)
+- action='archive': 삭제 전에 로컬 디스크에 날짜별 partition 파일로 저장
+    {LOG_ARCHIVE_DIR}/{app_label}.{model}/{YYYY-MM-DD}/part-{첫 pk}-{끝 pk}-{행 수}.ndjson.gz
+  (LOG_ARCHIVE_FORMAT='parquet' 이면 .parquet, pyarrow 필요)
+  파일을 먼저 쓰고(임시 파일 → rename) 삭제하므로 중간에 실패해도 다시 실행하면 같은 파일을 덮어씀
+  JSON 컬럼의 sequence_ref 는 서열 원문으로 풀어서 저장 (StoredSequence 가 정리돼도 아카이브만으로 복원 가능)
+- action='delete': 보관 없이 삭제
+- query_archive / archive_summary: 관리자 / 통계 view 에서 아카이브를 필요할 때 조회
+
+설치되지 않은 모델의 정책은 건너뜁니다.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from .sequence_store import SequenceResolver
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('archive', 'delete')
+FORMATS = {'ndjson': '.ndjson.gz', 'parquet': '.parquet'}
+
+
+class RetentionPolicy:
+    def __init__(
+        self,
+        label: str,
+        days: int,
+        action: str = 'archive',
+        date_field: str = 'created_at',
+        batch_size: Optional[int] = None,
+    ):
+        if action not in ACTIONS:
+            raise ImproperlyConfigured(f"LOG_RETENTION_POLICIES[{label!r}]: unknown action {action!r}")
+        if days <= 0:
+            raise ImproperlyConfigured(f"LOG_RETENTION_POLICIES[{label!r}]: days must be positive")
+        self.label = label
+        self.days = days
+        self.action = action
+        self.date_field = date_field
+        self.batch_size = batch_size or getattr(settings, 'LOG_RETENTION_BATCH_SIZE', 1000)
+
+    @property
+    def model(self):
+        """정책 대상 모델 (설치되지 않았으면 LookupError)"""
+        return apps.get_model(self.label)
+
+    def cutoff(self, now=None):
+        return (now or timezone.now()) - timedelta(days=self.days)
+
+    def expired(self, now=None):
+        return self.model._base_manager.filter(**{f'{self.date_field}__lt': self.cutoff(now)})
+
+    def as_dict(self):
+        return {
+            'model': self.label,
+            'days': self.days,
+            'action': self.action,
+            'date_field': self.date_field,
+            'batch_size': self.batch_size,
+        }
+
+
+def get_policies(labels: Optional[List[str]] = None) -> List[RetentionPolicy]:
+    configured = getattr(settings, 'LOG_RETENTION_POLICIES', {})
+    unknown = set(labels or []) - set(configured)
+    if unknown:
+        raise ValueError(f"No retention policy for: {', '.join(sorted(unknown))}")
+    return [
+        RetentionPolicy(label, **options)
+        for label, options in configured.items()
+        if not labels or label in labels
+    ]
+
+
+def get_policy(label: str) -> RetentionPolicy:
+    return get_policies([label])[0]
+
+
+# ---------------------------------------------------------------- 아카이브 파일
+
+def archive_root() -> Path:
+    return Path(getattr(settings, 'LOG_ARCHIVE_DIR', Path(settings.BASE_DIR) / 'archives'))
+
+
+def archive_format() -> str:
+    fmt = getattr(settings, 'LOG_ARCHIVE_FORMAT', 'ndjson')
+    if fmt not in FORMATS:
+        raise ImproperlyConfigured(f"LOG_ARCHIVE_FORMAT must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def _model_dir(label: str) -> Path:
+    return archive_root() / label.lower()
+
+
+def _partition_date(value) -> date:
+    if timezone.is_aware(value):
+        return timezone.localdate(value)
+    return value.date() if hasattr(value, 'date') else value
+
+
+def _write_ndjson(path: Path, rows: List[dict]):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+            f.write('\n')
+
+
+def _read_ndjson(path: Path) -> List[dict]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_parquet(path: Path, rows: List[dict]):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImproperlyConfigured("LOG_ARCHIVE_FORMAT='parquet' requires pyarrow")
+
+    # JSONField 값은 컬럼 타입이 행마다 달라질 수 있으므로 JSON 문자열로 저장
+    json_columns = sorted({
+        key for row in rows for key, value in row.items() if isinstance(value, (dict, list))
+    })
+    records = [
+        {
+            key: json.dumps(value, ensure_ascii=False) if key in json_columns and value is not None else value
+            for key, value in row.items()
+        }
+        for row in rows
+    ]
+    table = pa.Table.from_pylist(records).replace_schema_metadata(
+        {b'json_columns': json.dumps(json_columns).encode('utf-8')}
+    )
+    pq.write_table(table, path, compression='zstd')
+
+
+def _read_parquet(path: Path) -> List[dict]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImproperlyConfigured("Reading parquet archives requires pyarrow")
+
+    table = pq.read_table(path)
+    metadata = table.schema.metadata or {}
+    json_columns = json.loads(metadata.get(b'json_columns', b'[]'))
+    rows = table.to_pylist()
+    for row in rows:
+        for key in json_columns:
+            if row.get(key) is not None:
+                row[key] = json.loads(row[key])
+        for key, value in row.items():
+            if hasattr(value, 'isoformat'):
+                row[key] = value.isoformat()
+    return rows
+
+
+def _read_archive(path: Path) -> List[dict]:
+    if path.name.endswith(FORMATS['parquet']):
+        return _read_parquet(path)
+    return _read_ndjson(path)
+
+
+def write_archive(policy: RetentionPolicy, rows: List[dict]) -> List[Path]:
+    """
+    rows (날짜 컬럼 + pk 순서) 를 날짜별 partition 파일로 저장 → 쓴 파일 목록
+    """
+    fmt = archive_format()
+    pk = policy.model._meta.pk.attname
+    partitions: Dict[date, List[dict]] = {}
+    for row in rows:
+        partitions.setdefault(_partition_date(row[policy.date_field]), []).append(row)
+
+    written = []
+    for day, day_rows in partitions.items():
+        directory = _model_dir(policy.label) / day.isoformat()
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"part-{day_rows[0][pk]:012d}-{day_rows[-1][pk]:012d}-{len(day_rows)}{FORMATS[fmt]}"
+        path = directory / name
+        tmp_path = directory / f'.{name}.tmp'
+        if fmt == 'parquet':
+            _write_parquet(tmp_path, day_rows)
+        else:
+            _write_ndjson(tmp_path, day_rows)
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+def _row_count(path: Path) -> int:
+    try:
+        return int(path.name.split('.')[0].rsplit('-', 1)[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+# ---------------------------------------------------------------- 정리
+
+def _expand_sequence_refs(rows: List[dict], json_columns: List[str], resolver: SequenceResolver):
+    """
+    아카이브할 행의 JSON 컬럼에서 sequence_ref → sequence (batch 단위로 한 번에 조회)
+
+    아카이브는 StoredSequence 보다 오래 남을 수 있으므로 digest 만 남기면 복원 불가
+    """
+    resolver.prefetch(row[column] for row in rows for column in json_columns)
+    for row in rows:
+        for column in json_columns:
+            if row[column] is not None:
+                row[column] = resolver.expand(row[column])
+
+
+def apply_policy(
+    policy: RetentionPolicy,
+    now=None,
+    dry_run: bool = False,
+    max_batches: Optional[int] = None,
+) -> dict:
+    """
+    정책 1개 적용 → {"model", "action", "cutoff", "eligible" | "deleted", "archived_files", "batches"}
+    """
+    model = policy.model
+    now = now or timezone.now()
+    result = {
+        **policy.as_dict(),
+        'cutoff': policy.cutoff(now).isoformat(),
+        'status': 'ok',
+    }
+    expired = policy.expired(now)
+    if dry_run:
+        result['eligible'] = expired.count()
+        return result
+
+    columns = [field.attname for field in model._meta.concrete_fields]
+    json_columns = [
+        field.attname for field in model._meta.concrete_fields if isinstance(field, models.JSONField)
+    ]
+    resolver = SequenceResolver()
+    pause = getattr(settings, 'LOG_RETENTION_BATCH_PAUSE', 0.05)
+    deleted = batches = 0
+    archived_files = []
+    started = time.perf_counter()
+
+    while max_batches is None or batches < max_batches:
+        pks = list(
+            expired.order_by(policy.date_field, 'pk').values_list('pk', flat=True)[:policy.batch_size]
+        )
+        if not pks:
+            break
+
+        if policy.action == 'archive':
+            rows = list(
+                model._base_manager.filter(pk__in=pks)
+                .order_by(policy.date_field, 'pk')
+                .values(*columns)
+            )
+            if json_columns:
+                _expand_sequence_refs(rows, json_columns, resolver)
+            archived_files += write_archive(policy, rows)
+
+        with transaction.atomic():
+            deleted += model._base_manager.filter(pk__in=pks).delete()[1].get(model._meta.label, 0)
+        batches += 1
+
+        if len(pks) < policy.batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    result.update({
+        'deleted': deleted,
+        'batches': batches,
+        'archived_files': len(archived_files),
+        'elapsed_s': round(time.perf_counter() - started, 2),
+    })
+    if deleted:
+        logger.info(
+            f"Retention {policy.label}: {policy.action}d {deleted} rows older than "
+            f"{policy.days} days in {batches} batches"
+        )
+    return result
+
+
+def apply_retention(
+    labels: Optional[List[str]] = None,
+    dry_run: bool = False,
+    max_batches: Optional[int] = None,
+) -> List[dict]:
+    """설정된 모든 (또는 labels) 정책 적용. 설치되지 않은 모델은 status='skipped'"""
+    results = []
+    for policy in get_policies(labels):
+        try:
+            results.append(apply_policy(policy, dry_run=dry_run, max_batches=max_batches))
+        except LookupError as e:
+            results.append({**policy.as_dict(), 'status': 'skipped', 'reason': str(e)})
+    return results
+
+
+# ---------------------------------------------------------------- 조회
+
+def _partitions(label: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Path]:
+    model_dir = _model_dir(label)
+    if not model_dir.is_dir():
+        return []
+    partitions = []
+    for directory in model_dir.iterdir():
+        try:
+            day = date.fromisoformat(directory.name)
+        except ValueError:
+            continue
+        if (start and day < start) or (end and day > end):
+            continue
+        partitions.append(directory)
+    return sorted(partitions, key=lambda path: path.name)
+
+
+def _archive_files(directory: Path) -> List[Path]:
+    return sorted(
+        path for path in directory.iterdir()
+        if path.name.startswith('part-') and path.name.endswith(tuple(FORMATS.values()))
+    )
+
+
+def iter_archive(
+    label: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[dict]:
+    """아카이브 행을 최신 순으로 (partition / 파일 단위로 읽음)"""
+    for directory in reversed(_partitions(label, start, end)):
+        for path in reversed(_archive_files(directory)):
+            yield from reversed(_read_archive(path))
+
+
+def query_archive(
+    label: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    filters: Optional[Dict[str, str]] = None,
+    predicate: Optional[Callable[[dict], bool]] = None,
+    limit: int = 100,
+) -> List[dict]:
+    """
+    아카이브 조회 (최신 순)
+    - start / end: partition 날짜 범위 (포함)
+    - filters: 컬럼 = 값 (문자열로 비교, 예: {"service": "ml_inference", "status_code": "500"})
+    - predicate: 추가 조건 (행 dict → bool)
+    """
+    filters = filters or {}
+    results = []
+    for row in iter_archive(label, start, end):
+        if any(str(row.get(key)) != value for key, value in filters.items()):
+            continue
+        if predicate is not None and not predicate(row):
+            continue
+        results.append(row)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def archive_summary(label: Optional[str] = None) -> List[dict]:
+    """모델별 아카이브 partition / 파일 / 행 수 / 크기"""
+    root = archive_root()
+    if label:
+        labels = [label]
+    else:
+        labels = [policy.label for policy in get_policies()]
+
+    summary = []
+    for model_label in labels:
+        partitions = _partitions(model_label)
+        files = [path for directory in partitions for path in _archive_files(directory)]
+        summary.append({
+            'model': model_label,
+            'path': str(root / model_label.lower()),
+            'partitions': len(partitions),
+            'oldest_partition': partitions[0].name if partitions else None,
+            'newest_partition': partitions[-1].name if partitions else None,
+            'files': len(files),
+            'rows': sum(_row_count(path) for path in files),
+            'bytes': sum(path.stat().st_size for path in files),
+        })
+    return summary
@@ -0,0 +1,302 @@
+"""
+Content-addressed 서열 저장소 서비스
+
+- raw_digest: 입력 원문 그대로의 sha256 (저장 key → 원문을 그대로 복원)
+- normalize_sequence / sequence_digest: Flask bioseq.clean_sequence 와 같은 정규화
+  (FASTA 헤더 / 공백 / 개행 제거 + 대문자) 후 sha256 (표기만 다른 같은 서열 조회 key)
+- intern_sequences: 서열 목록 → StoredSequence (없으면 원문을 압축해서 생성, hit_count 증가)
+- dedupe_payloads / SequenceResolver: 추론 payload 의 긴 "sequence" 값을
+  "sequence_ref" (digest) 로 바꾸고, 읽을 때 다시 풀어줌
+- store_report: 중복 제거율 / 압축률 집계
+"""
+
+import hashlib
+import logging
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from ..models import StoredSequence
+
+logger = logging.getLogger(__name__)
+
+# payload 안에서 이보다 짧은 서열은 그대로 둠 (참조 오버헤드가 더 큼)
+MIN_DEDUP_LENGTH = 64
+SEQUENCE_KEY = 'sequence'
+SEQUENCE_REF_KEY = 'sequence_ref'
+COMPRESS_LEVEL = 6
+
+_IUPAC_DNA = set('ACGTNRYKMSWBDHV')
+_IUPAC_RNA = set('ACGUNRYKMSWBDHV')
+_AMINO_ACIDS = set('ACDEFGHIKLMNPQRSTVWYBXZ*')
+
+
+def normalize_sequence(raw: str) -> str:
+    """FASTA 헤더, 공백/개행 제거 후 대문자 (Flask bioseq.clean_sequence 와 동일)"""
+    lines = []
+    for line in raw.splitlines():
+        line = line.strip()
+        if not line or line.startswith('>'):
+            continue
+        lines.append(line)
+    return ''.join(lines).replace(' ', '').upper()
+
+
+def sequence_digest(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def raw_digest(raw: str) -> str:
+    """입력 원문 (정규화 전) 의 sha256"""
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def detect_seq_type(normalized: str) -> str:
+    letters = set(normalized)
+    if not letters:
+        return 'unknown'
+    if 'T' in letters and 'U' in letters:
+        return 'unknown'
+    if letters <= _IUPAC_DNA:
+        return 'dna'
+    if letters <= _IUPAC_RNA:
+        return 'rna'
+    if letters <= _AMINO_ACIDS:
+        return 'protein'
+    return 'unknown'
+
+
+def find_sequences(raw: str) -> List[StoredSequence]:
+    """
+    이전에 저장(분석)된 같은 서열의 저장 행 목록 (표기가 다르면 원문별로 1행씩), 없으면 []
+    normalized_digest index 조회
+    """
+    normalized = normalize_sequence(raw)
+    if not normalized:
+        return []
+    return list(
+        StoredSequence.objects.filter(normalized_digest=sequence_digest(normalized))
+        .defer('compressed')
+        .order_by('first_seen_at', 'id')
+    )
+
+
+def intern_sequences(raw_sequences: Iterable[str]) -> Dict[str, StoredSequence]:
+    """
+    서열들을 저장소에 넣고 {raw: StoredSequence} 반환
+    - 원문이 같은 서열은 새로 저장하지 않고 hit_count / last_seen_at 만 갱신
+    - 같은 호출 안의 중복도 1행으로 합침
+    - 정규화 결과가 비는 값 (헤더 / 공백뿐) 은 저장하지 않음
+    """
+    raw_list = list(raw_sequences)
+    normalized = {}
+    for raw in raw_list:
+        if isinstance(raw, str) and raw not in normalized:
+            norm = normalize_sequence(raw)
+            if norm:
+                normalized[raw] = norm
+    if not normalized:
+        return {}
+
+    digests = {raw: raw_digest(raw) for raw in normalized}
+    hits = Counter(digests[raw] for raw in raw_list if raw in normalized)
+
+    stored = {
+        seq.digest: seq
+        for seq in StoredSequence.objects.filter(digest__in=digests.values()).defer('compressed')
+    }
+    missing = []
+    for raw, digest in digests.items():
+        if digest in stored:
+            continue
+        norm = normalized[raw]
+        compressed = zlib.compress(raw.encode('utf-8'), COMPRESS_LEVEL)
+        missing.append(StoredSequence(
+            digest=digest,
+            normalized_digest=sequence_digest(norm),
+            seq_type=detect_seq_type(norm),
+            length=len(norm),
+            compressed=compressed,
+            stored_size=len(compressed),
+        ))
+    if missing:
+        # 다른 worker 가 같은 서열을 먼저 넣었을 수 있으므로 충돌은 무시하고 다시 조회
+        StoredSequence.objects.bulk_create(missing, ignore_conflicts=True)
+        stored.update({
+            seq.digest: seq
+            for seq in StoredSequence.objects.filter(
+                digest__in=[seq.digest for seq in missing]
+            ).defer('compressed')
+        })
+
+    # 같은 증가량끼리 묶어서 UPDATE
+    by_count = defaultdict(list)
+    for digest, count in hits.items():
+        by_count[count].append(digest)
+    now = timezone.now()
+    for count, digest_list in by_count.items():
+        StoredSequence.objects.filter(digest__in=digest_list).update(
+            hit_count=F('hit_count') + count,
+            last_seen_at=now
+        )
+
+    return {raw: stored[digest] for raw, digest in digests.items()}
+
+
+# ---------------------------------------------------------------- payload
+
+def _walk_sequences(value, found):
+    if isinstance(value, dict):
+        sequence = value.get(SEQUENCE_KEY)
+        if isinstance(sequence, str) and len(sequence) >= MIN_DEDUP_LENGTH:
+            found.append(sequence)
+        for key, item in value.items():
+            if key != SEQUENCE_KEY:
+                _walk_sequences(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            _walk_sequences(item, found)
+
+
+def payload_sequences(payload) -> List[str]:
+    """payload (단일 / items 배치 / samples) 안의 긴 sequence 값 목록"""
+    found = []
+    _walk_sequences(payload, found)
+    return found
+
+
+def _replace(value, mapping):
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            if key == SEQUENCE_KEY and isinstance(item, str) and item in mapping:
+                out[SEQUENCE_REF_KEY] = mapping[item].digest
+            else:
+                out[key] = _replace(item, mapping)
+        return out
+    if isinstance(value, list):
+        return [_replace(item, mapping) for item in value]
+    return value
+
+
+def dedupe_payloads(payloads: List) -> List[tuple]:
+    """
+    payload 여러 개를 한 번에 처리 → [(새 payload, 대표 StoredSequence 또는 None)]
+    대표 서열: payload 안의 서열이 (정규화 기준) 1종류일 때 첫 서열 (FK 로 연결)
+    """
+    per_payload = [payload_sequences(payload) for payload in payloads]
+    mapping = intern_sequences([seq for seqs in per_payload for seq in seqs])
+
+    results = []
+    for payload, seqs in zip(payloads, per_payload):
+        if not seqs:
+            results.append((payload, None))
+            continue
+        distinct = {mapping[seq].normalized_digest for seq in seqs if seq in mapping}
+        primary = mapping[seqs[0]] if len(distinct) == 1 and seqs[0] in mapping else None
+        results.append((_replace(payload, mapping), primary))
+    return results
+
+
+class SequenceResolver:
+    """
+    sequence_ref → 서열 복원 (요청 / export 단위로 만들어 digest 별 1번만 조회)
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._texts: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def _refs(value, found):
+        if isinstance(value, dict):
+            ref = value.get(SEQUENCE_REF_KEY)
+            if isinstance(ref, str):
+                found.add(ref)
+            for item in value.values():
+                SequenceResolver._refs(item, found)
+        elif isinstance(value, list):
+            for item in value:
+                SequenceResolver._refs(item, found)
+
+    def prefetch(self, payloads: Iterable):
+        refs = set()
+        for payload in payloads:
+            self._refs(payload, refs)
+        refs -= set(self._texts)
+        if not refs:
+            return
+        if len(self._texts) + len(refs) > self.max_entries:
+            # 긴 export 에서 메모리가 계속 늘지 않도록 비움
+            self._texts.clear()
+        for seq in StoredSequence.objects.filter(digest__in=refs):
+            self._texts[seq.digest] = seq.text
+        for ref in refs - set(self._texts):
+            self._texts[ref] = None
+
+    def expand(self, payload):
+        """sequence_ref 를 sequence 로 되돌린 payload (원본은 변경하지 않음)"""
+        self.prefetch([payload])
+        return self._expand(payload)
+
+    def _expand(self, value):
+        if isinstance(value, dict):
+            out = {}
+            for key, item in value.items():
+                if key == SEQUENCE_REF_KEY and self._texts.get(item) is not None:
+                    out[SEQUENCE_KEY] = self._texts[item]
+                else:
+                    out[key] = self._expand(item)
+            return out
+        if isinstance(value, list):
+            return [self._expand(item) for item in value]
+        return value
+
+
+# ---------------------------------------------------------------- 보고
+
+def store_report() -> dict:
+    """
+    중복 제거율 / 압축률
+    - sequences: 저장된 원문 수, distinct_sequences: 정규화 기준 고유 서열 수
+    - dedup_ratio: 저장된 참조 수 / 저장된 원문 수
+    - compression_ratio: 정규화 서열 크기 / 압축 후 크기
+    - overall_ratio: 중복 제거 없이 참조마다 서열을 저장했을 때 크기 / 실제 저장 크기
+    """
+    totals = StoredSequence.objects.aggregate(
+        sequences=Count('id'),
+        distinct_sequences=Count('normalized_digest', distinct=True),
+        references=Sum('hit_count'),
+        raw_bytes=Sum('length'),
+        stored_bytes=Sum('stored_size'),
+        logical_bytes=Sum(F('length') * F('hit_count')),
+    )
+    sequences = totals['sequences'] or 0
+    references = totals['references'] or 0
+    raw_bytes = totals['raw_bytes'] or 0
+    stored_bytes = totals['stored_bytes'] or 0
+    logical_bytes = totals['logical_bytes'] or 0
+
+    def ratio(a, b):
+        return round(a / b, 2) if b else None
+
+    by_type = list(
+        StoredSequence.objects.values('seq_type')
+        .annotate(sequences=Count('id'), references=Sum('hit_count'))
+        .order_by('seq_type')
+    )
+    return {
+        'sequences': sequences,
+        'distinct_sequences': totals['distinct_sequences'] or 0,
+        'references': references,
+        'raw_bytes': raw_bytes,
+        'stored_bytes': stored_bytes,
+        'logical_bytes': logical_bytes,
+        'dedup_ratio': ratio(references, sequences),
+        'compression_ratio': ratio(raw_bytes, stored_bytes),
+        'overall_ratio': ratio(logical_bytes, stored_bytes),
+        'by_type': by_type,
+    }
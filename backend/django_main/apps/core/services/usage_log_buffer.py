@@ -0,0 +1,25 @@
+"""
+APIUsageLog write-behind 버퍼 (async gateway 용)
+
+async view 에서 호출마다 APIUsageLog INSERT 를 하면 sync_to_async 의 공유 thread 1개에서
+순서대로 실행돼 동시 요청 수백 개가 DB 쓰기 1건씩으로 줄을 서게 됩니다.
+→ 객체만 큐에 넣고 flusher thread 가 bulk_create (core.services.write_behind)
+
+- created_at 은 auto_now_add 라 flush 시각 기준 (최대 flush_interval 초 늦음)
+- API_USAGE_LOG_BUFFERED=False 면 호출한 쪽에서 바로 저장
+"""
+from ..models import APIUsageLog
+from .write_behind import WriteBehindBuffer
+
+
+class APIUsageLogBuffer(WriteBehindBuffer):
+    model = APIUsageLog
+    settings_prefix = 'API_USAGE_LOG'
+    thread_name = 'api-usage-log-flusher'
+
+    def describe(self, log):
+        return f"{log.service} {log.method} {log.endpoint}"
+
+
+# Singleton instance
+usage_log_buffer = APIUsageLogBuffer()
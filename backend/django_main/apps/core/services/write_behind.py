@@ -0,0 +1,210 @@
+"""
+로그 모델 write-behind 버퍼 (공통)
+
+요청 처리 중에는 저장하지 않은 모델 객체를 메모리 큐에 넣기만 하고 (INSERT 없음)
+background flusher thread 가 batch_size 건이 모이거나 flush_interval 초가 지나면
+bulk_create 로 한 번에 저장합니다.
+
+- 큐는 프로세스(gunicorn worker)별. flusher 는 프로세스마다 처음 put() 할 때 시작
+- graceful shutdown (gunicorn / uvicorn worker 종료 → 정상 종료) 시 atexit 에서 남은 행을 모두 저장
+- DB 연결 오류로 저장 못한 batch 는 큐 앞에 다시 넣고 다음 주기에 재시도
+- 큐가 max_queue 를 넘으면 버리지 않고 put() 이 False 를 돌려줘 호출한 쪽에서 바로 저장 (backpressure)
+- stats(): 대기 건수 / 저장 건수 / 마지막 flush 등 (관리자 성능 대시보드)
+
+설정은 settings_prefix 기준: {prefix}_BUFFERED / _BATCH_SIZE / _FLUSH_INTERVAL / _MAX_QUEUE
+{prefix}_BUFFERED=False 면 put() 이 항상 False (요청 안에서 바로 저장)
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError, close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    model = None
+    settings_prefix = ''
+    thread_name = 'write-behind-flusher'
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_queue: Optional[int] = None,
+    ):
+        prefix = self.settings_prefix
+        self.batch_size = batch_size or getattr(settings, f'{prefix}_BATCH_SIZE', 200)
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else getattr(settings, f'{prefix}_FLUSH_INTERVAL', 2.0)
+        )
+        self.max_queue = max_queue or getattr(settings, f'{prefix}_MAX_QUEUE', 10000)
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher = None
+        self._flusher_pid = None
+        self._atexit_registered = False
+
+        self.flushed = 0
+        self.batches = 0
+        self.failed = 0
+        self.overflow_writes = 0
+        self.last_flush_at = None
+        self.last_flush_ms = None
+        self.last_error = None
+
+    def enabled(self):
+        return getattr(settings, f'{self.settings_prefix}_BUFFERED', True)
+
+    # ---------------------------------------------------------------- 하위 클래스 hook
+
+    def prepare(self, batch):
+        """bulk_create 직전 batch 가공 (재시도 때 다시 호출돼도 안전해야 함)"""
+
+    def describe(self, obj) -> str:
+        """저장 실패로 버린 행을 로그에 남길 때 쓰는 설명"""
+        return f"pk={obj.pk}"
+
+    # ---------------------------------------------------------------- 적재
+
+    def put(self, obj) -> bool:
+        """
+        저장하지 않은 객체 1건 적재 → 큐에 넣었으면 True
+        버퍼를 쓰지 않는 설정이거나 큐가 가득 차면 False (호출한 쪽에서 obj.save())
+        """
+        if not self.enabled():
+            return False
+
+        self._ensure_flusher()
+        with self._lock:
+            overflow = len(self._queue) >= self.max_queue
+            if not overflow:
+                self._queue.append(obj)
+                depth = len(self._queue)
+
+        if overflow:
+            # flusher 가 못 따라가면 버리지 않고 요청 쪽에서 직접 저장
+            self.overflow_writes += 1
+            return False
+
+        if depth >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def depth(self):
+        return len(self._queue)
+
+    # ---------------------------------------------------------------- 저장
+
+    def flush(self, limit: Optional[int] = None):
+        """큐에 있는 행을 batch_size 단위 bulk_create 로 저장 → 저장한 건수"""
+        written = 0
+        with self._flush_lock:
+            while limit is None or written < limit:
+                with self._lock:
+                    batch = [
+                        self._queue.popleft()
+                        for _ in range(min(self.batch_size, len(self._queue)))
+                    ]
+                if not batch:
+                    break
+                if not self._write(batch):
+                    break
+                written += len(batch)
+        return written
+
+    def _write(self, batch):
+        name = self.model.__name__
+        started = time.perf_counter()
+        try:
+            close_old_connections()
+            self.prepare(batch)
+            self.model.objects.bulk_create(batch, batch_size=self.batch_size)
+        except (OperationalError, InterfaceError) as e:
+            # DB 연결 문제 → 순서 그대로 큐 앞에 되돌리고 다음 주기에 재시도
+            with self._lock:
+                self._queue.extendleft(reversed(batch))
+            self.last_error = str(e)
+            logger.error(f"{name} flush failed, {len(batch)} rows requeued: {e}")
+            return False
+        except DatabaseError as e:
+            # 데이터 문제 → 한 건씩 저장해서 문제 있는 행만 제외
+            self.last_error = str(e)
+            logger.error(f"{name} bulk insert failed, retrying one by one: {e}")
+            for obj in batch:
+                try:
+                    obj.save()
+                except DatabaseError as row_error:
+                    self.failed += 1
+                    logger.error(f"{name} dropped ({self.describe(obj)}): {row_error}")
+        self.flushed += len(batch)
+        self.batches += 1
+        self.last_flush_at = timezone.now()
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"{name} flushed {len(batch)} rows in {self.last_flush_ms} ms")
+        return True
+
+    # ---------------------------------------------------------------- flusher
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"{self.model.__name__} flusher error: {e}")
+
+    def _ensure_flusher(self):
+        pid = os.getpid()
+        if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name=self.thread_name, daemon=True
+            )
+            self._flusher_pid = pid
+            self._flusher.start()
+            if not self._atexit_registered:
+                atexit.register(self.shutdown)
+                self._atexit_registered = True
+
+    def shutdown(self):
+        """프로세스 종료 시 남은 행 저장 (DB 가 계속 실패하면 몇 번만 재시도)"""
+        for attempt in range(3):
+            self.flush()
+            if not self._queue:
+                return
+            time.sleep(0.5 * (attempt + 1))
+        logger.error(f"{self.model.__name__} shutdown: {len(self._queue)} rows could not be written")
+
+    def stats(self):
+        return {
+            'enabled': self.enabled(),
+            'pid': os.getpid(),
+            'queue_depth': self.depth(),
+            'max_queue': self.max_queue,
+            'batch_size': self.batch_size,
+            'flush_interval_s': self.flush_interval,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'failed': self.failed,
+            'overflow_writes': self.overflow_writes,
+            'last_flush_at': self.last_flush_at.isoformat() if self.last_flush_at else None,
+            'last_flush_ms': self.last_flush_ms,
+            'last_error': self.last_error,
+        }
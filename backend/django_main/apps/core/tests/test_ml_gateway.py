@@ -0,0 +1,219 @@
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from apps.core.models import APIUsageLog
+from apps.core.services.ml_gateway import MLGatewayClient, SERVICE_NAME
+from apps.core.services.ml_gateway_async import AsyncMLGatewayClient
+from apps.core.services.usage_log_buffer import APIUsageLogBuffer
+
+
+class MLGatewayClientTestCase(TestCase):
+    def setUp(self):
+        self.client_ = MLGatewayClient(
+            base_urls=['http://flask.test:9000/'], api_key='k', probe_interval=0
+        )
+
+    def test_session_is_reused_per_process(self):
+        session = self.client_.session
+        self.assertIs(self.client_.session, session)
+        self.assertEqual(session.headers['X-API-Key'], 'k')
+
+        with mock.patch('apps.core.services.ml_gateway.os.getpid', return_value=-1):
+            self.assertIsNot(self.client_.session, session)
+
+    def test_retries_only_idempotent_methods(self):
+        retry = self.client_.session.get_adapter('http://flask.test:9000').max_retries
+        self.assertIn('GET', retry.allowed_methods)
+        self.assertNotIn('POST', retry.allowed_methods)
+
+    def test_timeout_per_endpoint(self):
+        self.assertEqual(self.client_.timeout_for('explain')[1], 120)
+        with mock.patch.dict(os.environ, {'ML_GATEWAY_TIMEOUT_EXPLAIN': '7'}):
+            self.assertEqual(self.client_.timeout_for('explain')[1], 7)
+
+    def test_records_latency_and_errors(self):
+        response = mock.Mock(status_code=503)
+        with mock.patch.object(self.client_.session, 'request', return_value=response) as req:
+            self.client_.get('status', '/api/health')
+            self.client_.get('ready', '/ready')
+
+        req.assert_any_call(
+            'GET', 'http://flask.test:9000/api/health',
+            timeout=self.client_.timeout_for('status')
+        )
+        metrics = self.client_.metrics()['endpoints']
+        self.assertEqual(metrics['status']['count'], 1)
+        self.assertEqual(metrics['status']['errors'], 1)
+
+        # readiness 폴링은 사용 로그에 남기지 않음
+        logs = APIUsageLog.objects.filter(service=SERVICE_NAME)
+        self.assertEqual(logs.count(), 1)
+        self.assertEqual(logs.get().status_code, 503)
+
+
+class _StubReplica:
+    """로컬 Flask replica 흉내 (/ready, /api/health, /api/predict)"""
+
+    def __init__(self, name, ready=True, delay=0.0):
+        self.name = name
+        self.ready = ready
+        self.delay = delay
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # timeout 테스트에서 클라이언트가 먼저 끊음
+
+            def do_GET(self):
+                if self.path == '/ready':
+                    return self._reply(200 if stub.ready else 503, {'ready': stub.ready})
+                stub.hits += 1
+                self._reply(200, {'replica': stub.name})
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                stub.hits += 1
+                time.sleep(stub.delay)
+                self._reply(200, {'replica': stub.name})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _dead_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+class MLGatewayFailoverTestCase(TestCase):
+    def setUp(self):
+        self.a = _StubReplica('a')
+        self.b = _StubReplica('b')
+
+    def tearDown(self):
+        self.a.stop()
+        self.b.stop()
+
+    def _client(self, urls, **kwargs):
+        return MLGatewayClient(
+            base_urls=urls, api_key='', probe_interval=0, connect_timeout=1, **kwargs
+        )
+
+    def test_requests_spread_across_replicas(self):
+        client = self._client([self.a.url, self.b.url])
+        for _ in range(40):
+            client.post('predict', '/api/predict', json={})
+        self.assertGreater(self.a.hits, 0)
+        self.assertGreater(self.b.hits, 0)
+
+    def test_prefers_replica_with_fewer_outstanding(self):
+        client = self._client([self.a.url, self.b.url])
+        client.replicas[0].outstanding = 5
+        for _ in range(5):
+            response = client.get('status', '/api/health')
+            self.assertEqual(response.json()['replica'], 'b')
+
+    def test_dead_replica_is_ejected_and_traffic_fails_over(self):
+        dead = _dead_url()
+        client = self._client([dead, self.a.url])
+        client.replicas[1].outstanding = 100  # 첫 시도는 반드시 죽은 replica 로 가도록
+        for _ in range(6):
+            response = client.post('jobs', '/api/jobs', json={})
+            self.assertEqual(response.json()['replica'], 'a')
+
+        states = {s['url']: s for s in client.replica_states()}
+        self.assertTrue(states[dead]['ejected'])
+        self.assertFalse(states[dead]['available'])
+        self.assertEqual(states[dead]['outstanding'], 0)
+        self.assertEqual(states[self.a.url]['outstanding'], 100)
+
+    def test_timed_out_inference_fails_over_and_ejects(self):
+        self.a.delay = 1.0
+        client = self._client([self.a.url, self.b.url])
+        client.replicas[1].outstanding = 100  # 첫 시도는 느린 a 로 가도록
+
+        response = client.post('predict', '/api/predict', json={}, timeout=(1, 0.2))
+        self.assertEqual(response.json()['replica'], 'b')
+        self.assertTrue(client.replica_states()[0]['ejected'])
+
+    def test_non_idempotent_post_is_not_resent_after_timeout(self):
+        self.a.delay = 1.0
+        client = self._client([self.a.url, self.b.url])
+        client.replicas[1].outstanding = 100
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            client.post('jobs', '/api/jobs', json={}, timeout=(1, 0.2))
+        self.assertEqual(self.b.hits, 0)
+
+    def test_probe_removes_unready_replica_and_restores_it(self):
+        client = self._client([self.a.url, self.b.url])
+        self.b.ready = False
+        client.probe_all()
+        for _ in range(5):
+            self.assertEqual(client.get('status', '/api/health').json()['replica'], 'a')
+
+        # 재로딩이 끝나 ready 가 되면 다시 라우팅 대상
+        self.b.ready = True
+        client.replicas[1].ejected_until = time.monotonic() + 60
+        client.probe_all()
+        state = client.replica_states()[1]
+        self.assertTrue(state['available'])
+        self.assertFalse(state['ejected'])
+
+    def test_pinned_replica_is_used(self):
+        client = self._client([self.a.url, self.b.url])
+        for _ in range(5):
+            response = client.get('job_detail', '/api/jobs/x', replica=self.b.url)
+            self.assertEqual(response.ml_replica, self.b.url)
+        self.assertEqual(self.a.hits, 0)
+
+    def test_broadcast_reaches_every_replica_in_turn(self):
+        client = self._client([self.a.url, self.b.url])
+        results = client.broadcast('POST', 'reload_model', '/api/reload_model', json={})
+        self.assertEqual([r['response'].json()['replica'] for r in results], ['a', 'b'])
+        self.assertFalse(any(s['draining'] for s in client.replica_states()))
+
+    def test_async_gateway_buffers_usage_logs(self):
+        client = AsyncMLGatewayClient(self._client([self.a.url]))
+        buffer = APIUsageLogBuffer(batch_size=10, flush_interval=60)
+        buffer._ensure_flusher = mock.Mock()
+
+        async def call():
+            for _ in range(3):
+                await client.post('predict', '/api/predict', json={})
+
+        # 호출마다 INSERT 하지 않고 큐에만 적재 → flush 때 bulk_create
+        with mock.patch('apps.core.services.ml_gateway_async.usage_log_buffer', buffer):
+            async_to_sync(call)()
+        self.assertFalse(APIUsageLog.objects.exists())
+        self.assertEqual(client.gateway.metrics()['endpoints']['predict']['count'], 3)
+
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(APIUsageLog.objects.filter(service=SERVICE_NAME, status_code=200).count(), 3)
@@ -0,0 +1,111 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import APIUsageLog
+from apps.core.services import retention
+from apps.ml_proxy.models import InferenceLog
+
+POLICIES = {
+    'core.APIUsageLog': {'days': 30, 'action': 'archive'},
+    'ml_proxy.InferenceLog': {'days': 30, 'action': 'delete'},
+    'emr.NotInstalledLog': {'days': 30, 'action': 'delete'},
+}
+
+
+class RetentionTestCase(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        self.settings_override = override_settings(
+            LOG_RETENTION_POLICIES=POLICIES,
+            LOG_RETENTION_BATCH_SIZE=2,
+            LOG_RETENTION_BATCH_PAUSE=0,
+            LOG_ARCHIVE_DIR=self.archive_dir,
+            LOG_ARCHIVE_FORMAT='ndjson',
+            ML_INFERENCE_LOG_BUFFERED=False,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        now = timezone.now()
+        for i, age_days in enumerate([40, 40, 35, 31, 5]):
+            log = APIUsageLog.objects.create(
+                service='ml_inference', endpoint=f'/api/predict/{i}', status_code=500 if i % 2 else 200
+            )
+            APIUsageLog.objects.filter(pk=log.pk).update(created_at=now - timedelta(days=age_days))
+        for age_days in [60, 1]:
+            log = InferenceLog.objects.create(
+                doctor_name='김의사', patient_name='홍환자', input_data={}, output_data={}
+            )
+            InferenceLog.objects.filter(pk=log.pk).update(created_at=now - timedelta(days=age_days))
+
+    def test_dry_run_only_counts(self):
+        results = {r['model']: r for r in retention.apply_retention(dry_run=True)}
+        self.assertEqual(results['core.APIUsageLog']['eligible'], 4)
+        self.assertEqual(results['ml_proxy.InferenceLog']['eligible'], 1)
+        self.assertEqual(results['emr.NotInstalledLog']['status'], 'skipped')
+        self.assertEqual(APIUsageLog.objects.count(), 5)
+
+    def test_archive_then_delete_in_batches(self):
+        results = {r['model']: r for r in retention.apply_retention()}
+
+        self.assertEqual(results['core.APIUsageLog']['deleted'], 4)
+        self.assertEqual(results['core.APIUsageLog']['batches'], 2)
+        self.assertEqual(APIUsageLog.objects.count(), 1)
+        self.assertEqual(InferenceLog.objects.count(), 1)
+
+        summary = retention.archive_summary('core.APIUsageLog')[0]
+        self.assertEqual(summary['rows'], 4)
+        self.assertEqual(summary['partitions'], 3)
+        self.assertEqual(retention.archive_summary('ml_proxy.InferenceLog')[0]['files'], 0)
+
+        rows = retention.query_archive('core.APIUsageLog')
+        self.assertEqual([row['endpoint'] for row in rows], [f'/api/predict/{i}' for i in (3, 2, 1, 0)])
+        errors = retention.query_archive('core.APIUsageLog', filters={'status_code': '500'})
+        self.assertEqual(len(errors), 2)
+
+    def test_max_batches_resumes_without_duplicates(self):
+        retention.apply_retention(['core.APIUsageLog'], max_batches=1)
+        self.assertEqual(APIUsageLog.objects.count(), 3)
+        retention.apply_retention(['core.APIUsageLog'])
+        self.assertEqual(len(retention.query_archive('core.APIUsageLog')), 4)
+
+    def test_command_and_admin_views(self):
+        out = io.StringIO()
+        call_command('apply_log_retention', '--model', 'core.APIUsageLog', stdout=out)
+        self.assertIn('core.APIUsageLog: archive 4 rows', out.getvalue())
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+
+        status = client.get('/api/v1/admin/retention/').json()
+        by_model = {policy['model']: policy for policy in status['policies']}
+        self.assertEqual(by_model['core.APIUsageLog']['expired_rows'], 0)
+        self.assertFalse(by_model['emr.NotInstalledLog']['installed'])
+
+        body = client.get('/api/v1/admin/archives/', {'model': 'core.APIUsageLog', 'status_code': '500'}).json()
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(client.get('/api/v1/admin/archives/', {'model': 'auth.User'}).status_code, 400)
+
+    def test_archived_logs_keep_sequence_text(self):
+        sequence = 'MKT' * 40
+        log = InferenceLog.objects.create(
+            doctor_name='김의사', patient_name='홍환자', input_data={'sequence': sequence}, output_data={}
+        )
+        InferenceLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - timedelta(days=45))
+        self.assertIn('sequence_ref', InferenceLog.objects.get(pk=log.pk).input_data)
+
+        with override_settings(LOG_RETENTION_POLICIES={'ml_proxy.InferenceLog': {'days': 30, 'action': 'archive'}}):
+            retention.apply_retention()
+
+        rows = {row['id']: row for row in retention.query_archive('ml_proxy.InferenceLog')}
+        self.assertEqual(rows[log.pk]['input_data'], {'sequence': sequence})
+        self.assertEqual(len(rows), 2)
@@ -1,8 +1,29 @@
 """
 URL configuration for Core app (Orthanc integration).
 """
+from django.conf import settings
 from django.urls import path
-from apps.core import views
+from apps.core import views, views_admin
+
+if settings.ASYNC_PROXY_VIEWS:
+    # ASGI: Orthanc 조회/다운로드를 async view 로 (URL / 응답은 동일)
+    from apps.core import async_views
+
+    orthanc_read_views = [
+        path('orthanc/studies/<str:study_uid>/', async_views.orthanc_study, name='orthanc-study'),
+        path('orthanc/series/<str:series_uid>/', async_views.orthanc_series, name='orthanc-series'),
+        path('orthanc/instances/<str:instance_id>/preview/', async_views.orthanc_instance_preview, name='orthanc-preview'),
+        path('orthanc/instances/<str:instance_id>/file/', async_views.orthanc_instance_file, name='orthanc-file'),
+        path('orthanc/patients/<int:patient_id>/studies/', async_views.orthanc_patient_studies, name='orthanc-patient-studies'),
+    ]
+else:
+    orthanc_read_views = [
+        path('orthanc/studies/<str:study_uid>/', views.OrthancStudyView.as_view(), name='orthanc-study'),
+        path('orthanc/series/<str:series_uid>/', views.OrthancSeriesView.as_view(), name='orthanc-series'),
+        path('orthanc/instances/<str:instance_id>/preview/', views.OrthancInstancePreviewView.as_view(), name='orthanc-preview'),
+        path('orthanc/instances/<str:instance_id>/file/', views.OrthancInstanceFileView.as_view(), name='orthanc-file'),
+        path('orthanc/patients/<int:patient_id>/studies/', views.OrthancPatientStudiesView.as_view(), name='orthanc-patient-studies'),
+    ]
 
 urlpatterns = [
     # Health check and monitoring
@@ -10,11 +31,11 @@ urlpatterns = [
     path('system/stats/', views.system_stats, name='system-stats'),
 
     # Orthanc DICOM endpoints
-    path('orthanc/studies/<str:study_uid>/', views.OrthancStudyView.as_view(), name='orthanc-study'),
-    path('orthanc/series/<str:series_uid>/', views.OrthancSeriesView.as_view(), name='orthanc-series'),
-    path('orthanc/instances/<str:instance_id>/preview/', views.OrthancInstancePreviewView.as_view(), name='orthanc-preview'),
-    path('orthanc/instances/<str:instance_id>/file/', views.OrthancInstanceFileView.as_view(), name='orthanc-file'),
-    path('orthanc/patients/<int:patient_id>/studies/', views.OrthancPatientStudiesView.as_view(), name='orthanc-patient-studies'),
+    *orthanc_read_views,
     path('orthanc/upload/', views.OrthancUploadView.as_view(), name='orthanc-upload'),
     path('orthanc/statistics/', views.OrthancStatisticsView.as_view(), name='orthanc-statistics'),
+
+    # Log retention / archives (admin)
+    path('admin/retention/', views_admin.retention_status, name='admin-retention'),
+    path('admin/archives/', views_admin.archived_logs, name='admin-archives'),
 ]
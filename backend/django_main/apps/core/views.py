@@ -326,10 +326,9 @@ def health_check(request):
         health_status["checks"]["database"] = f"error: {str(e)}"
 
     # 2. Flask ML 서버 연결 확인 (선택사항)
-    flask_url = os.getenv('FLASK_INFERENCE_URL', 'http://127.0.0.1:9000')
     try:
-        import requests
-        response = requests.get(f"{flask_url}/health", timeout=5)
+        from apps.core.services.ml_gateway import ml_gateway
+        response = ml_gateway.get('health', '/health')
         if response.status_code == 200:
             health_status["checks"]["ml_server"] = "ok"
         else:
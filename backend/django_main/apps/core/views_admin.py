@@ -6,13 +6,15 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from django.conf import settings
 from django.core.cache import cache
 from django.db.models import Count, Avg, Q, Sum
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
 from .models import APIUsageLog
+from .services.ml_gateway import ml_gateway
+from .services import retention
 import logging
-import psutil
 import os
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,8 @@ def performance_dashboard(request):
         - 캐시 히트율
         - 시스템 리소스 사용량
     """
+    from apps.ml_proxy.log_buffer import inference_log_buffer
+    from .services.usage_log_buffer import usage_log_buffer
 
     # 기간 설정 (최근 24시간)
     since = timezone.now() - timedelta(hours=24)
@@ -79,6 +83,9 @@ def performance_dashboard(request):
 
     # === 시스템 리소스 ===
     try:
+        # psutil 은 선택 의존성 (없으면 아래 except 로 에러만 표시, admin URL 로딩은 그대로)
+        import psutil
+
         # CPU 사용률
         cpu_percent = psutil.cpu_percent(interval=1)
 
@@ -136,6 +143,12 @@ def performance_dashboard(request):
         'hourly_requests': hourly_requests,
         'system_resources': system_resources,
         'redis_stats': redis_stats,
+        # Flask 추론 서버 호출 통계 (현재 worker 프로세스 기준, 누적치는 service_usage 의 ml_inference)
+        'ml_gateway': ml_gateway.metrics(),
+        # InferenceLog write-behind 큐 (현재 worker 프로세스 기준 대기 건수 / flush 통계)
+        'inference_log_buffer': inference_log_buffer.stats(),
+        # async gateway 의 APIUsageLog write-behind 큐 (현재 worker 프로세스 기준)
+        'usage_log_buffer': usage_log_buffer.stats(),
         'period': {
             'start': since.isoformat(),
             'end': timezone.now().isoformat()
@@ -187,10 +200,12 @@ def error_logs(request):
         - hours: 조회 시간 범위 (기본 24시간)
         - service: 서비스 필터
         - limit: 결과 수 제한 (기본 100)
+        - include_archive: 1 이면 보관 기간이 지나 아카이브된 에러도 함께 조회
     """
     hours = int(request.GET.get('hours', 24))
     service = request.GET.get('service')
     limit = int(request.GET.get('limit', 100))
+    include_archive = request.GET.get('include_archive') in ('1', 'true')
 
     since = timezone.now() - timedelta(hours=hours)
 
@@ -219,12 +234,26 @@ def error_logs(request):
         count=Count('id')
     ).order_by('-count')
 
-    return Response({
+    data = {
         'period_hours': hours,
         'total_errors': len(errors),
         'errors': list(errors),
         'error_stats': list(error_stats)
-    })
+    }
+
+    if include_archive:
+        # DB 에 남은 기간보다 오래된 구간만 아카이브에서 조회
+        policy = retention.get_policy('core.APIUsageLog')
+        if since < policy.cutoff():
+            data['archived_errors'] = retention.query_archive(
+                'core.APIUsageLog',
+                start=timezone.localdate(since),
+                filters={'service': service} if service else None,
+                predicate=lambda row: (row.get('status_code') or 0) >= 400,
+                limit=limit
+            )
+
+    return Response(data)
 
 
 @api_view(['POST'])
@@ -356,5 +385,79 @@ def user_activity(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def retention_status(request):
+    """
+    로그 보관 정책 현황
+
+    모델별 정책, 보관 기간이 지나 정리 대기 중인 행 수, 아카이브 파일 요약
+    """
+    policies = []
+    for policy in retention.get_policies():
+        try:
+            expired = policy.expired().count()
+        except LookupError:
+            policies.append({**policy.as_dict(), 'installed': False})
+            continue
+        policies.append({
+            **policy.as_dict(),
+            'installed': True,
+            'cutoff': policy.cutoff().isoformat(),
+            'expired_rows': expired,
+        })
+
+    return Response({
+        'archive_dir': str(retention.archive_root()),
+        'archive_format': retention.archive_format(),
+        'policies': policies,
+        'archives': retention.archive_summary(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def archived_logs(request):
+    """
+    아카이브된 로그 조회 (최신 순)
+
+    Query params:
+        - model: 정책 label (필수, 예: core.APIUsageLog)
+        - from / to: 날짜 범위 (YYYY-MM-DD, 포함)
+        - limit: 결과 수 제한 (기본 100, 최대 1000)
+        - 그 밖의 파라미터: 컬럼 = 값 필터 (예: service=ml_inference&status_code=500)
+    """
+    params = request.GET.copy()
+    label = params.pop('model', [None])[-1]
+    if label not in getattr(settings, 'LOG_RETENTION_POLICIES', {}):
+        return Response({'error': f'Unknown model: {label}'}, status=400)
+
+    dates = {}
+    for name in ('from', 'to'):
+        value = params.pop(name, [None])[-1]
+        if value:
+            try:
+                dates[name] = date.fromisoformat(value)
+            except ValueError:
+                return Response({'error': f'Invalid {name} date: {value}'}, status=400)
+    try:
+        limit = min(int(params.pop('limit', [100])[-1]), 1000)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+
+    rows = retention.query_archive(
+        label,
+        start=dates.get('from'),
+        end=dates.get('to'),
+        filters=params.dict(),
+        limit=limit
+    )
+    return Response({
+        'model': label,
+        'count': len(rows),
+        'results': rows,
+    })
+
+
 # 필요한 import 추가
 from django.db.models import Max
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-19 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_storedsequence"),
+        ("custom", "0003_alter_antigenanalysisresult_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="antigenanalysisresult",
+            name="sequence",
+            field=models.ForeignKey(blank=True, help_text="서열 저장소의 정규화 + 압축 서열", null=True, on_delete=django.db.models.deletion.PROTECT, related_name="antigen_results", to="core.storedsequence", verbose_name="분석 서열"),
+        ),
+        migrations.AlterField(
+            model_name="antigenanalysisresult",
+            name="input_sequence",
+            field=models.TextField(blank=True, help_text="분석된 단백질/DNA/RNA 서열 (저장 시 sequence 로 옮기고 비움, 백필 전 기존 행만 값 보유)", verbose_name="입력 서열"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_storedsequence_normalized_digest"),
+        ("custom", "0004_antigenanalysisresult_sequence_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="antigenanalysisresult",
+            name="sequence",
+            field=models.ForeignKey(blank=True, help_text="서열 저장소의 입력 원문 (압축) 서열", null=True, on_delete=django.db.models.deletion.PROTECT, related_name="antigen_results", to="core.storedsequence", verbose_name="분석 서열"),
+        ),
+    ]
@@ -444,8 +444,19 @@ class AntigenAnalysisResult(BaseModel):
     )
 
     input_sequence = models.TextField(
+        blank=True,
         verbose_name="입력 서열",
-        help_text="분석된 단백질/DNA/RNA 서열"
+        help_text="분석된 단백질/DNA/RNA 서열 (저장 시 sequence 로 옮기고 비움, 백필 전 기존 행만 값 보유)"
+    )
+
+    sequence = models.ForeignKey(
+        'core.StoredSequence',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='antigen_results',
+        verbose_name="분석 서열",
+        help_text="서열 저장소의 입력 원문 (압축) 서열"
     )
 
     input_type = models.CharField(
@@ -470,3 +481,21 @@ class AntigenAnalysisResult(BaseModel):
 
     def __str__(self) -> str:
         return f"{self.patient.full_name} - {self.input_type} ({self.created_at.strftime('%Y-%m-%d')})"
+
+    def save(self, *args, **kwargs) -> None:
+        """입력 서열은 서열 저장소에 1번만 저장하고 FK 로 참조"""
+        if self.input_sequence:
+            from apps.core.services.sequence_store import intern_sequences
+
+            stored = intern_sequences([self.input_sequence]).get(self.input_sequence)
+            if stored is not None:
+                self.sequence = stored
+                self.input_sequence = ''
+        super().save(*args, **kwargs)
+
+    @property
+    def sequence_text(self) -> str:
+        """입력 서열 원문"""
+        if self.input_sequence:
+            return self.input_sequence
+        return self.sequence.text if self.sequence_id else ''
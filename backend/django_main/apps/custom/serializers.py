@@ -94,8 +94,15 @@ class PrescriptionSerializer(serializers.ModelSerializer):
 class AntigenAnalysisResultSerializer(serializers.ModelSerializer):
     """Antigen Analysis Result serializer."""
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
+    # Stored in the sequence store on save; read back from there
+    input_sequence = serializers.CharField()
 
     class Meta:
         model = AntigenAnalysisResult
         fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'sequence', 'created_at', 'updated_at']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['input_sequence'] = instance.sequence_text
+        return data
@@ -222,7 +222,7 @@ class AntigenAnalysisResultViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Antigen Analysis Result management.
     """
-    queryset = AntigenAnalysisResult.objects.all()
+    queryset = AntigenAnalysisResult.objects.select_related('patient', 'sequence')
     serializer_class = AntigenAnalysisResultSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = ['patient']
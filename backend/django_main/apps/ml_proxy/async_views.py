@@ -0,0 +1,393 @@
+"""
+ML 프록시 async view (ASGI)
+
+views.py 의 동기 프록시와 같은 URL / 요청 / 응답이지만 Flask 호출을 httpx 로 await 하므로
+worker 스레드를 잡고 있지 않습니다. ASYNC_PROXY_VIEWS=True 일 때 urls.py 가 이쪽을 연결하며
+ASGI worker (gunicorn -k uvicorn.workers.UvicornWorker neuronova.asgi:application) 로 서비스합니다.
+
+DB 작업(InferenceLog 버퍼 적재, PredictionTask)은 sync_to_async 로 실행합니다.
+재학습 / 이력 / 작업 상태 조회는 Flask 대기 시간이 길지 않거나 DB 위주라 동기 view 를 그대로 씁니다.
+"""
+import json
+import logging
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from apps.core.services.ml_gateway_async import async_ml_gateway
+from . import prediction_cache
+from .log_buffer import inference_log_buffer
+from .tasks import enqueue_prediction, task_status
+from .views import (
+    JOB_REPLICA_CACHE_KEY,
+    JOB_REPLICA_CACHE_TTL,
+    NDJSON_CONTENT_TYPE,
+    NOT_READY_CACHE_TTL,
+    PREDICTION_CACHE_HEADER,
+    READINESS_CACHE_KEY,
+    READINESS_CACHE_TTL,
+    _RawStreamingResponse,
+    _not_ready_response,
+    _record_raw_prediction,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _fetch_flask_readiness():
+    """Flask /ready 조회 → {"ready": bool, "status": str, ...}"""
+    try:
+        response = await async_ml_gateway.get('ready', '/ready')
+    except httpx.HTTPError as e:
+        return {"ready": False, "status": "unreachable", "error": str(e)}
+
+    # /ready 가 없는 이전 버전 Flask 서버는 살아있으면 ready 로 간주
+    if response.status_code == 404:
+        return {"ready": True, "status": "unknown"}
+
+    try:
+        state = response.json()
+    except ValueError:
+        state = {}
+    state['ready'] = response.status_code == 200
+    state.setdefault('status', 'ready' if state['ready'] else 'not_ready')
+    return state
+
+
+async def _flask_readiness(use_cache=True):
+    if use_cache:
+        state = await cache.aget(READINESS_CACHE_KEY)
+        if state is not None:
+            return state
+
+    state = await _fetch_flask_readiness()
+    ttl = READINESS_CACHE_TTL if state['ready'] else NOT_READY_CACHE_TTL
+    await cache.aset(READINESS_CACHE_KEY, state, ttl)
+    return state
+
+
+def _proxy_json(response, retry_after=True):
+    """Flask 응답을 상태 코드 그대로 JSON 으로 전달 (429 면 Retry-After 포함)"""
+    try:
+        body = response.json()
+    except ValueError:
+        return JsonResponse(
+            {"error": f"Invalid response from Flask server ({response.status_code})"},
+            status=502
+        )
+    proxied = JsonResponse(body, status=response.status_code, safe=False)
+    if retry_after and response.status_code == 429 and response.headers.get('Retry-After'):
+        proxied['Retry-After'] = response.headers['Retry-After']
+    return proxied
+
+
+def _connection_error(label, error):
+    if isinstance(error, httpx.TimeoutException):
+        return JsonResponse({"error": "Flask server timeout"}, status=504)
+    logger.error(f"{label} error: {str(error)}")
+    return JsonResponse(
+        {"error": f"Cannot connect to Flask server: {str(error)}"},
+        status=503
+    )
+
+
+def _parse_json(request):
+    try:
+        return json.loads(request.body), None
+    except json.JSONDecodeError:
+        return None, JsonResponse({"error": "Invalid JSON format"}, status=400)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def predict_proxy(request):
+    """
+    views.predict_proxy 의 async 버전 (JSON / NDJSON 스트리밍 / "async": true 작업 등록)
+    """
+    request_data, error = _parse_json(request)
+    if error:
+        return error
+
+    doctor_id = request_data.get('doctor_id')
+    patient_id = request_data.get('patient_id')
+    doctor_name = request_data.get('doctor_name') or (str(doctor_id) if doctor_id else None)
+    patient_name = request_data.get('patient_name') or (str(patient_id) if patient_id else None)
+    if not doctor_name or not patient_name:
+        return JsonResponse(
+            {"error": "doctor_name (or doctor_id) and patient_name (or patient_id) are required"},
+            status=400
+        )
+
+    run_async = request_data.pop('async', False) or request.GET.get('async') in ('1', 'true')
+    if run_async:
+        task = await sync_to_async(enqueue_prediction)(request_data, doctor_name, patient_name)
+        return JsonResponse(task_status(task, include_result=False), status=202)
+
+    readiness = await _flask_readiness()
+    if not readiness['ready']:
+        return _not_ready_response(readiness)
+
+    if NDJSON_CONTENT_TYPE in request.headers.get('Accept', ''):
+        return await _stream_predict_proxy(request.body, request_data, doctor_name, patient_name)
+
+    def raw_response(body, content_type, cache_status=None):
+        """
+        응답 bytes 는 그대로 전달하고, 서버가 응답을 닫을 때 파싱 + 저장
+        (ASGI handler 는 close() 를 sync_to_async 로 호출 → event loop 를 막지 않음)
+        """
+        async def relay():
+            yield body
+
+        raw = _RawStreamingResponse(
+            relay(),
+            status=200,
+            content_type=content_type,
+            on_sent=lambda: _record_raw_prediction(
+                request_data,
+                body,
+                doctor_name,
+                patient_name,
+                doctor_id=doctor_id,
+                patient_id=patient_id
+            )
+        )
+        raw['Content-Length'] = str(len(body))
+        if cache_status:
+            raw[PREDICTION_CACHE_HEADER] = cache_status
+        return raw
+
+    cache_key = await sync_to_async(prediction_cache.prediction_key)(
+        request_data, request.GET, prediction_cache.readiness_version(readiness), request.headers
+    )
+    leader = False
+    if cache_key is not None:
+        cached = await sync_to_async(prediction_cache.lookup)(cache_key)
+        cache_status = 'HIT'
+        if cached is None:
+            leader = await sync_to_async(prediction_cache.claim)(cache_key)
+            if not leader:
+                cached = await prediction_cache.await_for(cache_key)
+                cache_status = 'COALESCED'
+        if cached is not None:
+            return raw_response(cached['body'], cached['content_type'], cache_status)
+
+    try:
+        try:
+            response = await async_ml_gateway.post(
+                'predict',
+                '/api/predict',
+                content=request.body,
+                headers={'Content-Type': 'application/json'}
+            )
+        except httpx.HTTPError as e:
+            return _connection_error("Predict proxy", e)
+
+        if response.status_code != 200:
+            return _proxy_json(response)
+        if 'json' not in response.headers.get('Content-Type', ''):
+            return JsonResponse({"error": "Invalid response from Flask server"}, status=502)
+
+        if leader:
+            await sync_to_async(prediction_cache.store)(
+                cache_key, response.content, response.headers['Content-Type']
+            )
+    finally:
+        if leader:
+            await sync_to_async(prediction_cache.release)(cache_key)
+
+    return raw_response(
+        response.content,
+        response.headers['Content-Type'],
+        'MISS' if cache_key is not None else None
+    )
+
+
+async def _stream_predict_proxy(raw_body, request_data, doctor_name, patient_name):
+    """Flask NDJSON 스트림을 줄 단위로 흘려보내고 마지막 summary 줄만 InferenceLog 에 저장"""
+    try:
+        response = await async_ml_gateway.post(
+            'predict_stream',
+            '/api/predict',
+            content=raw_body,
+            headers={'Accept': NDJSON_CONTENT_TYPE, 'Content-Type': 'application/json'},
+            stream=True
+        )
+    except httpx.HTTPError as e:
+        return _connection_error("Predict stream proxy", e)
+
+    content_type = response.headers.get('Content-Type', '')
+    if response.status_code != 200 or NDJSON_CONTENT_TYPE not in content_type:
+        try:
+            await response.aread()
+        finally:
+            await async_ml_gateway.aclose(response)
+        return _proxy_json(response)
+
+    async def relay():
+        last_line = ''
+        try:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                last_line = line
+                yield (line + '\n').encode('utf-8')
+        finally:
+            await async_ml_gateway.aclose(response)
+            try:
+                summary = json.loads(last_line) if last_line else {}
+                await sync_to_async(inference_log_buffer.add, thread_sensitive=False)(
+                    doctor_name,
+                    patient_name,
+                    request_data,
+                    {"streamed": True, "summary": summary}
+                )
+            except Exception as log_error:
+                logger.error(f"Failed to log streamed inference: {str(log_error)}")
+
+    streaming_response = StreamingHttpResponse(relay(), content_type=NDJSON_CONTENT_TYPE)
+    streaming_response['X-Accel-Buffering'] = 'no'
+    streaming_response['Cache-Control'] = 'no-cache'
+    return streaming_response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def predict_person_proxy(request):
+    """views.predict_person_proxy 의 async 버전"""
+    request_data, error = _parse_json(request)
+    if error:
+        return error
+
+    doctor_name = request_data.get('doctor_name') or request_data.get('doctor_id')
+    patient_name = request_data.get('patient_name') or request_data.get('patient_id')
+    if not doctor_name or not patient_name:
+        return JsonResponse(
+            {"error": "doctor_name (or doctor_id) and patient_name (or patient_id) are required"},
+            status=400
+        )
+
+    readiness = await _flask_readiness()
+    if not readiness['ready']:
+        return _not_ready_response(readiness)
+
+    try:
+        response = await async_ml_gateway.post(
+            'predict_person', '/api/predict_person', json=request_data
+        )
+    except httpx.HTTPError as e:
+        return _connection_error("Predict person proxy", e)
+
+    proxied = _proxy_json(response)
+    if response.status_code != 200 or proxied.status_code != 200:
+        return proxied
+
+    flask_response_data = response.json()
+    await sync_to_async(inference_log_buffer.add, thread_sensitive=False)(
+        str(doctor_name), str(patient_name), request_data, flask_response_data
+    )
+    return proxied
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def explain_proxy(request):
+    """views.explain_proxy 의 async 버전"""
+    request_data, error = _parse_json(request)
+    if error:
+        return error
+
+    readiness = await _flask_readiness()
+    if not readiness['ready']:
+        return _not_ready_response(readiness)
+
+    try:
+        response = await async_ml_gateway.post('explain', '/api/explain', json=request_data)
+    except httpx.HTTPError as e:
+        return _connection_error("Explain proxy", e)
+    return _proxy_json(response)
+
+
+async def _simple_get(endpoint, path, label, params=None):
+    try:
+        response = await async_ml_gateway.get(endpoint, path, params=params)
+    except httpx.HTTPError as e:
+        return _connection_error(label, e)
+    return _proxy_json(response, retry_after=False)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def status_proxy(request):
+    return await _simple_get('status', '/api/health', "Status proxy")
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def model_info_proxy(request):
+    return await _simple_get('schema', '/api/schema', "Model info proxy")
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def example_data_proxy(request):
+    return await _simple_get(
+        'example_data', '/api/example_data', "Example data proxy", params=request.GET.dict()
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def ready_proxy(request):
+    from apps.core.services.ml_gateway import ml_gateway
+
+    state = {**await _flask_readiness(use_cache=False), 'replicas': ml_gateway.replica_states()}
+    if not state['ready']:
+        return _not_ready_response(state)
+    return JsonResponse(state, status=200)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def job_create_proxy(request):
+    """views.job_create_proxy 의 async 버전 (job_id → replica 고정 포함)"""
+    try:
+        response = await async_ml_gateway.post(
+            'jobs',
+            '/api/jobs',
+            content=request.body,
+            headers={'Content-Type': 'application/json'}
+        )
+    except httpx.HTTPError as e:
+        return _connection_error("Job create proxy", e)
+
+    proxied = _proxy_json(response)
+    if response.status_code < 400 and proxied.status_code < 400:
+        job_id = response.json().get('job_id')
+        if job_id:
+            await cache.aset(
+                JOB_REPLICA_CACHE_KEY.format(job_id=job_id),
+                response.extensions.get('ml_replica'),
+                JOB_REPLICA_CACHE_TTL
+            )
+    return proxied
+
+
+@csrf_exempt
+@require_http_methods(["GET", "DELETE"])
+async def job_detail_proxy(request, job_id):
+    """views.job_detail_proxy 의 async 버전"""
+    try:
+        response = await async_ml_gateway.request(
+            request.method,
+            'job_detail',
+            f"/api/jobs/{job_id}",
+            params=request.GET.dict(),
+            replica=await cache.aget(JOB_REPLICA_CACHE_KEY.format(job_id=job_id))
+        )
+    except httpx.HTTPError as e:
+        return _connection_error("Job detail proxy", e)
+    return _proxy_json(response, retry_after=False)
@@ -0,0 +1,130 @@
+"""
+동기(WSGI) vs async(ASGI) 프록시 동시성 벤치마크 도구
+
+- SlowStubServer: 응답마다 delay_ms 만큼 기다리는 가짜 Flask 추론 서버
+  (느린 추론 / DICOM 호출 흉내. /ready 는 바로 200)
+- run_load: 프록시 URL 에 동시 연결 concurrency 개로 total 건 요청 → 지연 percentile / 처리량
+
+management command: benchmark_proxy_concurrency
+"""
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from .traffic import percentile
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class SlowStubServer:
+    """모든 요청에 delay_ms 후 작은 JSON 을 돌려주는 Flask 대역"""
+
+    def __init__(self, host='127.0.0.1', port=0, delay_ms=500):
+        self.delay = delay_ms / 1000.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            wbufsize = 64 * 1024  # 헤더 + 본문을 한 번에 전송
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                if self.path.split('?')[0] != '/ready':
+                    time.sleep(stub.delay)
+                body = json.dumps({'ok': True, 'ready': True, 'stub': True}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _reply
+            do_POST = _reply
+
+        self.server = _StubHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run_load(url, method='GET', payload=None, concurrency=100, total=1000, timeout=120.0,
+             headers=None):
+    """
+    url 에 concurrency 개 동시 연결로 total 건 요청하고 결과 요약
+    (연결마다 keep-alive 세션 1개를 쓰는 thread 로 부하 생성)
+    """
+    latencies = []
+    statuses = Counter()
+    errors = Counter()
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+            session.headers.update(headers or {})
+        started = time.perf_counter()
+        try:
+            response = session.request(method.upper(), url, json=payload, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            with lock:
+                errors[type(e).__name__] += 1
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            statuses[str(response.status_code)] += 1
+            if response.status_code < 400:
+                latencies.append(elapsed_ms)
+            else:
+                errors[f"HTTP {response.status_code}"] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(total)))
+    wall_s = time.perf_counter() - started
+    ok = len(latencies)
+
+    def _round(value):
+        return round(value, 1) if value is not None else None
+
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'sent': total,
+        'ok': ok,
+        'errors': sum(errors.values()),
+        'status_counts': dict(statuses),
+        'error_counts': dict(errors),
+        'wall_s': round(wall_s, 3),
+        'throughput_rps': round(ok / wall_s, 2) if wall_s else 0.0,
+        'p50_ms': _round(percentile(latencies, 50)),
+        'p95_ms': _round(percentile(latencies, 95)),
+        'p99_ms': _round(percentile(latencies, 99)),
+        'max_ms': _round(max(latencies) if latencies else None),
+    }
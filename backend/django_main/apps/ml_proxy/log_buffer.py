@@ -0,0 +1,51 @@
+"""
+InferenceLog write-behind 버퍼
+
+요청 처리 중에는 InferenceLog 객체를 메모리 큐에 넣기만 하고 (INSERT 없음)
+background flusher thread 가 batch_size 건이 모이거나 flush_interval 초가 지나면
+bulk_create 로 한 번에 저장합니다. (큐 / flusher / 재시도 / backpressure 는 core.services.write_behind)
+
+- 저장 직전에 input_data 서열을 서열 저장소로 옮김 (dedupe_log_sequences)
+- 큐가 max_queue 를 넘으면 버리지 않고 add() 에서 바로 저장
+
+ML_INFERENCE_LOG_BUFFERED=False 면 기존처럼 요청 안에서 바로 저장합니다.
+"""
+from django.utils import timezone
+
+from apps.core.services.write_behind import WriteBehindBuffer
+
+from .models import InferenceLog, dedupe_log_sequences
+
+
+class InferenceLogBuffer(WriteBehindBuffer):
+    model = InferenceLog
+    settings_prefix = 'ML_INFERENCE_LOG'
+    thread_name = 'inference-log-flusher'
+
+    def add(self, doctor_name, patient_name, input_data, output_data):
+        """
+        InferenceLog 1건 적재 (created_at 은 지금 시각으로 고정)
+        버퍼를 쓰지 않는 설정이면 바로 저장하고 InferenceLog 반환, 버퍼에 넣었으면 None
+        """
+        log = InferenceLog(
+            doctor_name=doctor_name,
+            patient_name=patient_name,
+            input_data=input_data,
+            output_data=output_data,
+            created_at=timezone.now()
+        )
+        if self.put(log):
+            return None
+        log.save()
+        return log
+
+    def prepare(self, batch):
+        # 서열은 저장소로 옮긴 뒤 저장 (실패해 재시도할 때는 이미 sequence_ref 라 그대로)
+        dedupe_log_sequences(batch)
+
+    def describe(self, log):
+        return f"Doctor={log.doctor_name}, Patient={log.patient_name}"
+
+
+# Singleton instance
+inference_log_buffer = InferenceLogBuffer()
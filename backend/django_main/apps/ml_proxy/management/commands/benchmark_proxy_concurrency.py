@@ -0,0 +1,98 @@
+"""
+Management command to compare proxy concurrency: sync views under gunicorn (WSGI)
+vs async views under uvicorn workers (ASGI), against a slow stub Flask server.
+
+1) Start the stub (Flask stand-in that waits --stub-delay-ms per request):
+     python manage.py benchmark_proxy_concurrency --serve-stub --stub-port 9100 --stub-delay-ms 500
+
+2) Start both Django stacks pointing at the stub (same worker count):
+     FLASK_INFERENCE_URL=http://127.0.0.1:9100 \\
+       gunicorn neuronova.wsgi:application -w 2 -b 127.0.0.1:8001
+     FLASK_INFERENCE_URL=http://127.0.0.1:9100 ASYNC_PROXY_VIEWS=True \\
+       gunicorn neuronova.asgi:application -k uvicorn.workers.UvicornWorker -w 2 -b 127.0.0.1:8002
+
+3) Run the load:
+     python manage.py benchmark_proxy_concurrency \\
+       --target sync=http://127.0.0.1:8001 --target async=http://127.0.0.1:8002 \\
+       --path /ml/v1/model-info/ --concurrency 200 --requests 2000
+
+With a 500 ms upstream, a sync worker completes ~2 req/s per thread, while an
+async worker keeps every in-flight request waiting on the socket instead.
+
+The async gateway queues its per-call APIUsageLog rows in a write-behind buffer,
+so the async stack is not serialized on database writes. To see what the
+per-call INSERT would cost, add a third stack started with
+API_USAGE_LOG_BUFFERED=False and pass it as another --target.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ml_proxy.bench import SlowStubServer, run_load
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sync (WSGI) vs async (ASGI) proxy views under concurrent slow upstream calls'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--serve-stub', action='store_true',
+                            help='Only run the slow stub Flask server (blocks)')
+        parser.add_argument('--stub-port', type=int, default=9100)
+        parser.add_argument('--stub-delay-ms', type=int, default=500,
+                            help='Simulated inference latency of the stub')
+        parser.add_argument('--target', action='append', default=[],
+                            help='name=base_url of a running Django server (repeatable)')
+        parser.add_argument('--path', default='/ml/v1/model-info/',
+                            help='Proxy path to hit (GET), e.g. /ml/v1/model-info/')
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--payload', default=None,
+                            help='JSON body for POST paths (e.g. /ml/v1/predict/)')
+        parser.add_argument('--concurrency', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--timeout', type=float, default=120.0)
+        parser.add_argument('--json', action='store_true', help='Print the raw report as JSON')
+
+    def handle(self, *args, **options):
+        if options['serve_stub']:
+            stub = SlowStubServer(port=options['stub_port'], delay_ms=options['stub_delay_ms'])
+            self.stdout.write(
+                f"Stub Flask server on {stub.url} (delay {options['stub_delay_ms']} ms). Ctrl+C to stop."
+            )
+            try:
+                stub.serve_forever()
+            except KeyboardInterrupt:
+                stub.stop()
+            return
+
+        if not options['target']:
+            raise CommandError('At least one --target name=url is required (or --serve-stub)')
+
+        payload = json.loads(options['payload']) if options['payload'] else None
+        reports = {}
+        for target in options['target']:
+            name, _, base_url = target.partition('=')
+            if not base_url:
+                raise CommandError(f"Invalid --target {target!r} (expected name=url)")
+            url = base_url.rstrip('/') + options['path']
+            self.stdout.write(f"[{name}] {options['method']} {url} x{options['requests']} "
+                              f"@ concurrency {options['concurrency']} ...")
+            reports[name] = run_load(
+                url,
+                method=options['method'],
+                payload=payload,
+                concurrency=options['concurrency'],
+                total=options['requests'],
+                timeout=options['timeout'],
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(reports, indent=2, ensure_ascii=False))
+            return
+
+        header = f"{'target':<10}{'ok':>7}{'err':>6}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'wall_s':>9}"
+        self.stdout.write(header)
+        for name, r in reports.items():
+            self.stdout.write(
+                f"{name:<10}{r['ok']:>7}{r['errors']:>6}{r['throughput_rps']:>10}"
+                f"{str(r['p50_ms']):>9}{str(r['p95_ms']):>9}{str(r['p99_ms']):>9}{r['wall_s']:>9}"
+            )
@@ -0,0 +1,51 @@
+"""
+Management command to export anonymized InferenceLog payloads for replay.
+
+Identifying fields are always removed and sequences are scrambled by default
+(same length and alphabet); pass --keep-sequences only when the export stays
+inside the environment the logs came from. Within one export a repeated sequence
+always maps to the same replacement, so replay still sees the original
+dedup and cache hit rates.
+"""
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.ml_proxy.models import InferenceLog
+from apps.ml_proxy.traffic import export_records
+
+
+class Command(BaseCommand):
+    help = 'Export an anonymized sample of InferenceLog payloads as JSONL (for replay_inference_traffic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Output JSONL path')
+        parser.add_argument('--days', type=int, default=7, help='Only logs from the last N days (0 = all)')
+        parser.add_argument('--limit', type=int, default=1000, help='Maximum number of records')
+        parser.add_argument('--sample-rate', type=float, default=1.0, help='Random sampling ratio (0~1)')
+        parser.add_argument('--keep-sequences', action='store_true',
+                            help='Export the original sequences instead of random ones of the same length/alphabet')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        logs = InferenceLog.objects.order_by('created_at').only('input_data', 'created_at')
+        if options['days'] > 0:
+            logs = logs.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+
+        count = 0
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            records = export_records(
+                logs.iterator(chunk_size=500),
+                sample_rate=options['sample_rate'],
+                scramble_sequences=not options['keep_sequences'],
+                seed=options['seed'],
+            )
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += 1
+                if count >= options['limit']:
+                    break
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} records to {options['output']}"))
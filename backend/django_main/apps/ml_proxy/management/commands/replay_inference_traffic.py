@@ -0,0 +1,85 @@
+"""
+Management command to replay captured inference traffic and report latency/throughput.
+
+Against the Django proxy the replay sends Cache-Control: no-cache so every request
+reaches Flask (pass --use-cache to measure with the prediction cache). The proxy
+still writes an InferenceLog row per request, under the replay-doctor /
+replay-patient placeholder names.
+
+Latency is measured from each request's scheduled send time, so time spent
+waiting for a free worker thread counts against the server instead of being
+hidden. The report's send_rate section compares the target rate with the rate
+actually achieved and shows how far sends lagged behind schedule.
+"""
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ml_proxy.traffic import TrafficReplayer, load_records
+
+
+class Command(BaseCommand):
+    help = 'Replay exported inference traffic against the Flask server or the Django proxy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='JSONL file from export_inference_traffic')
+        parser.add_argument('--target', choices=['flask', 'django'], default='flask')
+        parser.add_argument('--url', default=None,
+                            help='Base URL (default: FLASK_INFERENCE_URL for flask, http://127.0.0.1:8000 for django)')
+        parser.add_argument('--rate', type=float, default=None,
+                            help='Fixed request rate (req/s). Overrides --speedup')
+        parser.add_argument('--speedup', type=float, default=1.0,
+                            help='Replay captured arrival times N times faster')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--timeout', type=float, default=60)
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument('--report', default=None, help='Write JSON report to this path')
+        parser.add_argument('--use-cache', action='store_true',
+                            help='Let the Django proxy serve cached predictions (default: bypass the cache)')
+
+    def handle(self, *args, **options):
+        try:
+            records = load_records(options['input'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {options['input']}: {e}")
+        if options['limit']:
+            records = records[:options['limit']]
+        if not records:
+            raise CommandError('No records to replay')
+
+        target = options['target']
+        url = options['url'] or (
+            os.getenv('FLASK_INFERENCE_URL', 'http://127.0.0.1:9000')
+            if target == 'flask' else 'http://127.0.0.1:8000'
+        )
+        replayer = TrafficReplayer(
+            url,
+            target=target,
+            api_key=os.getenv('FLASK_API_KEY', '') if target == 'flask' else '',
+            concurrency=options['concurrency'],
+            timeout=options['timeout'],
+            use_cache=options['use_cache'],
+        )
+
+        self.stdout.write(f"Replaying {len(records)} requests to {url} ({target})...")
+        report = replayer.run(records, rate=options['rate'], speedup=options['speedup'])
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        self.stdout.write(output)
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                f.write(output)
+
+        style = self.style.SUCCESS if report['errors'] == 0 else self.style.WARNING
+        latency = report['latency']
+        send_rate = report['send_rate']
+        self.stdout.write(style(
+            f"ok={report['ok']}/{report['sent']} errors={report['errors']} "
+            f"rps={report['throughput_rps']} p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms "
+            f"p99={latency['p99_ms']}ms"
+        ))
+        self.stdout.write(
+            f"send rate target={send_rate['target_rps']}/s achieved={send_rate['achieved_rps']}/s "
+            f"lag p95={send_rate['lag']['p95_ms']}ms max={send_rate['lag']['max_ms']}ms"
+        )
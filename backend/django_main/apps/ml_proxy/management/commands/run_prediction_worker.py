@@ -0,0 +1,59 @@
+"""
+Management command to process queued asynchronous predictions (PredictionTask).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.ml_proxy.tasks import claim_next_task, requeue_stale_tasks, run_task, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Run a worker that executes queued async predictions (Flask call, InferenceLog, notification)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--max-tasks', type=int, default=0,
+                            help='Exit after processing N tasks (0 = run forever)')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue once and exit')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Requeue tasks left running longer than N seconds (crashed worker)')
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        processed = 0
+        last_stale_check = 0.0
+        self.stdout.write(f"Prediction worker {worker} started")
+
+        try:
+            while True:
+                if time.monotonic() - last_stale_check > 60:
+                    requeued, failed = requeue_stale_tasks(options['stale_after'])
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale task(s)"))
+                    if failed:
+                        self.stdout.write(self.style.ERROR(
+                            f"Failed {failed} stale task(s) that used all attempts"
+                        ))
+                    last_stale_check = time.monotonic()
+
+                task = claim_next_task(worker)
+                if task is None:
+                    if options['once']:
+                        break
+                    close_old_connections()
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                run_task(task)
+                processed += 1
+                self.stdout.write(f"{task.task_id} -> {task.status}")
+                if options['max_tasks'] and processed >= options['max_tasks']:
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} task(s)"))
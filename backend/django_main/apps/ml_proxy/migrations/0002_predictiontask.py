@@ -0,0 +1,44 @@
+# Generated by Django 5.0 on 2026-10-19 11:02
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ml_proxy", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PredictionTask",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("task_id", models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name="작업 ID")),
+                ("doctor_name", models.CharField(max_length=100, verbose_name="담당 의사 이름")),
+                ("patient_name", models.CharField(max_length=100, verbose_name="환자 이름")),
+                ("input_data", models.JSONField(help_text="Flask ML 서버로 전송할 추론 요청 데이터 (전체 Payload)", verbose_name="입력 데이터")),
+                ("status", models.CharField(choices=[("queued", "대기"), ("running", "실행 중"), ("succeeded", "완료"), ("failed", "실패")], default="queued", max_length=20, verbose_name="상태")),
+                ("attempts", models.PositiveSmallIntegerField(default=0, verbose_name="시도 횟수")),
+                ("available_at", models.DateTimeField(default=django.utils.timezone.now, help_text="재시도 대기 중이면 이 시각 이후에 다시 실행", verbose_name="실행 가능 시각")),
+                ("worker", models.CharField(blank=True, max_length=100, verbose_name="처리 worker")),
+                ("http_status", models.IntegerField(blank=True, null=True, verbose_name="Flask 응답 코드")),
+                ("result", models.JSONField(blank=True, null=True, verbose_name="추론 결과")),
+                ("error", models.TextField(blank=True, verbose_name="에러 메시지")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="등록 일시")),
+                ("started_at", models.DateTimeField(blank=True, null=True, verbose_name="시작 일시")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="종료 일시")),
+                ("inference_log", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="tasks", to="ml_proxy.inferencelog", verbose_name="추론 로그")),
+            ],
+            options={
+                "verbose_name": "ML 비동기 추론 작업",
+                "verbose_name_plural": "ML 비동기 추론 작업",
+                "db_table": "ml_prediction_task",
+                "ordering": ["-created_at"],
+                "indexes": [models.Index(fields=["status", "available_at"], name="ml_predicti_status_5adef1_idx")],
+            },
+        ),
+    ]
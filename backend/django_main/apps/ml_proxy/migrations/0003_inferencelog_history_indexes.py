@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ml_proxy", "0002_predictiontask"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="inferencelog",
+            name="ml_inferenc_doctor__8acd9f_idx",
+        ),
+        migrations.AddIndex(
+            model_name="inferencelog",
+            index=models.Index(fields=["doctor_name", "patient_name", "-created_at"], name="ml_inferenc_doctor__c9a756_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="inferencelog",
+            index=models.Index(fields=["doctor_name", "-created_at"], name="ml_inferenc_doctor__a2b285_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="inferencelog",
+            index=models.Index(fields=["patient_name", "-created_at"], name="ml_inferenc_patient_ee31b4_idx"),
+        ),
+    ]
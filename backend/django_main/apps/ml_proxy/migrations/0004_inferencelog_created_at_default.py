@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 13:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ml_proxy", "0003_inferencelog_history_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="inferencelog",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text="추론 기록이 생성된 시간", verbose_name="생성 일시"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-19 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_storedsequence"),
+        ("ml_proxy", "0004_inferencelog_created_at_default"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inferencelog",
+            name="sequence",
+            field=models.ForeignKey(blank=True, help_text="payload 의 대표 서열 (서열 저장소)", null=True, on_delete=django.db.models.deletion.PROTECT, related_name="inference_logs", to="core.storedsequence", verbose_name="분석 서열"),
+        ),
+    ]
@@ -1,4 +1,7 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 
 
 class InferenceLog(models.Model):
@@ -26,8 +29,21 @@ class InferenceLog(models.Model):
         verbose_name="출력 데이터",
         help_text="Flask ML 서버로부터 받은 추론 결과 데이터"
     )
+    # input_data 의 긴 sequence 값은 core.StoredSequence 에 1번만 저장하고 "sequence_ref" 로 대체
+    # (payload 의 서열이 1종류면 그 서열을 FK 로도 연결 → 같은 서열의 이전 분석 조회)
+    sequence = models.ForeignKey(
+        'core.StoredSequence',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='inference_logs',
+        verbose_name="분석 서열",
+        help_text="payload 의 대표 서열 (서열 저장소)"
+    )
+    # write-behind 버퍼로 나중에 bulk_create 되므로 auto_now_add 대신 적재 시각을 직접 넣음
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name="생성 일시",
         help_text="추론 기록이 생성된 시간"
     )
@@ -37,10 +53,112 @@ class InferenceLog(models.Model):
         verbose_name = 'ML 추론 로그'
         verbose_name_plural = 'ML 추론 로그'
         ordering = ['-created_at']
+        # history_view: 의사 / 환자 / 기간 필터 + (created_at, id) 최신순 keyset 페이지
+        # (InnoDB 보조 인덱스에는 PK(id) 가 뒤에 붙으므로 (…, created_at) 로 정렬까지 인덱스로 처리)
         indexes = [
-            models.Index(fields=['doctor_name', 'patient_name']),
+            models.Index(fields=['doctor_name', 'patient_name', '-created_at']),
+            models.Index(fields=['doctor_name', '-created_at']),
+            models.Index(fields=['patient_name', '-created_at']),
             models.Index(fields=['-created_at']),
         ]
 
     def __str__(self):
         return f"{self.doctor_name} - {self.patient_name} ({self.created_at.strftime('%Y-%m-%d %H:%M')})"
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            dedupe_log_sequences([self])
+        super().save(*args, **kwargs)
+
+    def expanded_input_data(self, resolver=None):
+        """sequence_ref 를 원래 서열로 되돌린 input_data"""
+        from apps.core.services.sequence_store import SequenceResolver
+
+        return (resolver or SequenceResolver()).expand(self.input_data)
+
+
+def dedupe_log_sequences(logs):
+    """
+    저장 전 InferenceLog 들의 input_data 서열을 서열 저장소로 옮김 (bulk_create 전에 호출)
+    이미 sequence_ref 로 바뀐 payload 는 그대로
+    """
+    from apps.core.services.sequence_store import dedupe_payloads
+
+    logs = [log for log in logs if isinstance(log.input_data, (dict, list))]
+    if not logs:
+        return
+    for log, (payload, primary) in zip(logs, dedupe_payloads([log.input_data for log in logs])):
+        log.input_data = payload
+        if primary is not None and log.sequence_id is None:
+            log.sequence = primary
+
+
+class PredictionTask(models.Model):
+    """
+    비동기 추론 요청 큐 (DB 기반)
+    웹 요청은 task 를 등록만 하고 바로 반환하며,
+    run_prediction_worker 가 Flask 호출 + 결과 저장 + 알림을 처리합니다.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, '대기'),
+        (STATUS_RUNNING, '실행 중'),
+        (STATUS_SUCCEEDED, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+
+    task_id = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+        verbose_name="작업 ID"
+    )
+    doctor_name = models.CharField(max_length=100, verbose_name="담당 의사 이름")
+    patient_name = models.CharField(max_length=100, verbose_name="환자 이름")
+    input_data = models.JSONField(
+        verbose_name="입력 데이터",
+        help_text="Flask ML 서버로 전송할 추론 요청 데이터 (전체 Payload)"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name="상태"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="시도 횟수")
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="실행 가능 시각",
+        help_text="재시도 대기 중이면 이 시각 이후에 다시 실행"
+    )
+    worker = models.CharField(max_length=100, blank=True, verbose_name="처리 worker")
+    http_status = models.IntegerField(null=True, blank=True, verbose_name="Flask 응답 코드")
+    result = models.JSONField(null=True, blank=True, verbose_name="추론 결과")
+    error = models.TextField(blank=True, verbose_name="에러 메시지")
+    inference_log = models.ForeignKey(
+        InferenceLog,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tasks',
+        verbose_name="추론 로그"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="등록 일시")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="시작 일시")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="종료 일시")
+
+    class Meta:
+        db_table = 'ml_prediction_task'
+        verbose_name = 'ML 비동기 추론 작업'
+        verbose_name_plural = 'ML 비동기 추론 작업'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} [{self.status}] {self.doctor_name} - {self.patient_name}"
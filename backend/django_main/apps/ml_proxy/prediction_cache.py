@@ -0,0 +1,168 @@
+"""
+Gateway 예측 결과 캐시 (Redis) + singleflight
+
+- key: 추론 결과에 영향을 주는 payload 필드만 정렬해 만든 JSON 의 sha256
+       + 가중치 버전 (Flask /ready 의 weights_version) + 캐시 세대(generation)
+- 동시에 같은 요청이 오면 lock(cache.add) 을 잡은 1건만 Flask 로 보내고
+  나머지는 결과가 캐시에 들어올 때까지 기다렸다가 그대로 사용 (gunicorn worker / 서버 간에도 공유)
+- 재학습 / 모델 재로딩 시 invalidate() 로 세대를 올려 이전 항목을 한꺼번에 무효화
+  (이전 세대 항목은 TTL 로 자연 소멸)
+- 요청에 Cache-Control: no-cache (또는 no-store) 가 있으면 캐시를 조회/저장하지 않음
+  (replay_inference_traffic 의 부하 측정처럼 매 요청이 실제로 Flask 까지 가야 하는 경우)
+
+캐시 항목은 Flask 응답 bytes 그대로 저장하므로 hit 때도 재직렬화 없이 전달합니다.
+"""
+import asyncio
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+ENTRY_KEY = 'ml_proxy:prediction:{generation}:{digest}'
+LOCK_KEY = 'ml_proxy:prediction_lock:{generation}:{digest}'
+GENERATION_KEY = 'ml_proxy:prediction_generation'
+
+# /api/predict 결과를 바꾸는 필드 (doctor / patient / priority / deadline_ms 등은 제외)
+INFERENCE_FIELDS = (
+    'id',
+    'sequence',
+    'items',
+    'seq_type',
+    'frame',
+    'stop_at_stop',
+    'task3_threshold',
+    'organism_hint',
+    'early_exit',
+    'mc_samples',
+    'view',
+    'fields',
+)
+# body 대신 query 로도 줄 수 있는 응답 projection
+INFERENCE_QUERY_FIELDS = ('view', 'fields')
+
+POLL_INTERVAL_MIN = 0.02
+POLL_INTERVAL_MAX = 0.25
+
+
+def cache_ttl():
+    return getattr(settings, 'ML_PREDICTION_CACHE_TTL', 0)
+
+
+def wait_timeout():
+    return getattr(settings, 'ML_PREDICTION_CACHE_WAIT', 60)
+
+
+def _generation():
+    return cache.get(GENERATION_KEY, 0)
+
+
+def readiness_version(readiness):
+    """
+    /ready 응답에서 캐시 key 용 버전 선택
+    model_version 은 backbone 이름이라 재학습해도 같음 → 가중치 기준 weights_version 우선
+    (weights_version 이 없는 이전 Flask 서버는 model_version 으로 대체)
+    """
+    return readiness.get('weights_version') or readiness.get('model_version')
+
+
+def bypass_requested(headers):
+    """요청 헤더 Cache-Control 에 no-cache / no-store 가 있으면 True"""
+    if not headers:
+        return False
+    directives = {
+        part.strip().lower() for part in headers.get('Cache-Control', '').split(',')
+    }
+    return bool(directives & {'no-cache', 'no-store'})
+
+
+def prediction_key(request_data, query=None, model_version=None, headers=None):
+    """
+    캐시 key (digest + 세대) 반환
+    캐시가 꺼져 있거나, 요청이 캐시를 건너뛰라고 했거나, 추론 입력이 없으면 None
+    """
+    if cache_ttl() <= 0 or bypass_requested(headers):
+        return None
+
+    relevant = {
+        field: request_data[field]
+        for field in INFERENCE_FIELDS
+        if request_data.get(field) is not None
+    }
+    if 'sequence' not in relevant and 'items' not in relevant:
+        return None
+    for field in INFERENCE_QUERY_FIELDS:
+        if field not in relevant and query is not None and query.get(field):
+            relevant[field] = query.get(field)
+
+    canonical = json.dumps(
+        {'model_version': model_version, 'payload': relevant},
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+        default=str
+    )
+    digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    return {'generation': _generation(), 'digest': digest}
+
+
+def lookup(key):
+    """캐시된 응답 {"body": bytes, "content_type": str} 또는 None"""
+    return cache.get(ENTRY_KEY.format(**key))
+
+
+def claim(key):
+    """singleflight lock 획득 (성공한 요청만 Flask 로 보냄)"""
+    return cache.add(LOCK_KEY.format(**key), 1, wait_timeout() + 5)
+
+
+def release(key):
+    cache.delete(LOCK_KEY.format(**key))
+
+
+def store(key, body, content_type):
+    cache.set(
+        ENTRY_KEY.format(**key),
+        {'body': body, 'content_type': content_type},
+        cache_ttl()
+    )
+
+
+def wait_for(key, timeout=None):
+    """
+    lock 을 가진 요청의 결과를 기다림
+    결과가 들어오면 반환, lock 이 풀렸는데 결과가 없으면 (실패) 또는 timeout 이면 None
+    """
+    deadline = time.monotonic() + (wait_timeout() if timeout is None else timeout)
+    interval = POLL_INTERVAL_MIN
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        entry = lookup(key)
+        if entry is not None:
+            return entry
+        if cache.get(LOCK_KEY.format(**key)) is None:
+            return None
+        interval = min(interval * 2, POLL_INTERVAL_MAX)
+    return None
+
+
+async def await_for(key, timeout=None):
+    """wait_for 의 async 버전 (event loop 를 막지 않음)"""
+    deadline = time.monotonic() + (wait_timeout() if timeout is None else timeout)
+    interval = POLL_INTERVAL_MIN
+    while time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+        entry = await cache.aget(ENTRY_KEY.format(**key))
+        if entry is not None:
+            return entry
+        if await cache.aget(LOCK_KEY.format(**key)) is None:
+            return None
+        interval = min(interval * 2, POLL_INTERVAL_MAX)
+    return None
+
+
+def invalidate():
+    """세대를 올려 모든 캐시 항목 무효화 → 새 세대 번호"""
+    cache.add(GENERATION_KEY, 0, None)
+    return cache.incr(GENERATION_KEY)
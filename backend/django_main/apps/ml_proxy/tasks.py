@@ -0,0 +1,293 @@
+"""
+예측 후처리 + DB 기반 비동기 추론 큐
+
+- record_prediction: InferenceLog 저장, PatientPredictionResult 생성, 환자 알림 (commit 후)
+  (동기 predict_proxy 와 worker 가 공유. predict_proxy 는 InferenceLog 를 버퍼에 넣음)
+- enqueue_prediction / claim_next_task / run_task: PredictionTask 큐
+  웹 요청은 등록만 하고 바로 task_id 를 반환하며,
+  `python manage.py run_prediction_worker` 가 Flask 호출과 후처리를 맡습니다.
+"""
+import logging
+import os
+import socket
+from datetime import timedelta
+
+import requests
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.services.ml_gateway import ml_gateway
+from .log_buffer import inference_log_buffer
+from .models import InferenceLog, PredictionTask
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 5
+# Flask 가 잠시 받을 수 없는 상태 (admission 거절 / warm-up) → 재시도
+RETRYABLE_STATUS = (429, 502, 503, 504)
+
+
+def record_prediction(request_data, flask_response_data, doctor_name, patient_name,
+                      doctor_id=None, patient_id=None, buffered=False):
+    """
+    추론 결과를 InferenceLog 에 저장하고, 가능하면 PatientPredictionResult 생성 + 알림
+    buffered=True 면 InferenceLog 는 write-behind 버퍼에 넣고 None 반환 (요청 경로용)
+    """
+    if buffered:
+        inference_log = inference_log_buffer.add(
+            doctor_name, patient_name, request_data, flask_response_data
+        )
+    else:
+        inference_log = InferenceLog.objects.create(
+            doctor_name=doctor_name,
+            patient_name=patient_name,
+            input_data=request_data,
+            output_data=flask_response_data
+        )
+
+    # 요청 경로에서는 건별 INFO 로그도 생략 (flusher 가 batch 단위로 기록)
+    (logger.debug if buffered else logger.info)(
+        f"Inference logged: Doctor={doctor_name}, Patient={patient_name}"
+    )
+
+    # PatientPredictionResult 생성 (선택적)
+    # patient_id와 encounter_id가 제공된 경우에만 생성
+    if patient_id and request_data.get('encounter_id'):
+        try:
+            from apps.custom.models import PatientPredictionResult
+            from apps.emr.models import Patient, Encounter
+            from apps.custom.models import Doctor
+
+            patient = Patient.objects.get(pk=patient_id)
+            encounter = Encounter.objects.get(pk=request_data.get('encounter_id'))
+
+            # Optional: Get doctor if doctor_id provided
+            doctor = None
+            if doctor_id:
+                try:
+                    doctor = Doctor.objects.get(user_id=doctor_id)
+                except Doctor.DoesNotExist:
+                    pass
+
+            # Extract prediction data from Flask response
+            # Assuming Flask returns: {"predictions": {...}, "confidence": 0.95, ...}
+            model_name = flask_response_data.get('model_name', 'NeuroNova_Brain_v1.0')
+            model_version = flask_response_data.get('model_version', '1.0')
+
+            # Get main prediction class (highest probability)
+            predictions = flask_response_data.get('predictions', {})
+            if predictions:
+                # Find class with highest probability
+                pred_class = max(predictions.items(), key=lambda x: x[1])[0]
+                confidence = max(predictions.values())
+            else:
+                pred_class = 'UNKNOWN'
+                confidence = 0.0
+
+            prediction_result = PatientPredictionResult.objects.create(
+                encounter=encounter,
+                patient=patient,
+                doctor=doctor,
+                model_name=model_name,
+                model_version=model_version,
+                prediction_class=pred_class,
+                confidence_score=confidence,
+                probabilities=predictions,
+                xai_image_path=flask_response_data.get('xai_path', ''),
+                feature_importance=flask_response_data.get('feature_importance', {})
+            )
+
+            logger.info(f"PatientPredictionResult created for patient {patient_id}")
+
+            # Send notification to patient
+            # commit 후에 발송: worker 후처리가 실패해 되돌려지면 (재시도) 알림도 보내지 않음
+            transaction.on_commit(lambda: _notify_diagnosis_ready(prediction_result))
+        except Exception as pred_error:
+            logger.error(f"Failed to create PatientPredictionResult: {str(pred_error)}")
+            # Don't fail the request if prediction creation fails
+
+    return inference_log
+
+
+def _notify_diagnosis_ready(prediction_result):
+    from apps.core.services.notification_service import notification_service
+
+    try:
+        notification_service.notify_diagnosis_ready(prediction_result)
+    except Exception as notify_error:
+        logger.error(f"Failed to notify diagnosis ready: {str(notify_error)}")
+
+
+# ---------------------------------------------------------------- 큐
+
+def enqueue_prediction(request_data, doctor_name, patient_name):
+    return PredictionTask.objects.create(
+        doctor_name=str(doctor_name),
+        patient_name=str(patient_name),
+        input_data=request_data,
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_task(worker=''):
+    """
+    실행 가능한 가장 오래된 task 1건을 running 으로 바꿔 반환 (없으면 None)
+    여러 worker 가 동시에 돌아도 같은 task 를 가져가지 않도록 row lock + skip_locked
+    """
+    with transaction.atomic():
+        task = (
+            PredictionTask.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=PredictionTask.STATUS_QUEUED, available_at__lte=timezone.now())
+            .order_by('available_at', 'id')
+            .first()
+        )
+        if task is None:
+            return None
+        task.status = PredictionTask.STATUS_RUNNING
+        task.attempts += 1
+        task.worker = worker
+        task.started_at = timezone.now()
+        task.save(update_fields=['status', 'attempts', 'worker', 'started_at'])
+    return task
+
+
+def requeue_stale_tasks(stale_after_seconds):
+    """
+    worker 가 죽어 running 으로 남은 task 를 다시 대기열로
+    시도 횟수(MAX_ATTEMPTS)를 다 쓴 task 는 다시 돌리지 않고 failed 로 종료
+    (매번 worker 를 죽이는 입력이 무한히 재시도되지 않도록)
+    반환: (다시 대기열로 보낸 수, failed 로 종료한 수)
+    """
+    now = timezone.now()
+    stale = PredictionTask.objects.filter(
+        status=PredictionTask.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=stale_after_seconds),
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=PredictionTask.STATUS_FAILED,
+        finished_at=now,
+        error=f"Worker stopped while running the task ({MAX_ATTEMPTS} attempts used)",
+    )
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(
+        status=PredictionTask.STATUS_QUEUED,
+        available_at=now,
+    )
+    return requeued, failed
+
+
+def _finish(task, status, **fields):
+    task.status = status
+    task.finished_at = timezone.now()
+    for name, value in fields.items():
+        setattr(task, name, value)
+    task.save()
+
+
+def _retry_or_fail(task, error, http_status=None, result=None, retry_after=None):
+    if task.attempts < MAX_ATTEMPTS:
+        try:
+            delay = int(retry_after) if retry_after else RETRY_DELAY_SECONDS * task.attempts
+        except (TypeError, ValueError):
+            delay = RETRY_DELAY_SECONDS * task.attempts
+        task.status = PredictionTask.STATUS_QUEUED
+        task.available_at = timezone.now() + timedelta(seconds=delay)
+        task.error = error
+        task.http_status = http_status
+        task.save(update_fields=['status', 'available_at', 'error', 'http_status'])
+        logger.warning(f"Prediction task {task.task_id} requeued in {delay}s: {error}")
+        return
+    _finish(task, PredictionTask.STATUS_FAILED, error=error, http_status=http_status, result=result)
+    logger.error(f"Prediction task {task.task_id} failed: {error}")
+
+
+def run_task(task):
+    """claim 된 task 1건 실행: Flask 추론 → 결과 저장 → 알림"""
+    request_data = task.input_data
+    try:
+        response = ml_gateway.post('predict', '/api/predict', json=request_data)
+    except requests.exceptions.RequestException as e:
+        _retry_or_fail(task, f"Flask request error: {type(e).__name__}: {e}")
+        return task
+
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+
+    if response.status_code in RETRYABLE_STATUS:
+        _retry_or_fail(
+            task,
+            f"Flask server returned {response.status_code}",
+            http_status=response.status_code,
+            result=body,
+            retry_after=response.headers.get('Retry-After'),
+        )
+        return task
+    if response.status_code >= 400 or body is None:
+        _finish(
+            task,
+            PredictionTask.STATUS_FAILED,
+            error=f"Flask server error: {response.status_code}",
+            http_status=response.status_code,
+            result=body,
+        )
+        return task
+
+    # 결과 저장이 실패하면 task 가 running 으로 남지 않도록 재시도 / 실패 처리
+    # (atomic: 재시도 때 InferenceLog 가 중복 저장되지 않게 이번 시도의 저장분은 되돌림)
+    try:
+        with transaction.atomic():
+            inference_log = record_prediction(
+                request_data,
+                body,
+                task.doctor_name,
+                task.patient_name,
+                doctor_id=request_data.get('doctor_id'),
+                patient_id=request_data.get('patient_id'),
+            )
+            _finish(
+                task,
+                PredictionTask.STATUS_SUCCEEDED,
+                error='',
+                http_status=response.status_code,
+                result=body,
+                inference_log=inference_log,
+            )
+    except Exception as e:
+        logger.exception(f"Prediction task {task.task_id} post-processing failed")
+        # 되돌린 _finish 가 메모리에 남긴 값 초기화
+        task.status = PredictionTask.STATUS_RUNNING
+        task.finished_at = None
+        task.inference_log = None
+        _retry_or_fail(
+            task,
+            f"Post-processing error: {type(e).__name__}: {e}",
+            http_status=response.status_code,
+            result=body,
+        )
+    return task
+
+
+def task_status(task, include_result=True):
+    data = {
+        'task_id': str(task.task_id),
+        'status': task.status,
+        'attempts': task.attempts,
+        'created_at': task.created_at.isoformat(),
+        'started_at': task.started_at.isoformat() if task.started_at else None,
+        'finished_at': task.finished_at.isoformat() if task.finished_at else None,
+        'status_url': f"/ml/v1/tasks/{task.task_id}/",
+    }
+    if task.error:
+        data['error'] = task.error
+    if task.inference_log_id:
+        data['inference_log_id'] = task.inference_log_id
+    if include_result and task.status in (PredictionTask.STATUS_SUCCEEDED, PredictionTask.STATUS_FAILED):
+        data['http_status'] = task.http_status
+        data['result'] = task.result
+    return data
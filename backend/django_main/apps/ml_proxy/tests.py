@@ -1,3 +1,658 @@
-from django.test import TestCase
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps.core.models import StoredSequence
+from apps.core.services.sequence_store import store_report
+
+from . import async_views, prediction_cache, tasks, views
+from .log_buffer import InferenceLogBuffer
+from .models import InferenceLog, PredictionTask
+from .tasks import MAX_ATTEMPTS, claim_next_task, enqueue_prediction, requeue_stale_tasks, run_task
+from .traffic import (
+    TrafficReplayer, anonymize_payload, detect_endpoint, percentile, schedule, scramble_secret,
+)
+
+
+class TrafficCaptureTests(SimpleTestCase):
+    def test_anonymize_removes_identifiers_recursively(self):
+        payload = {
+            'doctor_name': '김의사',
+            'patient_id': 3,
+            'task3_threshold': 0.5,
+            'items': [{'id': 'S1', 'sequence': 'MKV', 'seq_type': 'protein'}],
+        }
+        cleaned = anonymize_payload(payload)
+        self.assertEqual(cleaned, {
+            'task3_threshold': 0.5,
+            'items': [{'sequence': 'MKV', 'seq_type': 'protein'}],
+        })
+
+    def test_scramble_keeps_length_and_alphabet(self):
+        payload = {'sequence': 'ATGCGTACGTTAG'}
+        cleaned = anonymize_payload(payload, scramble_sequences=True, rng=random.Random(0))
+        self.assertEqual(len(cleaned['sequence']), len(payload['sequence']))
+        self.assertTrue(set(cleaned['sequence']) <= set('ACGT'))
+
+    def test_scramble_is_consistent_within_an_export(self):
+        protein = 'MKTAYIAKQRQISFVKSHFSRQ'
+        payloads = [
+            {'sequence': protein, 'items': [{'sequence': protein}, {'sequence': 'MKV'}]},
+            {'sequence': protein.lower()},
+        ]
+        secret = scramble_secret(random.Random(0))
+        first, second = [anonymize_payload(p, scramble_sequences=True, secret=secret) for p in payloads]
+
+        self.assertEqual(first['sequence'], first['items'][0]['sequence'])
+        self.assertEqual(first['sequence'], second['sequence'])
+        self.assertNotEqual(first['sequence'], first['items'][1]['sequence'])
+        self.assertNotEqual(first['sequence'], protein)
+
+    def test_scramble_ignores_fasta_header_and_whitespace(self):
+        cleaned = anonymize_payload(
+            {'sequence': '>chr1 Homo sapiens\nATGCGT\nACG TTAG\n'},
+            scramble_sequences=True, rng=random.Random(0),
+        )
+        self.assertEqual(len(cleaned['sequence']), 13)
+        self.assertTrue(set(cleaned['sequence']) <= set('ACGT'))
+
+    def test_django_replay_bypasses_prediction_cache_by_default(self):
+        session = TrafficReplayer('http://proxy', target='django')._session()
+        self.assertTrue(prediction_cache.bypass_requested(session.headers))
+        cached = TrafficReplayer('http://proxy', target='django', use_cache=True)._session()
+        self.assertFalse(prediction_cache.bypass_requested(cached.headers))
+
+    def test_replay_latency_includes_time_behind_schedule(self):
+        def slow_post(*args, **kwargs):
+            time.sleep(0.05)
+            return mock.Mock(status_code=200)
+
+        replayer = TrafficReplayer('http://flask', concurrency=1)
+        replayer._session = mock.Mock(return_value=mock.Mock(post=slow_post))
+        records = [{'endpoint': 'predict', 'payload': {'sequence': 'MKV'}}] * 5
+        report = replayer.run(records, rate=100)
+
+        # 1 thread 가 50ms 씩 걸리므로 뒤 요청은 큐에서 기다린 시간만큼 늦게 전송됨
+        self.assertLess(report['service_latency']['p99_ms'], 150)
+        self.assertGreater(report['latency']['max_ms'], 150)
+        self.assertGreater(report['send_rate']['lag']['max_ms'], 100)
+        self.assertEqual(report['send_rate']['target_rps'], 100.0)
+        self.assertLess(report['send_rate']['achieved_rps'], 30)
+
+    def test_detect_endpoint(self):
+        self.assertEqual(detect_endpoint({'samples': []}), 'predict_person')
+        self.assertEqual(detect_endpoint({'sequence': 'MKV'}), 'predict')
+
+    def test_percentile_and_schedule(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2.5)
+        self.assertIsNone(percentile([], 95))
+        records = [{'offset_s': 0}, {'offset_s': 10}, {'offset_s': 20}]
+        self.assertEqual(schedule(records, speedup=10), [0.0, 1.0, 2.0])
+        self.assertEqual(schedule(records, rate=2), [0.0, 0.5, 1.0])
+
+
+def _flask_response(status, body, headers=None):
+    return mock.Mock(status_code=status, json=mock.Mock(return_value=body), headers=headers or {})
+
+
+RAW_PREDICTION = b'{"ok": true, "predictions": {"AD": 0.9}}'
+
+
+def _raw_flask_response(status, content, headers=None):
+    return mock.Mock(
+        status_code=status,
+        content=content,
+        headers={'Content-Type': 'application/json', **(headers or {})}
+    )
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+PREDICT_BODY = {'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자'}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, ML_PREDICTION_CACHE_TTL=0, ML_INFERENCE_LOG_BUFFERED=False)
+class PredictProxyPassthroughTests(TestCase):
+    def setUp(self):
+        readiness = mock.patch('apps.ml_proxy.views._flask_readiness', return_value={'ready': True})
+        readiness.start()
+        self.addCleanup(readiness.stop)
+
+    def _post(self, body):
+        return self.client.post('/ml/v1/predict/', body, content_type='application/json')
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_raw_bytes_forwarded_and_logged_after_send(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        response = self._post({'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자'})
+
+        self.assertIn(b'"sequence": "MKV"', gateway.post.call_args.kwargs['data'])
+        self.assertEqual(response['Content-Length'], str(len(RAW_PREDICTION)))
+        self.assertEqual(b''.join(response.streaming_content), RAW_PREDICTION)
+        log = InferenceLog.objects.get()
+        self.assertEqual(log.input_data['sequence'], 'MKV')
+        self.assertEqual(log.output_data, {'ok': True, 'predictions': {'AD': 0.9}})
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_logged_on_close_even_if_body_is_never_sent(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        request = RequestFactory().post(
+            '/ml/v1/predict/',
+            {'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자'},
+            content_type='application/json'
+        )
+        response = views.predict_proxy(request)
+        self.assertFalse(InferenceLog.objects.exists())
+
+        # 클라이언트가 먼저 끊거나 HEAD 라 body 를 읽지 않아도 서버는 close() 를 호출
+        response.close()
+        response.close()
+        self.assertEqual(InferenceLog.objects.get().output_data, {'ok': True, 'predictions': {'AD': 0.9}})
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_stream_request_error_maps_to_503(self, gateway):
+        gateway.post.side_effect = requests.exceptions.ChunkedEncodingError('broken')
+        response = self.client.post(
+            '/ml/v1/predict/',
+            {'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자'},
+            content_type='application/json',
+            HTTP_ACCEPT='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('broken', response.json()['error'])
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_overload_passed_through_with_retry_after(self, gateway):
+        gateway.post.return_value = _raw_flask_response(429, b'{"ok": false}', {'Retry-After': '3'})
+        response = self._post({'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자'})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertEqual(b''.join(response.streaming_content), b'{"ok": false}')
+        self.assertFalse(InferenceLog.objects.exists())
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    ML_PREDICTION_CACHE_TTL=600,
+    ML_PREDICTION_CACHE_WAIT=2,
+    ML_INFERENCE_LOG_BUFFERED=False
+)
+class PredictionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        readiness = mock.patch(
+            'apps.ml_proxy.views._flask_readiness',
+            return_value={'ready': True, 'model_version': 'esm2', 'weights_version': 'esm2@v1'}
+        )
+        self.readiness = readiness.start()
+        self.addCleanup(readiness.stop)
+
+    def _post(self, body, path='/ml/v1/predict/'):
+        response = self.client.post(path, body, content_type='application/json')
+        return response, b''.join(response.streaming_content)
+
+    def test_key_uses_only_inference_fields(self):
+        key = prediction_cache.prediction_key(PREDICT_BODY, {}, 'v1')
+        other_caller = {**PREDICT_BODY, 'doctor_name': '박의사', 'priority': 'stat'}
+        self.assertEqual(prediction_cache.prediction_key(other_caller, {}, 'v1'), key)
+        self.assertNotEqual(prediction_cache.prediction_key(PREDICT_BODY, {}, 'v2'), key)
+        self.assertNotEqual(prediction_cache.prediction_key(PREDICT_BODY, {'view': 'minimal'}, 'v1'), key)
+        self.assertIsNone(prediction_cache.prediction_key({'doctor_name': '김의사'}, {}, 'v1'))
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_hit_skips_flask_but_still_logs(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        first, _ = self._post(PREDICT_BODY)
+        second, body = self._post({**PREDICT_BODY, 'patient_name': '이환자'})
+
+        self.assertEqual(first['X-Prediction-Cache'], 'MISS')
+        self.assertEqual(second['X-Prediction-Cache'], 'HIT')
+        self.assertEqual(body, RAW_PREDICTION)
+        self.assertEqual(gateway.post.call_count, 1)
+        self.assertEqual(
+            sorted(InferenceLog.objects.values_list('patient_name', flat=True)), ['이환자', '홍환자']
+        )
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_retrain_invalidates(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        gateway.broadcast.return_value = [
+            {'replica': 'r1', 'error': None, 'response': _flask_response(200, {'ok': True})}
+        ]
+        self._post(PREDICT_BODY)
+        self.client.post('/ml/v1/retrain/', {}, content_type='application/json')
+        response, _ = self._post(PREDICT_BODY)
+
+        self.assertEqual(response['X-Prediction-Cache'], 'MISS')
+        self.assertEqual(gateway.post.call_count, 2)
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_reloaded_weights_miss_with_same_model_name(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        self._post(PREDICT_BODY)
+        self.readiness.return_value = {'ready': True, 'model_version': 'esm2', 'weights_version': 'esm2@v2'}
+        response, _ = self._post(PREDICT_BODY)
+
+        self.assertEqual(response['X-Prediction-Cache'], 'MISS')
+        self.assertEqual(gateway.post.call_count, 2)
+        self.assertEqual(prediction_cache.readiness_version({'model_version': 'esm2'}), 'esm2')
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_no_cache_request_skips_cache(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        self._post(PREDICT_BODY)
+        response = self.client.post(
+            '/ml/v1/predict/', PREDICT_BODY, content_type='application/json',
+            HTTP_CACHE_CONTROL='no-cache'
+        )
+
+        self.assertNotIn('X-Prediction-Cache', response)
+        self.assertEqual(gateway.post.call_count, 2)
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_failed_reload_keeps_cache(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        gateway.broadcast.return_value = [
+            {'replica': 'r1', 'error': None, 'response': _flask_response(405, {'ok': False})}
+        ]
+        self._post(PREDICT_BODY)
+        retrain = self.client.post('/ml/v1/retrain/', {}, content_type='application/json')
+        response, _ = self._post(PREDICT_BODY)
+
+        self.assertEqual(retrain.status_code, 405)
+        self.assertEqual(response['X-Prediction-Cache'], 'HIT')
+
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_partial_reload_is_a_failure_but_invalidates(self, gateway):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        gateway.broadcast.return_value = [
+            {'replica': 'r1', 'error': None, 'response': _flask_response(200, {'ok': True})},
+            {'replica': 'r2', 'error': None, 'response': _flask_response(304, {})},
+        ]
+        self._post(PREDICT_BODY)
+        retrain = self.client.post('/ml/v1/retrain/', {}, content_type='application/json')
+        response, _ = self._post(PREDICT_BODY)
+
+        self.assertEqual(retrain.status_code, 502)
+        self.assertEqual([r['ok'] for r in retrain.json()['replicas']], [True, False])
+        self.assertEqual(response['X-Prediction-Cache'], 'MISS')
+
+    def test_waiter_gets_leader_result(self):
+        key = prediction_cache.prediction_key(PREDICT_BODY, {}, 'v1')
+        self.assertTrue(prediction_cache.claim(key))
+        self.assertFalse(prediction_cache.claim(key))
+
+        def finish():
+            prediction_cache.store(key, RAW_PREDICTION, 'application/json')
+            prediction_cache.release(key)
+
+        timer = threading.Timer(0.1, finish)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertEqual(prediction_cache.wait_for(key)['body'], RAW_PREDICTION)
+
+    def test_waiter_gives_up_when_leader_fails(self):
+        key = prediction_cache.prediction_key(PREDICT_BODY, {}, 'v1')
+        prediction_cache.claim(key)
+        threading.Timer(0.05, prediction_cache.release, args=(key,)).start()
+        self.assertIsNone(prediction_cache.wait_for(key))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, ML_PREDICTION_CACHE_TTL=0, ML_INFERENCE_LOG_BUFFERED=True)
+class InferenceLogBufferTests(TestCase):
+    def _buffer(self, **kwargs):
+        buffer = InferenceLogBuffer(**{'batch_size': 2, 'flush_interval': 60, **kwargs})
+        # flusher thread 대신 테스트에서 직접 flush
+        buffer._ensure_flusher = mock.Mock()
+        return buffer
+
+    def test_logs_are_queued_then_bulk_inserted(self):
+        buffer = self._buffer()
+        for i in range(3):
+            self.assertIsNone(buffer.add('김의사', f'환자{i}', {'i': i}, {'ok': True}))
+        queued_at = buffer._queue[0].created_at
+
+        self.assertFalse(InferenceLog.objects.exists())
+        self.assertEqual(buffer.stats()['queue_depth'], 3)
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(buffer.batches, 2)
+        self.assertEqual(buffer.depth(), 0)
+        self.assertEqual(InferenceLog.objects.get(patient_name='환자0').created_at, queued_at)
+
+    def test_connection_error_requeues_in_order(self):
+        buffer = self._buffer()
+        buffer.add('김의사', '환자0', {}, {})
+        buffer.add('김의사', '환자1', {}, {})
+        with mock.patch.object(InferenceLog.objects, 'bulk_create', side_effect=OperationalError('gone')):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual([log.patient_name for log in buffer._queue], ['환자0', '환자1'])
+
+        buffer.shutdown()
+        self.assertEqual(InferenceLog.objects.count(), 2)
+
+    def test_full_queue_writes_inline(self):
+        buffer = self._buffer(max_queue=1)
+        buffer.add('김의사', '환자0', {}, {})
+        self.assertIsNotNone(buffer.add('김의사', '환자1', {}, {}))
+        self.assertEqual(buffer.overflow_writes, 1)
+        self.assertEqual(InferenceLog.objects.count(), 1)
+
+    @mock.patch('apps.ml_proxy.views._flask_readiness', return_value={'ready': True})
+    @mock.patch('apps.ml_proxy.views.ml_gateway')
+    def test_predict_request_only_queues(self, gateway, readiness):
+        gateway.post.return_value = _raw_flask_response(200, RAW_PREDICTION)
+        buffer = self._buffer()
+        with mock.patch('apps.ml_proxy.tasks.inference_log_buffer', buffer):
+            response = self.client.post('/ml/v1/predict/', PREDICT_BODY, content_type='application/json')
+            b''.join(response.streaming_content)
+        self.assertFalse(InferenceLog.objects.exists())
+        buffer.flush()
+        self.assertEqual(InferenceLog.objects.get().output_data['predictions'], {'AD': 0.9})
+
+
+class HistoryViewTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            InferenceLog.objects.create(
+                doctor_name='김의사',
+                patient_name='홍환자' if i % 2 else '이환자',
+                input_data={'sequence': 'MKV' * 100},
+                output_data={'ok': True, 'i': i}
+            )
+        self.ids = list(InferenceLog.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def _get(self, **params):
+        return self.client.get('/ml/v1/history/', params)
+
+    def test_cursor_walks_all_rows_without_blobs(self):
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            body = self._get(**params).json()
+            seen += [row['id'] for row in body['results']]
+            self.assertTrue(all('input_data' not in row for row in body['results']))
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.ids)
+
+    def test_fields_projection_and_filters(self):
+        body = self._get(patient='홍환자', fields='id,output_data').json()
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(set(body['results'][0]), {'id', 'output_data'})
+        self.assertEqual(self._get(fields='id,password').status_code, 400)
+        self.assertEqual(self._get(cursor='not-a-cursor').status_code, 400)
+
+    def test_date_range(self):
+        InferenceLog.objects.filter(id=self.ids[-1]).update(
+            created_at=timezone.make_aware(datetime(2024, 1, 15, 9, 0))
+        )
+        body = self._get(**{'from': '2024-01-15', 'to': '2024-01-15'}).json()
+        self.assertEqual([row['id'] for row in body['results']], [self.ids[-1]])
+        self.assertEqual(self._get(**{'from': 'yesterday'}).status_code, 400)
+
+    @mock.patch('apps.ml_proxy.views.HISTORY_EXPORT_BATCH', 2)
+    def test_export_streams_every_row(self):
+        response = self._get(export=1, fields='id,input_data')
+        exported = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['id'] for row in exported['results']], self.ids)
+        self.assertEqual(exported['results'][0]['input_data'], {'sequence': 'MKV' * 100})
+
+
+class SequenceStoreTests(TestCase):
+    SEQUENCE = 'MKV' * 100
+
+    def _log(self, input_data):
+        return InferenceLog.objects.create(
+            doctor_name='김의사', patient_name='홍환자', input_data=input_data, output_data={'ok': True}
+        )
+
+    def test_export_scrambles_sequences_unless_kept(self):
+        self._log({'sequence': self.SEQUENCE, 'seq_type': 'protein'})
+        with tempfile.TemporaryDirectory() as tmp:
+            scrambled, kept = os.path.join(tmp, 'a.jsonl'), os.path.join(tmp, 'b.jsonl')
+            call_command('export_inference_traffic', scrambled, '--seed', '1', stdout=io.StringIO())
+            call_command('export_inference_traffic', kept, '--keep-sequences', stdout=io.StringIO())
+            with open(scrambled, encoding='utf-8') as f:
+                scrambled_sequence = json.loads(f.readline())['payload']['sequence']
+            with open(kept, encoding='utf-8') as f:
+                kept_sequence = json.loads(f.readline())['payload']['sequence']
+
+        self.assertEqual(kept_sequence, self.SEQUENCE)
+        self.assertNotEqual(scrambled_sequence, self.SEQUENCE)
+        self.assertEqual(len(scrambled_sequence), len(self.SEQUENCE))
+
+    def test_same_sequence_is_stored_once(self):
+        first = self._log({'sequence': self.SEQUENCE, 'id': 'a'})
+        second = self._log({'sequence': self.SEQUENCE, 'id': 'b'})
+
+        stored = StoredSequence.objects.get()
+        self.assertEqual(stored.text, self.SEQUENCE)
+        self.assertEqual(stored.hit_count, 2)
+        self.assertEqual((first.sequence_id, second.sequence_id), (stored.pk, stored.pk))
+        self.assertEqual(first.input_data, {'sequence_ref': stored.digest, 'id': 'a'})
+        self.assertEqual(second.expanded_input_data(), {'sequence': self.SEQUENCE, 'id': 'b'})
+
+    def test_raw_text_is_kept_exactly(self):
+        fasta = '>sp|P1\n' + self.SEQUENCE.lower() + '\n'
+        clean = self._log({'sequence': self.SEQUENCE})
+        raw = self._log({'sequence': fasta, 'id': 'b'})
+
+        self.assertEqual(raw.expanded_input_data(), {'sequence': fasta, 'id': 'b'})
+        self.assertNotEqual(raw.sequence_id, clean.sequence_id)
+        self.assertEqual(raw.sequence.normalized_digest, clean.sequence.normalized_digest)
+        self.assertEqual(raw.sequence.length, len(self.SEQUENCE))
+
+    def test_short_sequences_and_batches(self):
+        short = self._log({'sequence': 'MKV'})
+        self.assertEqual(short.input_data, {'sequence': 'MKV'})
+        self.assertIsNone(short.sequence_id)
+
+        other = 'ACGT' * 40
+        batch = self._log({'items': [{'sequence': self.SEQUENCE}, {'sequence': other}]})
+        self.assertIsNone(batch.sequence_id)
+        self.assertEqual(StoredSequence.objects.count(), 2)
+        self.assertEqual(StoredSequence.objects.get(length=160).seq_type, 'dna')
+        self.assertEqual(
+            batch.expanded_input_data(), {'items': [{'sequence': self.SEQUENCE}, {'sequence': other}]}
+        )
+
+    def test_lookup_and_report(self):
+        log = self._log({'sequence': self.SEQUENCE})
+        self._log({'sequence': self.SEQUENCE})
+
+        body = self.client.post(
+            '/ml/v1/sequences/lookup/', {'sequence': self.SEQUENCE.lower()}, content_type='application/json'
+        ).json()
+        self.assertTrue(body['seen'])
+        self.assertEqual(body['hit_count'], 2)
+        self.assertEqual(body['variants'], 1)
+        self.assertIn(log.id, body['inference_logs'])
+
+        fasta = self._log({'sequence': '>P1\n' + self.SEQUENCE})
+        body = self.client.post(
+            '/ml/v1/sequences/lookup/', {'sequence': self.SEQUENCE}, content_type='application/json'
+        ).json()
+        self.assertEqual((body['hit_count'], body['variants']), (3, 2))
+        self.assertEqual(body['inference_logs'][0], fasta.id)
+        unseen = self.client.post(
+            '/ml/v1/sequences/lookup/', {'sequence': 'ACGT' * 20}, content_type='application/json'
+        ).json()
+        self.assertFalse(unseen['seen'])
+
+        report = store_report()
+        self.assertEqual((report['sequences'], report['distinct_sequences']), (2, 1))
+        self.assertEqual(report['dedup_ratio'], 1.5)
+        self.assertGreater(report['compression_ratio'], 1)
+
+    def test_backfill_converts_legacy_rows(self):
+        legacy = self._log({'sequence': 'MKV'})
+        InferenceLog.objects.filter(pk=legacy.pk).update(input_data={'sequence': self.SEQUENCE})
+
+        call_command('backfill_sequence_store', '--model', 'inference_log', stdout=io.StringIO())
+        legacy.refresh_from_db()
+        self.assertIn('sequence_ref', legacy.input_data)
+        self.assertEqual(legacy.sequence.text, self.SEQUENCE)
+
+
+class PredictionTaskQueueTests(TestCase):
+    def setUp(self):
+        self.task = enqueue_prediction({'sequence': 'MKV'}, '김의사', '홍환자')
+
+    def test_claim_marks_running_once(self):
+        claimed = claim_next_task('w1')
+        self.assertEqual(claimed.pk, self.task.pk)
+        self.assertEqual(claimed.status, PredictionTask.STATUS_RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(claim_next_task('w2'))
+
+    @mock.patch('apps.ml_proxy.tasks.ml_gateway')
+    def test_success_logs_inference(self, gateway):
+        gateway.post.return_value = _flask_response(200, {'ok': True, 'prediction': {}})
+        task = run_task(claim_next_task('w1'))
+
+        self.assertEqual(task.status, PredictionTask.STATUS_SUCCEEDED)
+        self.assertEqual(task.result, {'ok': True, 'prediction': {}})
+        log = InferenceLog.objects.get()
+        self.assertEqual(task.inference_log_id, log.pk)
+        self.assertEqual(log.doctor_name, '김의사')
+
+    @mock.patch('apps.ml_proxy.tasks.RETRY_DELAY_SECONDS', 0)
+    @mock.patch('apps.ml_proxy.tasks.ml_gateway')
+    def test_overload_is_retried_then_fails(self, gateway):
+        gateway.post.return_value = _flask_response(429, {'ok': False}, {'Retry-After': '0'})
+        task = run_task(claim_next_task('w1'))
+        self.assertEqual(task.status, PredictionTask.STATUS_QUEUED)
+
+        gateway.post.side_effect = requests.exceptions.ConnectionError('down')
+        run_task(claim_next_task('w1'))
+        task = run_task(claim_next_task('w1'))
+        self.assertEqual(task.status, PredictionTask.STATUS_FAILED)
+        self.assertEqual(task.attempts, 3)
+        self.assertFalse(InferenceLog.objects.exists())
+
+    @mock.patch('apps.ml_proxy.tasks.record_prediction', side_effect=OperationalError('db down'))
+    @mock.patch('apps.ml_proxy.tasks.ml_gateway')
+    def test_post_processing_error_is_retried(self, gateway, record):
+        gateway.post.return_value = _flask_response(200, {'ok': True, 'prediction': {}})
+        task = run_task(claim_next_task('w1'))
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, PredictionTask.STATUS_QUEUED)
+        self.assertIn('Post-processing error', task.error)
+        self.assertIsNone(task.finished_at)
+
+    @mock.patch('apps.core.services.notification_service.notification_service')
+    @mock.patch('apps.custom.models.PatientPredictionResult.objects')
+    @mock.patch('apps.emr.models.Encounter.objects')
+    @mock.patch('apps.emr.models.Patient.objects')
+    @mock.patch('apps.ml_proxy.tasks.RETRY_DELAY_SECONDS', 0)
+    @mock.patch('apps.ml_proxy.tasks.ml_gateway')
+    def test_patient_is_notified_once_after_retry(self, gateway, patients, encounters, results, notifier):
+        PredictionTask.objects.filter(pk=self.task.pk).update(
+            input_data={'sequence': 'MKV', 'patient_id': 'P1', 'encounter_id': 'E1'}
+        )
+        gateway.post.return_value = _flask_response(200, {'ok': True, 'predictions': {'A': 0.9}})
+        finish = tasks._finish
+        calls = []
+
+        def flaky_finish(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise OperationalError('db down')
+            return finish(*args, **kwargs)
+
+        with mock.patch('apps.ml_proxy.tasks._finish', side_effect=flaky_finish):
+            with self.captureOnCommitCallbacks(execute=True):
+                task = run_task(claim_next_task('w1'))
+            self.assertEqual(task.status, PredictionTask.STATUS_QUEUED)
+            notifier.notify_diagnosis_ready.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                task = run_task(claim_next_task('w1'))
+
+        self.assertEqual(task.status, PredictionTask.STATUS_SUCCEEDED)
+        self.assertEqual(InferenceLog.objects.count(), 1)
+        notifier.notify_diagnosis_ready.assert_called_once_with(results.create.return_value)
+
+    def test_stale_tasks_requeue_until_attempts_run_out(self):
+        other = enqueue_prediction({'sequence': 'MKW'}, '김의사', '홍환자')
+        PredictionTask.objects.filter(pk=self.task.pk).update(
+            status=PredictionTask.STATUS_RUNNING, attempts=1, started_at=timezone.now() - timedelta(hours=1)
+        )
+        PredictionTask.objects.filter(pk=other.pk).update(
+            status=PredictionTask.STATUS_RUNNING, attempts=MAX_ATTEMPTS,
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(requeue_stale_tasks(600), (1, 1))
+        self.task.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.task.status, PredictionTask.STATUS_QUEUED)
+        self.assertEqual(other.status, PredictionTask.STATUS_FAILED)
+        self.assertIsNotNone(other.finished_at)
+
+    @mock.patch('apps.ml_proxy.tasks.ml_gateway')
+    def test_client_error_fails_without_retry(self, gateway):
+        gateway.post.return_value = _flask_response(400, {'ok': False, 'error': 'bad'})
+        task = run_task(claim_next_task('w1'))
+        self.assertEqual(task.status, PredictionTask.STATUS_FAILED)
+        self.assertEqual(task.http_status, 400)
+        self.assertEqual(task.attempts, 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, ML_PREDICTION_CACHE_TTL=0, ML_INFERENCE_LOG_BUFFERED=False)
+class AsyncPredictProxyTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    def _post(self, body):
+        return self.factory.post('/ml/v1/predict/', body, content_type='application/json')
+
+    async def test_async_flag_enqueues_task(self):
+        response = await async_views.predict_proxy(
+            self._post({'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자', 'async': True})
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(await PredictionTask.objects.acount(), 1)
+
+    @mock.patch('apps.ml_proxy.async_views._flask_readiness', new_callable=mock.AsyncMock)
+    @mock.patch('apps.ml_proxy.async_views.async_ml_gateway')
+    async def test_success_is_passed_through_then_logged(self, gateway, readiness):
+        readiness.return_value = {'ready': True, 'status': 'ready'}
+        gateway.post = mock.AsyncMock(return_value=_raw_flask_response(200, RAW_PREDICTION))
+        request = self._post({'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자'})
+        response = await async_views.predict_proxy(request)
+
+        self.assertEqual(gateway.post.call_args.kwargs['content'], request.body)
+        self.assertEqual(await InferenceLog.objects.acount(), 0)
+        self.assertEqual(b''.join([chunk async for chunk in response]), RAW_PREDICTION)
+        # ASGI handler 처럼 전송 후 close() → 기록
+        await sync_to_async(response.close)()
+        log = await InferenceLog.objects.aget()
+        self.assertEqual(log.output_data, {'ok': True, 'predictions': {'AD': 0.9}})
+
+    @mock.patch('apps.ml_proxy.async_views._flask_readiness', new_callable=mock.AsyncMock)
+    @mock.patch('apps.ml_proxy.async_views.async_ml_gateway')
+    async def test_timeout_maps_to_504(self, gateway, readiness):
+        readiness.return_value = {'ready': True, 'status': 'ready'}
+        gateway.post = mock.AsyncMock(side_effect=httpx.ReadTimeout('slow'))
+        response = await async_views.predict_proxy(
+            self._post({'sequence': 'MKV', 'doctor_name': '김의사', 'patient_name': '홍환자'})
+        )
+        self.assertEqual(response.status_code, 504)
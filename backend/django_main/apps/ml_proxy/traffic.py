@@ -0,0 +1,302 @@
+"""
+InferenceLog 기반 트래픽 캡처 / 재생 (용량 산정용)
+
+- export: 실제 InferenceLog.input_data 를 익명화해서 JSONL 로 저장
+    {"offset_s": 12.5, "endpoint": "predict", "payload": {...}}
+  서열도 기본으로 같은 길이 / 같은 알파벳의 임의 서열로 바꿈 (원본 서열은 keep_sequences 로만)
+  export 1회 안에서 같은 서열은 같은 임의 서열로 바뀌므로 반복 비율(중복 제거 / 캐시 hit)은 유지
+- replay: JSONL 을 Flask 서버 또는 Django 프록시로 다시 보내고
+  지연 percentile / 오류 / 처리량을 집계
+  지연은 예정 전송 시각부터 측정하고, 목표 대비 실제 전송률 / 전송 지연(lag) 도 함께 보고
+  Django 프록시로 보낼 때:
+    - 기본으로 Cache-Control: no-cache 를 붙여 예측 캐시를 건너뜀
+      (같은 payload 가 반복되면 캐시 hit 만 측정하게 되므로, use_cache=True 면 캐시 포함 측정)
+    - 프록시가 요청마다 InferenceLog 를 남김 → doctor_name / patient_name 이
+      REPLAY_DOCTOR / REPLAY_PATIENT 인 행이 재생분 (측정 후 필요하면 삭제)
+
+management command: export_inference_traffic, replay_inference_traffic
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# 환자/의사 식별 정보 → 캡처 시 제거
+IDENTIFYING_KEYS = {
+    'doctor_name', 'patient_name', 'doctor_id', 'patient_id',
+    'encounter_id', 'person_id', 'protein_id', 'id',
+}
+
+# Django 프록시가 필수로 요구하는 값 (재생용 placeholder)
+REPLAY_DOCTOR = 'replay-doctor'
+REPLAY_PATIENT = 'replay-patient'
+
+ENDPOINTS = {
+    # endpoint: (Flask 경로, Django 프록시 경로)
+    'predict': ('/api/predict', '/ml/v1/predict/'),
+    'predict_person': ('/api/predict_person', '/ml/v1/predict-person/'),
+}
+
+_ALPHABETS = {
+    'dna': 'ACGT',
+    'rna': 'ACGU',
+    'protein': 'ACDEFGHIKLMNPQRSTVWY',
+}
+
+
+def detect_endpoint(payload):
+    """InferenceLog 에는 경로가 없으므로 payload 모양으로 판단"""
+    return 'predict_person' if isinstance(payload.get('samples'), list) else 'predict'
+
+
+def _residues(sequence):
+    """FASTA 헤더(>...) 줄과 공백을 뺀 서열 문자 (대문자)"""
+    lines = [line for line in sequence.splitlines() if not line.lstrip().startswith('>')]
+    return ''.join(''.join(lines).split()).upper()
+
+
+def _scramble(sequence, secret):
+    """
+    같은 길이 / 같은 문자 종류의 임의 서열 (길이 분포와 seq_type 은 유지)
+    secret + 원래 서열의 hash 로 만들므로 같은 secret(export 1회) 안에서 같은 서열은 항상 같은 서열로 바뀜
+    → 재생 시 중복 제거 / 예측 캐시 hit 비율이 원래 트래픽과 같음
+    """
+    residues = _residues(sequence)
+    if set(residues) <= set('ACGTN'):
+        alphabet = _ALPHABETS['dna']
+    elif set(residues) <= set('ACGUN'):
+        alphabet = _ALPHABETS['rna']
+    else:
+        alphabet = _ALPHABETS['protein']
+    rng = random.Random(hashlib.sha256(secret + residues.encode('utf-8')).digest())
+    return ''.join(rng.choice(alphabet) for _ in range(len(residues)))
+
+
+def scramble_secret(rng=None):
+    """export 1회에 쓰는 서열 치환 secret (파일에는 남기지 않음)"""
+    return (rng or random.Random()).getrandbits(128).to_bytes(16, 'big')
+
+
+def anonymize_payload(payload, scramble_sequences=False, rng=None, secret=None):
+    """
+    식별 정보 키 제거 (중첩 dict / list 포함).
+    scramble_sequences=True 면 sequence 값도 같은 길이의 임의 서열로 교체
+    (secret 이 같으면 payload 가 달라도 같은 서열 → 같은 치환 서열. 없으면 rng 로 새로 만듦)
+    """
+    if scramble_sequences and secret is None:
+        secret = scramble_secret(rng)
+
+    def clean(value):
+        if isinstance(value, dict):
+            out = {}
+            for key, item in value.items():
+                if key in IDENTIFYING_KEYS:
+                    continue
+                if key == 'sequence' and scramble_sequences and isinstance(item, str):
+                    out[key] = _scramble(item, secret)
+                else:
+                    out[key] = clean(item)
+            return out
+        if isinstance(value, list):
+            return [clean(item) for item in value]
+        return value
+
+    return clean(payload)
+
+
+def payload_items(payload):
+    """요청 1건에 포함된 서열 수 (처리량 집계용)"""
+    if isinstance(payload.get('items'), list):
+        return len(payload['items'])
+    if isinstance(payload.get('samples'), list):
+        return len(payload['samples'])
+    return 1
+
+
+def export_records(logs, sample_rate=1.0, scramble_sequences=True, seed=None):
+    """
+    InferenceLog queryset(오래된 순) → 캡처 레코드 generator
+    offset_s 는 첫 레코드 기준 경과 초 (재생 시 원래 도착 간격 재현용)
+    """
+    from apps.core.services.sequence_store import SequenceResolver
+
+    rng = random.Random(seed)
+    secret = scramble_secret(rng) if scramble_sequences else None
+    resolver = SequenceResolver()
+    first = None
+    for log in logs:
+        if sample_rate < 1.0 and rng.random() >= sample_rate:
+            continue
+        if not isinstance(log.input_data, dict):
+            continue
+        if first is None:
+            first = log.created_at
+        payload = anonymize_payload(resolver.expand(log.input_data), scramble_sequences, secret=secret)
+        yield {
+            'offset_s': round((log.created_at - first).total_seconds(), 3),
+            'endpoint': detect_endpoint(payload),
+            'payload': payload,
+        }
+
+
+def percentile(values, pct):
+    """선형 보간 percentile (values 는 정렬 안 돼 있어도 됨)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def schedule(records, rate=None, speedup=1.0):
+    """
+    레코드별 전송 시각 (시작 기준 초)
+    - rate 지정: 초당 rate 건 고정 간격
+    - 아니면 캡처된 offset_s / speedup (원래 도착 패턴을 빠르게/느리게 재현)
+    """
+    if rate:
+        return [i / float(rate) for i in range(len(records))]
+    speedup = speedup or 1.0
+    return [record.get('offset_s', 0.0) / speedup for record in records]
+
+
+class TrafficReplayer:
+    """캡처된 레코드를 target(flask / django) 으로 재생하고 결과를 집계"""
+
+    def __init__(self, base_url, target='flask', api_key='', concurrency=8, timeout=60, use_cache=False):
+        self.base_url = base_url.rstrip('/')
+        self.target = target
+        self.use_cache = use_cache
+        self.api_key = api_key
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._latencies = defaultdict(list)
+        self._statuses = Counter()
+        self._errors = Counter()
+        self._items = 0
+        self._service = []
+        self._sent_at = []
+        self._lags = []
+
+    def _session(self):
+        # thread 별 keep-alive 세션
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            if self.api_key:
+                session.headers['X-API-Key'] = self.api_key
+            if self.target == 'django' and not self.use_cache:
+                session.headers['Cache-Control'] = 'no-cache'
+            self._local.session = session
+        return session
+
+    def _request_for(self, record):
+        flask_path, django_path = ENDPOINTS[record['endpoint']]
+        payload = dict(record['payload'])
+        if self.target == 'django':
+            payload.setdefault('doctor_name', REPLAY_DOCTOR)
+            payload.setdefault('patient_name', REPLAY_PATIENT)
+            return f"{self.base_url}{django_path}", payload
+        return f"{self.base_url}{flask_path}", payload
+
+    def _send(self, record, scheduled):
+        """
+        scheduled: 원래 보내야 했던 시각 (perf_counter 기준)
+        지연은 scheduled 부터 잼 → thread 가 모두 바빠 큐에서 기다린 시간도 포함 (coordinated omission 방지)
+        """
+        url, payload = self._request_for(record)
+        sent = time.perf_counter()
+        try:
+            response = self._session().post(url, json=payload, timeout=self.timeout)
+            status = response.status_code
+            error = None if status < 400 else f"HTTP {status}"
+        except requests.exceptions.RequestException as e:
+            status = None
+            error = type(e).__name__
+        done = time.perf_counter()
+
+        with self._lock:
+            self._sent_at.append(sent)
+            self._lags.append(max(0.0, sent - scheduled) * 1000)
+            self._statuses[str(status)] += 1
+            if error:
+                self._errors[error] += 1
+            else:
+                self._latencies[record['endpoint']].append((done - scheduled) * 1000)
+                self._service.append((done - sent) * 1000)
+                self._items += payload_items(payload)
+
+    def run(self, records, rate=None, speedup=1.0):
+        send_at = schedule(records, rate=rate, speedup=speedup)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for record, at in zip(records, send_at):
+                delay = at - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._send, record, started + at)
+        return self.report(
+            len(records), time.perf_counter() - started, target_span_s=max(send_at, default=0.0)
+        )
+
+    def report(self, sent, wall_s, target_span_s=0.0):
+        def summarize(values):
+            return {
+                'count': len(values),
+                'p50_ms': _round(percentile(values, 50)),
+                'p90_ms': _round(percentile(values, 90)),
+                'p95_ms': _round(percentile(values, 95)),
+                'p99_ms': _round(percentile(values, 99)),
+                'max_ms': _round(max(values) if values else None),
+            }
+
+        def rate(count, span):
+            return round((count - 1) / span, 3) if count > 1 and span > 0 else None
+
+        all_latencies = [v for values in self._latencies.values() for v in values]
+        ok = len(all_latencies)
+        sent_span = max(self._sent_at) - min(self._sent_at) if self._sent_at else 0.0
+        return {
+            'target': self.target,
+            'base_url': self.base_url,
+            'sent': sent,
+            'ok': ok,
+            'errors': sum(self._errors.values()),
+            'error_rate': round(1 - ok / sent, 4) if sent else 0.0,
+            'status_counts': dict(self._statuses),
+            'error_counts': dict(self._errors),
+            'wall_s': round(wall_s, 3),
+            'throughput_rps': round(ok / wall_s, 3) if wall_s else 0.0,
+            'throughput_items_per_s': round(self._items / wall_s, 3) if wall_s else 0.0,
+            # 예정 전송 시각 기준 (대기열에서 밀린 시간 포함) → 포화 상태에서도 p95/p99 가 낙관적이지 않음
+            'latency': summarize(all_latencies),
+            'latency_by_endpoint': {
+                endpoint: summarize(values) for endpoint, values in self._latencies.items()
+            },
+            # 실제 전송 ~ 응답 (서버 처리 시간만)
+            'service_latency': summarize(self._service),
+            # 예정 대비 실제 전송: achieved 가 target 보다 낮으면 부하를 다 못 걸었음 (concurrency 부족 / 서버 포화)
+            'send_rate': {
+                'target_rps': rate(sent, target_span_s),
+                'achieved_rps': rate(len(self._sent_at), sent_span),
+                'lag': summarize(self._lags),
+            },
+        }
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def load_records(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
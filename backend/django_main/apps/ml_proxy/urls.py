@@ -1,16 +1,36 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'ml_proxy'
 
+# ASGI 배포에서는 Flask 호출을 await 하는 async view 사용 (URL / 응답은 동일)
+if settings.ASYNC_PROXY_VIEWS:
+    from . import async_views as proxy_views
+else:
+    proxy_views = views
+
 urlpatterns = [
     # Flask ML 서버 프록시 엔드포인트
-    path('v1/predict/', views.predict_proxy, name='predict'),
-    path('v1/status/', views.status_proxy, name='status'),
-    path('v1/model-info/', views.model_info_proxy, name='model_info'),
+    path('v1/predict/', proxy_views.predict_proxy, name='predict'),
+    path('v1/predict-person/', proxy_views.predict_person_proxy, name='predict_person'),
+    path('v1/explain/', proxy_views.explain_proxy, name='explain'),
+    path('v1/status/', proxy_views.status_proxy, name='status'),
+    path('v1/ready/', proxy_views.ready_proxy, name='ready'),
+    path('v1/model-info/', proxy_views.model_info_proxy, name='model_info'),
     path('v1/retrain/', views.retrain_proxy, name='retrain'),
-    path('v1/example-data/', views.example_data_proxy, name='example_data'),
+    path('v1/example-data/', proxy_views.example_data_proxy, name='example_data'),
+
+    # predict 비동기 모드 작업 상태 조회 (Django worker 큐)
+    path('v1/tasks/<uuid:task_id>/', views.task_detail_view, name='task_detail'),
+
+    # 비동기 추론 작업 (대량 배치)
+    path('v1/jobs/', proxy_views.job_create_proxy, name='job_create'),
+    path('v1/jobs/<str:job_id>/', proxy_views.job_detail_proxy, name='job_detail'),
 
     # 추론 이력 조회 엔드포인트
     path('v1/history/', views.history_view, name='history'),
+
+    # 서열 저장소 조회 (이전에 분석한 서열인지)
+    path('v1/sequences/lookup/', views.sequence_lookup_view, name='sequence_lookup'),
 ]
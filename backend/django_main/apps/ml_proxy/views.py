@@ -1,16 +1,147 @@
+import base64
+import binascii
+import json
 import requests
 import logging
-import os
-from django.http import JsonResponse
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from .models import InferenceLog
+from apps.core.services.ml_gateway import ml_gateway
+from apps.core.services.sequence_store import SequenceResolver, find_sequences
+from . import prediction_cache
+from .log_buffer import inference_log_buffer
+from .models import InferenceLog, PredictionTask
+from .tasks import enqueue_prediction, record_prediction, task_status
 
 logger = logging.getLogger(__name__)
 
-# Flask ML 서버 설정 (환경 변수 사용)
-FLASK_ML_SERVER_URL = os.getenv('FLASK_INFERENCE_URL', 'http://127.0.0.1:9000')
-FLASK_API_KEY = os.getenv('FLASK_API_KEY', '')
+# Flask ML 서버 호출은 모두 ml_gateway (keep-alive 커넥션 풀, API 키 헤더 포함) 로 보냄
+# 서버 주소 / API 키는 FLASK_INFERENCE_URL / FLASK_API_KEY 환경 변수
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Flask readiness(/ready) 확인 결과 캐시 (요청마다 Flask 를 두드리지 않도록)
+READINESS_CACHE_KEY = 'ml_proxy:flask_readiness'
+READINESS_CACHE_TTL = 5        # ready 상태 캐시 시간 (초)
+NOT_READY_CACHE_TTL = 2        # warm-up 중 / 연결 실패 상태 캐시 시간 (초)
+NOT_READY_RETRY_AFTER = '5'
+
+# 비동기 작업은 등록한 replica 에만 있으므로 job_id → replica URL 을 기억해 조회를 고정
+JOB_REPLICA_CACHE_KEY = 'ml_proxy:job_replica:{job_id}'
+JOB_REPLICA_CACHE_TTL = 86400  # Flask JOB_RESULT_TTL 과 동일
+
+# 예측 캐시 결과 (HIT / COALESCED / MISS) 를 알려주는 응답 헤더
+PREDICTION_CACHE_HEADER = 'X-Prediction-Cache'
+
+
+def _fetch_flask_readiness():
+    """Flask /ready 조회 → {"ready": bool, "status": str, ...}"""
+    try:
+        response = ml_gateway.get('ready', '/ready')
+    except requests.exceptions.RequestException as e:
+        return {"ready": False, "status": "unreachable", "error": str(e)}
+
+    # /ready 가 없는 이전 버전 Flask 서버는 살아있으면 ready 로 간주
+    if response.status_code == 404:
+        return {"ready": True, "status": "unknown"}
+
+    try:
+        state = response.json()
+    except ValueError:
+        state = {}
+    state['ready'] = response.status_code == 200
+    state.setdefault('status', 'ready' if state['ready'] else 'not_ready')
+    return state
+
+
+def _flask_readiness(use_cache=True):
+    if use_cache:
+        state = cache.get(READINESS_CACHE_KEY)
+        if state is not None:
+            return state
+
+    state = _fetch_flask_readiness()
+    ttl = READINESS_CACHE_TTL if state['ready'] else NOT_READY_CACHE_TTL
+    cache.set(READINESS_CACHE_KEY, state, ttl)
+    return state
+
+
+def _not_ready_response(state):
+    response = JsonResponse(
+        {
+            "error": "Flask ML server is not ready (warming up or unavailable)",
+            "readiness": state,
+        },
+        status=503
+    )
+    response['Retry-After'] = NOT_READY_RETRY_AFTER
+    return response
+
+
+class _RawStreamingResponse(StreamingHttpResponse):
+    """
+    on_sent 를 body generator 의 finally 가 아니라 close() 에서 호출하는 응답.
+    WSGI / ASGI 서버는 body 를 읽지 않은 경우 (HEAD, 전송 전에 끊긴 연결) 에도 close() 는 호출하므로
+    시작되지 않은 generator 때문에 기록이 빠지지 않음. on_sent 는 1번만 호출
+    """
+
+    def __init__(self, *args, on_sent=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_sent = on_sent
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            on_sent, self._on_sent = self._on_sent, None
+            if on_sent is not None:
+                on_sent()
+
+
+def _raw_response(body, status=200, content_type='application/json', on_sent=None):
+    """
+    bytes body 를 파싱 / 재직렬화 없이 그대로 전달합니다.
+    on_sent 는 서버가 응답을 닫을 때 (보통 클라이언트가 응답을 다 받은 뒤) 호출됩니다.
+    """
+    raw = _RawStreamingResponse(iter([body]), status=status, content_type=content_type, on_sent=on_sent)
+    raw['Content-Length'] = str(len(body))
+    return raw
+
+
+def _passthrough_response(response, on_sent=None):
+    """Flask 응답을 상태 코드 / Content-Type / Retry-After 그대로 전달"""
+    passthrough = _raw_response(
+        response.content,
+        status=response.status_code,
+        content_type=response.headers.get('Content-Type', 'application/json'),
+        on_sent=on_sent
+    )
+    if response.headers.get('Retry-After'):
+        passthrough['Retry-After'] = response.headers['Retry-After']
+    return passthrough
+
+
+def _record_raw_prediction(request_data, raw_response, doctor_name, patient_name,
+                           doctor_id=None, patient_id=None):
+    """Flask 응답 bytes 를 파싱해 record_prediction 호출 (실패해도 응답에는 영향 없음)"""
+    try:
+        record_prediction(
+            request_data,
+            json.loads(raw_response),
+            doctor_name,
+            patient_name,
+            doctor_id=doctor_id,
+            patient_id=patient_id,
+            buffered=True
+        )
+    except Exception as e:
+        logger.error(f"Failed to record prediction: {str(e)}")
 
 
 @csrf_exempt
@@ -26,11 +157,13 @@ def predict_proxy(request):
         "image_data": [...],
         "clinical_features": {...}
     }
+
+    "async": true (또는 ?async=1) 이면 작업만 등록하고 202 + task_id 를 바로 반환합니다.
+    추론 / 결과 저장 / 알림은 run_prediction_worker 가 처리하며
+    GET /ml/v1/tasks/<task_id>/ 로 상태와 결과를 조회합니다.
     """
     try:
-        import json
-
-        # 요청 데이터 파싱
+        # 요청 데이터 파싱 (필수 필드 확인 + 로그 저장용, Flask 로는 원본 bytes 를 보냄)
         try:
             request_data = json.loads(request.body)
         except json.JSONDecodeError:
@@ -58,96 +191,86 @@ def predict_proxy(request):
                 status=400
             )
 
-        # Flask ML 서버로 요청 전달
-        flask_url = f"{FLASK_ML_SERVER_URL}/api/predict"
-
-        # API 키 헤더 준비
-        headers = {}
-        if FLASK_API_KEY:
-            headers['X-API-Key'] = FLASK_API_KEY
+        # 비동기 모드: 등록만 하고 웹 worker 는 바로 반환
+        run_async = request_data.pop('async', False) or request.GET.get('async') in ('1', 'true')
+        if run_async:
+            task = enqueue_prediction(request_data, doctor_name, patient_name)
+            return JsonResponse(task_status(task, include_result=False), status=202)
+
+        # warm-up 이 끝나지 않은 Flask 로는 보내지 않음 (첫 요청 지연 방지)
+        readiness = _flask_readiness()
+        if not readiness['ready']:
+            return _not_ready_response(readiness)
+
+        # NDJSON 스트리밍 요청은 버퍼링 없이 그대로 전달
+        if NDJSON_CONTENT_TYPE in request.headers.get('Accept', ''):
+            return _stream_predict_proxy(request.body, request_data, doctor_name, patient_name)
+
+        def record(raw_response):
+            _record_raw_prediction(
+                request_data,
+                raw_response,
+                doctor_name,
+                patient_name,
+                doctor_id=doctor_id,
+                patient_id=patient_id
+            )
 
+        # 같은 입력 + 같은 모델 버전이면 캐시 응답 (동시에 온 같은 요청은 1건만 Flask 로)
+        cache_key = prediction_cache.prediction_key(
+            request_data, request.GET, prediction_cache.readiness_version(readiness), request.headers
+        )
+        leader = False
+        if cache_key is not None:
+            cached = prediction_cache.lookup(cache_key)
+            cache_status = 'HIT'
+            if cached is None:
+                leader = prediction_cache.claim(cache_key)
+                if not leader:
+                    cached = prediction_cache.wait_for(cache_key)
+                    cache_status = 'COALESCED'
+            if cached is not None:
+                hit = _raw_response(
+                    cached['body'],
+                    content_type=cached['content_type'],
+                    on_sent=lambda: record(cached['body'])
+                )
+                hit[PREDICTION_CACHE_HEADER] = cache_status
+                return hit
+
+        # Flask ML 서버로 요청 전달 (원본 body bytes 그대로, 재직렬화 없음)
         try:
-            response = requests.post(
-                flask_url,
-                json=request_data,
-                headers=headers,
-                timeout=60
+            response = ml_gateway.post(
+                'predict',
+                '/api/predict',
+                data=request.body,
+                headers={'Content-Type': 'application/json'}
             )
+
+            # Flask admission control 거절 → 429 + Retry-After 그대로 전달
+            if response.status_code == 429:
+                return _passthrough_response(response)
+
             response.raise_for_status()
 
-            # Flask 응답 데이터
-            flask_response_data = response.json()
+            if 'json' not in response.headers.get('Content-Type', ''):
+                return JsonResponse(
+                    {"error": "Invalid response from Flask server"},
+                    status=502
+                )
 
-            # 추론 결과를 InferenceLog에 저장
-            inference_log = InferenceLog.objects.create(
-                doctor_name=doctor_name,
-                patient_name=patient_name,
-                input_data=request_data,
-                output_data=flask_response_data
-            )
+            if leader:
+                prediction_cache.store(
+                    cache_key, response.content, response.headers['Content-Type']
+                )
 
-            logger.info(
-                f"Inference logged: Doctor={doctor_name}, Patient={patient_name}"
+            # Flask 응답 bytes 를 그대로 반환하고, 응답 전송이 끝난 뒤에 파싱해서 저장
+            passthrough = _passthrough_response(
+                response, on_sent=lambda: record(response.content)
             )
-
-            # PatientPredictionResult 생성 (선택적)
-            # patient_id와 encounter_id가 제공된 경우에만 생성
-            if patient_id and request_data.get('encounter_id'):
-                try:
-                    from apps.custom.models import PatientPredictionResult
-                    from apps.emr.models import Patient, Encounter
-                    from apps.custom.models import Doctor
-
-                    patient = Patient.objects.get(pk=patient_id)
-                    encounter = Encounter.objects.get(pk=request_data.get('encounter_id'))
-
-                    # Optional: Get doctor if doctor_id provided
-                    doctor = None
-                    if doctor_id:
-                        try:
-                            doctor = Doctor.objects.get(user_id=doctor_id)
-                        except Doctor.DoesNotExist:
-                            pass
-
-                    # Extract prediction data from Flask response
-                    # Assuming Flask returns: {"predictions": {...}, "confidence": 0.95, ...}
-                    model_name = flask_response_data.get('model_name', 'NeuroNova_Brain_v1.0')
-                    model_version = flask_response_data.get('model_version', '1.0')
-
-                    # Get main prediction class (highest probability)
-                    predictions = flask_response_data.get('predictions', {})
-                    if predictions:
-                        # Find class with highest probability
-                        pred_class = max(predictions.items(), key=lambda x: x[1])[0]
-                        confidence = max(predictions.values())
-                    else:
-                        pred_class = 'UNKNOWN'
-                        confidence = 0.0
-
-                    prediction_result = PatientPredictionResult.objects.create(
-                        encounter=encounter,
-                        patient=patient,
-                        doctor=doctor,
-                        model_name=model_name,
-                        model_version=model_version,
-                        prediction_class=pred_class,
-                        confidence_score=confidence,
-                        probabilities=predictions,
-                        xai_image_path=flask_response_data.get('xai_path', ''),
-                        feature_importance=flask_response_data.get('feature_importance', {})
-                    )
-
-                    logger.info(f"PatientPredictionResult created for patient {patient_id}")
-
-                    # Send notification to patient
-                    from apps.core.services.notification_service import notification_service
-                    notification_service.notify_diagnosis_ready(prediction_result)
-                except Exception as pred_error:
-                    logger.error(f"Failed to create PatientPredictionResult: {str(pred_error)}")
-                    # Don't fail the request if prediction creation fails
-
-            # Flask 응답을 그대로 반환
-            return JsonResponse(flask_response_data, status=response.status_code)
+            if cache_key is not None:
+                passthrough[PREDICTION_CACHE_HEADER] = 'MISS'
+            return passthrough
 
         except requests.exceptions.Timeout:
             return JsonResponse(
@@ -165,6 +288,10 @@ def predict_proxy(request):
                 {"error": f"Flask server error: {str(e)}"},
                 status=502
             )
+        finally:
+            # 실패했으면 결과 없이 lock 만 풀림 → 기다리던 요청은 직접 Flask 로 보냄
+            if leader:
+                prediction_cache.release(cache_key)
 
     except Exception as e:
         logger.error(f"Predict proxy error: {str(e)}")
@@ -174,6 +301,73 @@ def predict_proxy(request):
         )
 
 
+def _stream_predict_proxy(raw_body, request_data, doctor_name, patient_name):
+    """
+    Flask NDJSON 스트림을 줄 단위로 그대로 흘려보냅니다.
+    전체 결과를 메모리에 모으지 않기 위해 InferenceLog 에는
+    마지막 summary 줄만 저장합니다.
+    """
+    try:
+        response = ml_gateway.post(
+            'predict_stream',
+            '/api/predict',
+            data=raw_body,
+            headers={'Accept': NDJSON_CONTENT_TYPE, 'Content-Type': 'application/json'},
+            stream=True
+        )
+    except requests.exceptions.Timeout:
+        return JsonResponse({"error": "Flask server timeout"}, status=504)
+    except requests.exceptions.ConnectionError:
+        return JsonResponse({"error": "Cannot connect to Flask server"}, status=503)
+    except requests.exceptions.RequestException as e:
+        # InvalidHeader / TooManyRedirects / ChunkedEncodingError 등 → 500 대신 503
+        logger.error(f"Predict stream proxy error: {str(e)}")
+        return JsonResponse({"error": f"Flask server error: {str(e)}"}, status=503)
+
+    content_type = response.headers.get('Content-Type', '')
+    if response.status_code != 200 or NDJSON_CONTENT_TYPE not in content_type:
+        # 429/400 등 에러 응답은 일반 JSON
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"error": f"Flask server error: {response.status_code}"}
+        finally:
+            response.close()
+        error_response = JsonResponse(body, status=response.status_code)
+        if response.headers.get('Retry-After'):
+            error_response['Retry-After'] = response.headers['Retry-After']
+        return error_response
+
+    def relay():
+        last_line = b''
+        try:
+            for line in response.iter_lines(chunk_size=None):
+                if not line:
+                    continue
+                last_line = line
+                yield line + b'\n'
+        finally:
+            response.close()
+            try:
+                summary = json.loads(last_line) if last_line else {}
+                inference_log_buffer.add(
+                    doctor_name,
+                    patient_name,
+                    request_data,
+                    {"streamed": True, "summary": summary}
+                )
+                logger.info(
+                    f"Inference logged (stream): Doctor={doctor_name}, Patient={patient_name}"
+                )
+            except Exception as log_error:
+                logger.error(f"Failed to log streamed inference: {str(log_error)}")
+
+    streaming_response = StreamingHttpResponse(relay(), content_type=NDJSON_CONTENT_TYPE)
+    streaming_response['X-Accel-Buffering'] = 'no'
+    streaming_response['Cache-Control'] = 'no-cache'
+    return streaming_response
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def status_proxy(request):
@@ -181,14 +375,7 @@ def status_proxy(request):
     Flask ML 서버의 상태를 조회합니다. (단순 프록시)
     """
     try:
-        flask_url = f"{FLASK_ML_SERVER_URL}/api/health"
-
-        # API 키 헤더 준비
-        headers = {}
-        if FLASK_API_KEY:
-            headers['X-API-Key'] = FLASK_API_KEY
-
-        response = requests.get(flask_url, headers=headers, timeout=10)
+        response = ml_gateway.get('status', '/api/health')
         return JsonResponse(response.json(), status=response.status_code)
     except Exception as e:
         logger.error(f"Status proxy error: {str(e)}")
@@ -200,19 +387,39 @@ def status_proxy(request):
 
 @csrf_exempt
 @require_http_methods(["GET"])
-def model_info_proxy(request):
+def task_detail_view(request, task_id):
     """
-    Flask ML 서버의 모델 정보를 조회합니다. (단순 프록시)
+    비동기 추론 작업(predict async) 상태 조회
+    status: queued / running / succeeded / failed (완료 시 result 포함)
     """
     try:
-        flask_url = f"{FLASK_ML_SERVER_URL}/api/schema"
+        task = PredictionTask.objects.get(task_id=task_id)
+    except PredictionTask.DoesNotExist:
+        return JsonResponse({"error": "Task not found"}, status=404)
+    return JsonResponse(task_status(task), status=200)
 
-        # API 키 헤더 준비
-        headers = {}
-        if FLASK_API_KEY:
-            headers['X-API-Key'] = FLASK_API_KEY
 
-        response = requests.get(flask_url, headers=headers, timeout=10)
+@csrf_exempt
+@require_http_methods(["GET"])
+def ready_proxy(request):
+    """
+    Flask ML 서버의 readiness 를 조회합니다. (캐시 없이 직접 확인)
+    warm-up 이 끝났으면 200, 아니면 503
+    """
+    state = {**_flask_readiness(use_cache=False), 'replicas': ml_gateway.replica_states()}
+    if not state['ready']:
+        return _not_ready_response(state)
+    return JsonResponse(state, status=200)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def model_info_proxy(request):
+    """
+    Flask ML 서버의 모델 정보를 조회합니다. (단순 프록시)
+    """
+    try:
+        response = ml_gateway.get('schema', '/api/schema')
         return JsonResponse(response.json(), status=response.status_code)
     except Exception as e:
         logger.error(f"Model info proxy error: {str(e)}")
@@ -222,6 +429,128 @@ def model_info_proxy(request):
         )
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def predict_person_proxy(request):
+    """
+    한 사람의 여러 샘플을 Flask /api/predict_person 으로 한 번에 전달하고 결과를 저장합니다.
+
+    요청 Body 예시:
+    {
+        "doctor_name": "김의사",
+        "patient_name": "홍환자",
+        "person_id": "P001",
+        "samples": [{"sequence": "...", "seq_type": "protein"}, ...],
+        "aggregation": "mean"
+    }
+    """
+    try:
+        request_data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format"}, status=400)
+
+    doctor_name = request_data.get('doctor_name') or request_data.get('doctor_id')
+    patient_name = request_data.get('patient_name') or request_data.get('patient_id')
+    if not doctor_name or not patient_name:
+        return JsonResponse(
+            {"error": "doctor_name (or doctor_id) and patient_name (or patient_id) are required"},
+            status=400
+        )
+
+    readiness = _flask_readiness()
+    if not readiness['ready']:
+        return _not_ready_response(readiness)
+
+    try:
+        response = ml_gateway.post('predict_person', '/api/predict_person', json=request_data)
+    except requests.exceptions.Timeout:
+        return JsonResponse({"error": "Flask server timeout"}, status=504)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Predict person proxy error: {str(e)}")
+        return JsonResponse(
+            {"error": f"Cannot connect to Flask server: {str(e)}"},
+            status=503
+        )
+
+    try:
+        flask_response_data = response.json()
+    except ValueError:
+        return JsonResponse({"error": "Invalid response from Flask server"}, status=502)
+
+    proxied = JsonResponse(flask_response_data, status=response.status_code)
+    if response.status_code == 429 and response.headers.get('Retry-After'):
+        proxied['Retry-After'] = response.headers['Retry-After']
+    if response.status_code != 200:
+        return proxied
+
+    inference_log_buffer.add(
+        str(doctor_name), str(patient_name), request_data, flask_response_data
+    )
+    logger.info(
+        f"Person inference logged: Doctor={doctor_name}, Patient={patient_name}, "
+        f"antigen={flask_response_data.get('diagnosis', {}).get('antigen')}"
+    )
+    return proxied
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def explain_proxy(request):
+    """
+    Flask ML 서버의 잔기 단위 attribution(/api/explain) 요청을 전달합니다.
+    결과는 Flask 쪽에서 (모델 버전, 서열 hash) 기준으로 캐시됩니다.
+    """
+    try:
+        request_data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format"}, status=400)
+
+    readiness = _flask_readiness()
+    if not readiness['ready']:
+        return _not_ready_response(readiness)
+
+    try:
+        response = ml_gateway.post('explain', '/api/explain', json=request_data)
+        proxied = JsonResponse(response.json(), status=response.status_code)
+        retry_after = response.headers.get('Retry-After')
+        if response.status_code == 429 and retry_after:
+            proxied['Retry-After'] = retry_after
+        return proxied
+    except requests.exceptions.Timeout:
+        return JsonResponse({"error": "Flask server timeout"}, status=504)
+    except Exception as e:
+        logger.error(f"Explain proxy error: {str(e)}")
+        return JsonResponse(
+            {"error": f"Cannot connect to Flask server: {str(e)}"},
+            status=503
+        )
+
+
+def _reload_results(results):
+    """broadcast 결과 → replica 별 {'replica', 'ok', 'status_code', 'response'} (ok: 2xx 응답)"""
+    replicas = []
+    for result in results:
+        response = result['response']
+        if response is None:
+            replicas.append({
+                'replica': result['replica'],
+                'ok': False,
+                'error': str(result['error']),
+            })
+            continue
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        replicas.append({
+            'replica': result['replica'],
+            'ok': 200 <= response.status_code < 300,
+            'status_code': response.status_code,
+            'response': body,
+        })
+    return replicas
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def retrain_proxy(request):
@@ -236,20 +565,23 @@ def retrain_proxy(request):
         except json.JSONDecodeError:
             request_data = {}
 
-        flask_url = f"{FLASK_ML_SERVER_URL}/api/reload_model"
+        # replica 를 하나씩 재로딩 → 재로딩 중인 replica 는 라우팅에서 빠지고 나머지가 처리
+        results = ml_gateway.broadcast('POST', 'reload_model', '/api/reload_model', json=request_data)
+        replicas = _reload_results(results)
 
-        # API 키 헤더 준비
-        headers = {}
-        if FLASK_API_KEY:
-            headers['X-API-Key'] = FLASK_API_KEY
+        # 2xx 로 답한 replica 만 재로딩 성공으로 봄
+        # 하나라도 새 가중치를 올렸으면 이전 모델의 예측 캐시는 버림 (전부 실패면 캐시 유지)
+        if any(r['ok'] for r in replicas):
+            prediction_cache.invalidate()
+            cache.delete(READINESS_CACHE_KEY)
 
-        response = requests.post(
-            flask_url,
-            json=request_data,
-            headers=headers,
-            timeout=300  # 재학습은 시간이 오래 걸릴 수 있음
-        )
-        return JsonResponse(response.json(), status=response.status_code)
+        if len(results) == 1:
+            if results[0]['error'] is not None:
+                raise results[0]['error']
+            return JsonResponse(replicas[0]['response'], status=replicas[0]['status_code'])
+
+        all_ok = all(r['ok'] for r in replicas)
+        return JsonResponse({'ok': all_ok, 'replicas': replicas}, status=200 if all_ok else 502)
     except Exception as e:
         logger.error(f"Retrain proxy error: {str(e)}")
         return JsonResponse(
@@ -258,59 +590,179 @@ def retrain_proxy(request):
         )
 
 
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+HISTORY_EXPORT_BATCH = 500
+HISTORY_FIELDS = ('id', 'doctor_name', 'patient_name', 'created_at', 'input_data', 'output_data')
+# JSON blob 은 fields 로 직접 요청할 때만 조회
+HISTORY_DEFAULT_FIELDS = ('id', 'doctor_name', 'patient_name', 'created_at')
+
+
+class HistoryQueryError(ValueError):
+    pass
+
+
+def _encode_history_cursor(row):
+    raw = f"{row['created_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_history_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        parsed = parse_datetime(created_at)
+        if parsed is None:
+            raise ValueError(created_at)
+        return parsed, int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HistoryQueryError("Invalid cursor")
+
+
+def _parse_history_bound(value, name, end=False):
+    """from / to 파싱: datetime 또는 날짜 (to 에 날짜만 주면 그 날 전체 포함)"""
+    try:
+        day = parse_date(value)
+        parsed = None if day else parse_datetime(value)
+    except ValueError:
+        day = parsed = None
+    if day is not None:
+        parsed = datetime.combine(day + timedelta(days=1) if end else day, datetime.min.time())
+    elif parsed is None:
+        raise HistoryQueryError(f"{name} must be an ISO date or datetime")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _history_queryset(params):
+    """history_view 필터 → (queryset, fields)"""
+    queryset = InferenceLog.objects.all()
+
+    if params.get('doctor'):
+        queryset = queryset.filter(doctor_name=params['doctor'])
+    if params.get('patient'):
+        queryset = queryset.filter(patient_name=params['patient'])
+    if params.get('from'):
+        queryset = queryset.filter(created_at__gte=_parse_history_bound(params['from'], 'from'))
+    if params.get('to'):
+        queryset = queryset.filter(created_at__lt=_parse_history_bound(params['to'], 'to', end=True))
+
+    fields = HISTORY_DEFAULT_FIELDS
+    if params.get('fields'):
+        fields = tuple(f.strip() for f in params['fields'].split(',') if f.strip())
+        unknown = [f for f in fields if f not in HISTORY_FIELDS]
+        if unknown:
+            raise HistoryQueryError(
+                f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(HISTORY_FIELDS)})"
+            )
+
+    # keyset 페이지에 필요한 created_at / id 는 항상 조회
+    columns = tuple(dict.fromkeys(fields + ('created_at', 'id')))
+    queryset = queryset.order_by('-created_at', '-id').values(*columns)
+    return queryset, fields
+
+
+def _after_cursor(queryset, created_at, pk):
+    """(created_at, id) 가 cursor 보다 오래된 행만"""
+    return queryset.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+    )
+
+
+def _history_row(row, fields, resolver):
+    item = {field: row[field] for field in fields}
+    if 'created_at' in item:
+        item['created_at'] = item['created_at'].isoformat()
+    if 'input_data' in item:
+        # 서열 저장소로 옮긴 서열(sequence_ref) 복원
+        item['input_data'] = resolver.expand(item['input_data'])
+    return item
+
+
+def _stream_history_export(queryset, fields):
+    """
+    전체 결과를 JSON 배열로 스트리밍 (keyset 으로 HISTORY_EXPORT_BATCH 건씩 조회,
+    행 단위로 인코딩해 메모리에 전체 결과를 모으지 않음)
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    resolver = SequenceResolver()
+    yield b'{"results": ['
+    page = queryset
+    first = True
+    while True:
+        rows = list(page[:HISTORY_EXPORT_BATCH])
+        if 'input_data' in fields:
+            resolver.prefetch(row['input_data'] for row in rows)
+        for row in rows:
+            chunk = encoder.encode(_history_row(row, fields, resolver))
+            yield (chunk if first else ',' + chunk).encode('utf-8')
+            first = False
+        if len(rows) < HISTORY_EXPORT_BATCH:
+            break
+        page = _after_cursor(queryset, rows[-1]['created_at'], rows[-1]['id'])
+    yield b']}'
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def history_view(request):
     """
-    저장된 추론 이력을 조회합니다.
+    저장된 추론 이력을 최신순으로 조회합니다. (cursor 페이지)
 
     Query Parameters:
     - doctor: 의사 이름 (선택)
     - patient: 환자 이름 (선택)
+    - from / to: 기간 (ISO 날짜 또는 일시, from 이상 ~ to 까지. to 에 날짜만 주면 그 날 포함)
+    - fields: 반환 필드 (기본 id,doctor_name,patient_name,created_at
+              input_data / output_data 는 지정할 때만 포함)
+    - limit: 페이지 크기 (기본 50, 최대 500)
+    - cursor: 이전 응답의 next_cursor
+    - export=1: 페이지 없이 조건에 맞는 전체를 JSON 파일로 스트리밍
 
     예시:
     - /ml/v1/history/?doctor=김의사&patient=홍환자  (의사 & 환자 모두 조회)
-    - /ml/v1/history/?doctor=김의사  (해당 의사의 모든 기록)
-    - /ml/v1/history/?patient=홍환자  (해당 환자의 모든 기록)
-    - /ml/v1/history/  (전체 조회)
+    - /ml/v1/history/?patient=홍환자&from=2025-01-01&to=2025-01-31
+    - /ml/v1/history/?doctor=김의사&fields=id,created_at,output_data&limit=20
+    - /ml/v1/history/?cursor=<next_cursor>  (다음 페이지)
+    - /ml/v1/history/?doctor=김의사&export=1&fields=id,created_at,input_data,output_data
+
+    응답: {"count": 이번 페이지 건수, "results": [...], "next_cursor": str | null}
     """
     try:
-        doctor_name = request.GET.get('doctor')
-        patient_name = request.GET.get('patient')
-
-        # 기본 쿼리셋
-        queryset = InferenceLog.objects.all()
-
-        # 조건에 따른 필터링
-        if doctor_name and patient_name:
-            # 의사 & 환자 모두 존재
-            queryset = queryset.filter(
-                doctor_name=doctor_name,
-                patient_name=patient_name
-            )
-        elif doctor_name:
-            # 의사만 존재
-            queryset = queryset.filter(doctor_name=doctor_name)
-        elif patient_name:
-            # 환자만 존재
-            queryset = queryset.filter(patient_name=patient_name)
-        # 파라미터 없음: 전체 조회 (queryset 그대로 사용)
-
-        # 결과를 JSON 형태로 변환
-        results = []
-        for log in queryset:
-            results.append({
-                'id': log.id,
-                'doctor_name': log.doctor_name,
-                'patient_name': log.patient_name,
-                'input_data': log.input_data,
-                'output_data': log.output_data,
-                'created_at': log.created_at.isoformat()
-            })
+        try:
+            queryset, fields = _history_queryset(request.GET)
+
+            if request.GET.get('export') in ('1', 'true'):
+                export = StreamingHttpResponse(
+                    _stream_history_export(queryset, fields),
+                    content_type='application/json'
+                )
+                export['Content-Disposition'] = 'attachment; filename="inference_history.json"'
+                return export
+
+            try:
+                limit = int(request.GET.get('limit', HISTORY_DEFAULT_LIMIT))
+            except ValueError:
+                raise HistoryQueryError("limit must be an integer")
+            limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+
+            if request.GET.get('cursor'):
+                queryset = _after_cursor(queryset, *_decode_history_cursor(request.GET['cursor']))
+        except HistoryQueryError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        # 1건 더 읽어서 다음 페이지 유무 확인 (COUNT(*) 없음)
+        rows = list(queryset[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        resolver = SequenceResolver()
+        if 'input_data' in fields:
+            resolver.prefetch(row['input_data'] for row in rows)
 
         return JsonResponse({
-            'count': len(results),
-            'results': results
+            'count': len(rows),
+            'results': [_history_row(row, fields, resolver) for row in rows],
+            'next_cursor': _encode_history_cursor(rows[-1]) if has_more else None,
         }, status=200)
 
     except Exception as e:
@@ -321,6 +773,47 @@ def history_view(request):
         )
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def sequence_lookup_view(request):
+    """
+    서열이 이전에 분석된 적 있는지 조회합니다. (서열 저장소 digest 조회, 추론 없음)
+
+    요청 Body: {"sequence": "MKV..."}  (FASTA 헤더 / 공백 / 대소문자 무관)
+    응답: {"seen": bool, "digest": 정규화 서열 digest, "seq_type", "length", "hit_count",
+           "variants": 저장된 원문 표기 수, "first_seen_at", "last_seen_at",
+           "inference_logs": [최근 InferenceLog id ...]}
+    """
+    try:
+        sequence = json.loads(request.body).get('sequence')
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({"error": "Invalid JSON format"}, status=400)
+    if not isinstance(sequence, str) or not sequence.strip():
+        return JsonResponse({"error": "sequence is required"}, status=400)
+
+    # 표기(FASTA 헤더 / 대소문자 / 개행)가 다르면 원문별로 따로 저장되므로 합쳐서 응답
+    variants = find_sequences(sequence)
+    if not variants:
+        return JsonResponse({'seen': False})
+
+    first = variants[0]
+    return JsonResponse({
+        'seen': True,
+        'digest': first.normalized_digest,
+        'seq_type': first.seq_type,
+        'length': first.length,
+        'hit_count': sum(stored.hit_count for stored in variants),
+        'variants': len(variants),
+        'first_seen_at': first.first_seen_at.isoformat(),
+        'last_seen_at': max(stored.last_seen_at for stored in variants).isoformat(),
+        'inference_logs': list(
+            InferenceLog.objects.filter(sequence__in=variants)
+            .order_by('-created_at', '-id')
+            .values_list('id', flat=True)[:20]
+        ),
+    })
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def example_data_proxy(request):
@@ -328,20 +821,70 @@ def example_data_proxy(request):
     Flask ML 서버의 예시 데이터를 조회합니다. (단순 프록시)
     """
     try:
-        flask_url = f"{FLASK_ML_SERVER_URL}/api/example_data"
-
         # 쿼리 파라미터 전달
-        params = request.GET.dict()
+        response = ml_gateway.get(
+            'example_data', '/api/example_data', params=request.GET.dict()
+        )
+        return JsonResponse(response.json(), status=response.status_code)
+    except Exception as e:
+        logger.error(f"Example data proxy error: {str(e)}")
+        return JsonResponse(
+            {"error": f"Cannot connect to Flask server: {str(e)}"},
+            status=503
+        )
 
-        # API 키 헤더 준비
-        headers = {}
-        if FLASK_API_KEY:
-            headers['X-API-Key'] = FLASK_API_KEY
 
-        response = requests.get(flask_url, params=params, headers=headers, timeout=10)
+@csrf_exempt
+@require_http_methods(["POST"])
+def job_create_proxy(request):
+    """
+    Flask ML 서버에 비동기 추론 작업을 등록합니다. (단순 프록시)
+    대량 배치는 predict 대신 이 엔드포인트로 등록하고 job_id 로 결과를 조회합니다.
+    """
+    try:
+        response = ml_gateway.post(
+            'jobs',
+            '/api/jobs',
+            data=request.body,
+            headers={'Content-Type': 'application/json'}
+        )
+        response_data = response.json()
+        if response.status_code < 400 and response_data.get('job_id'):
+            cache.set(
+                JOB_REPLICA_CACHE_KEY.format(job_id=response_data['job_id']),
+                response.ml_replica,
+                JOB_REPLICA_CACHE_TTL
+            )
+        return JsonResponse(response_data, status=response.status_code)
+    except Exception as e:
+        logger.error(f"Job create proxy error: {str(e)}")
+        return JsonResponse(
+            {"error": f"Cannot connect to Flask server: {str(e)}"},
+            status=503
+        )
+
+
+@csrf_exempt
+@require_http_methods(["GET", "DELETE"])
+def job_detail_proxy(request, job_id):
+    """
+    비동기 추론 작업 상태/결과 페이지 조회(GET) 및 취소(DELETE). (단순 프록시)
+
+    Query Parameters (GET):
+    - offset: 완료된 결과 시작 위치
+    - limit: 페이지 크기
+    """
+    try:
+        response = ml_gateway.request(
+            request.method,
+            'job_detail',
+            f"/api/jobs/{job_id}",
+            params=request.GET.dict(),
+            replica=cache.get(JOB_REPLICA_CACHE_KEY.format(job_id=job_id))
+        )
         return JsonResponse(response.json(), status=response.status_code)
     except Exception as e:
-        logger.error(f"Example data proxy error: {str(e)}")
+        logger.error(f"Job detail proxy error: {str(e)}")
         return JsonResponse(
             {"error": f"Cannot connect to Flask server: {str(e)}"},
             status=503
@@ -267,6 +267,55 @@ ORTHANC_URL = config('ORTHANC_URL', default='http://localhost:8042')
 ORTHANC_USERNAME = config('ORTHANC_USERNAME', default='orthanc')
 ORTHANC_PASSWORD = get_required_setting('ORTHANC_PASSWORD', default_dev='orthanc')
 
+# ML / Orthanc 프록시를 async view 로 연결 (ASGI worker 로 서비스할 때만 True)
+# gunicorn -k uvicorn.workers.UvicornWorker neuronova.asgi:application
+ASYNC_PROXY_VIEWS = config('ASYNC_PROXY_VIEWS', default=False, cast=bool)
+
+# Gateway 예측 캐시 (Redis): 같은 입력 + 같은 모델 버전이면 Flask 호출 없이 응답 (0 이면 끔)
+ML_PREDICTION_CACHE_TTL = config('ML_PREDICTION_CACHE_TTL', default=600, cast=int)
+# 같은 요청이 이미 Flask 로 가 있을 때 결과를 기다리는 최대 시간 (초, predict read timeout 과 동일)
+ML_PREDICTION_CACHE_WAIT = config('ML_PREDICTION_CACHE_WAIT', default=60, cast=float)
+
+# InferenceLog write-behind: 요청 중에는 메모리 큐에만 넣고 background thread 가 bulk_create
+# (batch 크기 또는 주기(초) 중 먼저 도달하는 쪽, 정상 종료 시 남은 로그 저장)
+ML_INFERENCE_LOG_BUFFERED = config('ML_INFERENCE_LOG_BUFFERED', default=True, cast=bool)
+ML_INFERENCE_LOG_BATCH_SIZE = config('ML_INFERENCE_LOG_BATCH_SIZE', default=200, cast=int)
+ML_INFERENCE_LOG_FLUSH_INTERVAL = config('ML_INFERENCE_LOG_FLUSH_INTERVAL', default=2.0, cast=float)
+ML_INFERENCE_LOG_MAX_QUEUE = config('ML_INFERENCE_LOG_MAX_QUEUE', default=10000, cast=int)
+
+# async ML gateway 의 호출별 APIUsageLog 도 같은 방식으로 write-behind (async view 가 DB 쓰기에 묶이지 않게)
+API_USAGE_LOG_BUFFERED = config('API_USAGE_LOG_BUFFERED', default=True, cast=bool)
+API_USAGE_LOG_BATCH_SIZE = config('API_USAGE_LOG_BATCH_SIZE', default=200, cast=int)
+API_USAGE_LOG_FLUSH_INTERVAL = config('API_USAGE_LOG_FLUSH_INTERVAL', default=2.0, cast=float)
+API_USAGE_LOG_MAX_QUEUE = config('API_USAGE_LOG_MAX_QUEUE', default=10000, cast=int)
+
+# 로그 테이블 보관 정책 (python manage.py apply_log_retention 을 cron 으로 주기 실행)
+# days 가 지난 행을 batch 단위로 정리. archive: 압축 파일로 옮긴 뒤 삭제 / delete: 그냥 삭제
+LOG_RETENTION_POLICIES = {
+    'ml_proxy.InferenceLog': {
+        'days': config('RETENTION_INFERENCE_LOG_DAYS', default=180, cast=int),
+        'action': 'archive',
+    },
+    'core.APIUsageLog': {
+        'days': config('RETENTION_API_USAGE_LOG_DAYS', default=90, cast=int),
+        'action': 'archive',
+    },
+    # 서버 측 알림 기록은 지우지 않고 아카이브로 보관
+    'notifications.NotificationLog': {
+        'days': config('RETENTION_NOTIFICATION_LOG_DAYS', default=365, cast=int),
+        'action': 'archive',
+    },
+    'emr.ProteinViewLog': {
+        'days': config('RETENTION_PROTEIN_VIEW_LOG_DAYS', default=90, cast=int),
+        'action': 'delete',
+        'date_field': 'viewed_at',
+    },
+}
+LOG_RETENTION_BATCH_SIZE = config('LOG_RETENTION_BATCH_SIZE', default=1000, cast=int)
+LOG_RETENTION_BATCH_PAUSE = config('LOG_RETENTION_BATCH_PAUSE', default=0.05, cast=float)
+LOG_ARCHIVE_DIR = config('LOG_ARCHIVE_DIR', default=str(BASE_DIR / 'archives'))
+LOG_ARCHIVE_FORMAT = config('LOG_ARCHIVE_FORMAT', default='ndjson')  # ndjson (gzip) | parquet (pyarrow 필요)
+
 # Encryption Settings
 # For encrypting sensitive data like SSN (주민등록번호)
 # Generate a key using: from cryptography.fernet import Fernet; Fernet.generate_key()
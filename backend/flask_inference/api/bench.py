@@ -0,0 +1,72 @@
+# api/bench.py
+"""
+배치 추론 경로(api.inference.infer_batch) 처리량 측정
+
+    python -m api.bench --items 256 --depths 0,2,4
+    python -m api.bench --skip-structures      # UniProt/AlphaFold 조회 제외 (모델 경로만 측정)
+
+depth=0 은 전처리 → forward → 후처리를 순차 실행 (파이프라인 이전과 동일한 기준선).
+test_data.pkl 의 단백질 서열을 bulk lane 으로 돌리고 depth 별 items/sec 를 비교한다.
+"""
+import argparse
+import json
+import pickle
+
+from api import inference, routes
+from config import PIPELINE_DEPTH, SCHEDULER_CHUNK_SIZE
+from ml.registry import get_detector
+
+
+def _load_items(path, limit: int):
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    return [
+        {"id": d.get("protein_id"), "sequence": d["sequence"], "seq_type": "protein"}
+        for d in data[:limit]
+    ]
+
+
+def run(items, depths, repeats: int = 1):
+    default_params = inference.common_params({})
+    rows = []
+    for depth in depths:
+        for _ in range(repeats):
+            summary = {}
+            results, _ = inference.infer_batch(
+                items, default_params, "bulk", None, summary, pipeline_depth=depth
+            )
+            row = dict(summary["pipeline"])
+            row["failed"] = sum(1 for r in results if not r.get("ok"))
+            rows.append(row)
+
+    baseline = next((r["items_per_sec"] for r in rows if r["depth"] == 0), None)
+    for row in rows:
+        if baseline:
+            row["speedup"] = round(row["items_per_sec"] / baseline, 2)
+    return rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="배치 추론 파이프라인 처리량 측정")
+    parser.add_argument("--data", default=str(routes.TEST_DATA_PATH))
+    parser.add_argument("--items", type=int, default=128)
+    parser.add_argument("--depths", default=f"0,{PIPELINE_DEPTH}")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--skip-structures", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.skip_structures:
+        inference.find_protein_with_3d = lambda **kwargs: []
+
+    items = _load_items(args.data, args.items)
+    depths = [int(x) for x in args.depths.split(",") if x.strip()]
+
+    # 모델 로드 + 1회 warm-up (첫 배치가 측정에 섞이지 않도록)
+    get_detector()
+    inference.infer_batch(items[:SCHEDULER_CHUNK_SIZE], inference.common_params({}), "bulk")
+
+    print(json.dumps(run(items, depths, args.repeats), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
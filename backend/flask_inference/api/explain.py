@@ -0,0 +1,208 @@
+# api/explain.py
+from flask import Blueprint, request, jsonify
+
+from api.inference import (
+    common_params,
+    deadline_error,
+    item_type_error,
+    overloaded_response,
+    parse_schedule,
+    translate_item,
+)
+from config import EXPLAIN_BATCH_SIZE, EXPLAIN_CACHE_SIZE, EXPLAIN_MAX_ITEMS
+from ml.admission import estimate_tokens, get_admission_controller
+from ml.explain import METHOD, AttributionCache, explain_batch, sequence_hash
+from ml.registry import get_detector, get_model_version, get_weights_version
+from ml.scheduler import DeadlineExceeded, get_scheduler
+from utils.auth import check_api_key
+from utils.serialize import json_response
+
+explain_bp = Blueprint("explain", __name__, url_prefix="/api")
+
+# forward + backward 2회 → 추론 1회 대비 대략 3배 비용으로 admission 계산
+_EXPLAIN_COST_FACTOR = 3
+
+_CACHE = AttributionCache(EXPLAIN_CACHE_SIZE)
+
+
+def _cache_key(version: str, protein_seq: str) -> tuple:
+    return (version, METHOD, sequence_hash(protein_seq))
+
+
+def clear_cache() -> None:
+    """모델 재로딩 시 호출 (key 에 가중치 버전이 있어 섞이진 않지만 이전 가중치 결과는 메모리만 차지)"""
+    _CACHE.clear()
+
+
+def _explain_sequences(protein_seqs: list, priority: str, deadline):
+    """
+    고유 단백질 서열 목록 → {서열: attribution 또는 Exception}, 캐시 hit 수
+    - 캐시에 없는 서열만 EXPLAIN_BATCH_SIZE 단위로 묶어 스케줄러에서 계산
+    """
+    # 계산 도중 재로딩돼도 조회 / 저장이 같은 버전 key 를 쓰도록 시작 시점에 고정
+    version = get_weights_version()
+    explained = {}
+    missing = []
+    for seq in protein_seqs:
+        cached = _CACHE.get(_cache_key(version, seq))
+        if cached is not None:
+            explained[seq] = cached
+        else:
+            missing.append(seq)
+    hits = len(explained)
+
+    scheduler = get_scheduler()
+    chunks = [
+        missing[i: i + EXPLAIN_BATCH_SIZE] for i in range(0, len(missing), EXPLAIN_BATCH_SIZE)
+    ]
+    futures = [
+        scheduler.submit(
+            lambda c=chunk: explain_batch(get_detector(), c),
+            priority=priority,
+            deadline=deadline,
+        )
+        for chunk in chunks
+    ]
+    try:
+        for chunk, future in zip(chunks, futures):
+            try:
+                attributions = future.result()
+            except Exception as e:
+                for seq in chunk:
+                    explained[seq] = e
+                continue
+            for seq, attribution in zip(chunk, attributions):
+                _CACHE.put(_cache_key(version, seq), attribution)
+                explained[seq] = attribution
+    finally:
+        for future in futures:
+            future.cancel()
+    return explained, hits
+
+
+@explain_bp.route("/explain", methods=["POST"])
+def explain():
+    """
+    잔기 단위 attribution (gradient × input, task1 / task2 예측 클래스 기준)
+
+    - 단일 모드: { "sequence": "...", "seq_type": "auto", ... }
+    - 배치 모드: { "items": [ {...}, ... ], ... (공통 기본값) }   (최대 EXPLAIN_MAX_ITEMS 개)
+    - priority / deadline_ms: /api/predict 와 동일
+
+    결과는 (가중치 버전, 단백질 서열 hash) 로 캐시되며,
+    values 는 잔기 순서대로 -100 ~ 100 정수 (scale = 최대 |기여도|) → heat strip 으로 바로 표시
+    """
+    auth_error = check_api_key(request)
+    if auth_error is not None:
+        return auth_error
+
+    data = request.get_json(silent=True) or {}
+    items = data.get("items")
+    batch = isinstance(items, list)
+    if not batch:
+        items = [data]
+    if not items:
+        return jsonify({"ok": False, "error": "items 는 1개 이상의 리스트여야 합니다."}), 400
+    if len(items) > EXPLAIN_MAX_ITEMS:
+        return (
+            jsonify({"ok": False, "error": f"요청당 item 은 최대 {EXPLAIN_MAX_ITEMS}개입니다."}),
+            400,
+        )
+    type_error = item_type_error(items)
+    if type_error:
+        return jsonify({"ok": False, "error": type_error}), 400
+
+    priority, deadline, schedule_error = parse_schedule(data)
+    if schedule_error:
+        return jsonify({"ok": False, "error": schedule_error}), 400
+
+    try:
+        default_params = common_params(data)
+        translated = [
+            translate_item(item or {}, default_params, idx) for idx, item in enumerate(items)
+        ]
+    except (TypeError, ValueError) as e:
+        return jsonify({"ok": False, "error": f"파라미터 형식 오류: {e}"}), 400
+
+    admission = get_admission_controller()
+    cost = estimate_tokens(items, default_params["seq_type"]) * _EXPLAIN_COST_FACTOR
+    ticket, retry_after = admission.try_admit(
+        cost, get_scheduler().queue_depth(), priority
+    )
+    if ticket is None:
+        return overloaded_response(retry_after)
+
+    try:
+        protein_seqs = list(
+            dict.fromkeys(prep["protein_seq"] for err, prep in translated if err is None)
+        )
+        explained, hits = _explain_sequences(protein_seqs, priority, deadline)
+    finally:
+        admission.release(ticket)
+
+    results = []
+    for idx, (error, prepared) in enumerate(translated):
+        if error is not None:
+            results.append(error)
+            continue
+        attribution = explained[prepared["protein_seq"]]
+        if isinstance(attribution, DeadlineExceeded):
+            results.append(deadline_error(idx, items[idx] or {}))
+            continue
+        if isinstance(attribution, Exception):
+            results.append(
+                {
+                    "ok": False,
+                    "index": idx,
+                    "id": prepared["id"],
+                    "error": f"attribution 계산 실패: {attribution}",
+                }
+            )
+            continue
+        results.append(
+            {
+                "ok": True,
+                "index": idx,
+                "id": prepared["id"],
+                "protein_sequence": prepared["protein_seq"],
+                "sequence_hash": sequence_hash(prepared["protein_seq"]),
+                "explanation": attribution,
+            }
+        )
+
+    cache_info = {"hits": hits, "computed": len(protein_seqs) - hits}
+    if batch:
+        return json_response(
+            {
+                "ok": True,
+                "batch": True,
+                "model_version": get_model_version(),
+                "method": METHOD,
+                "cache": cache_info,
+                "results": results,
+            }
+        )
+
+    res = results[0]
+    if not res.get("ok"):
+        status = 504 if res.get("deadline_exceeded") else 400
+        if "attribution 계산 실패" in res.get("error", ""):
+            status = 500
+        return jsonify({"ok": False, **{k: v for k, v in res.items() if k != "ok"}}), status
+    return json_response(
+        {
+            "ok": True,
+            "model_version": get_model_version(),
+            "method": METHOD,
+            "cache": cache_info,
+            **{k: v for k, v in res.items() if k not in ("ok", "index")},
+        }
+    )
+
+
+@explain_bp.route("/explain/cache", methods=["GET"])
+def explain_cache_stats():
+    auth_error = check_api_key(request)
+    if auth_error is not None:
+        return auth_error
+    return jsonify({"ok": True, **_CACHE.stats()})
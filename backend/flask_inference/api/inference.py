@@ -0,0 +1,654 @@
+# api/inference.py
+"""
+단일 / 배치 추론 공통 로직 (Blueprint 없음)
+
+/api/predict (api/routes.py), /api/explain, /api/predict_person, 비동기 작업(api/jobs.py) 이
+같이 쓰는 번역 → 추론 → 응답 조립, 배치 dedup / 파이프라인, 요청 파라미터 파싱을 모아 둔 모듈.
+"""
+import time
+
+from flask import jsonify
+
+from bioseq.translate import translate_to_protein, clean_sequence
+from config import MC_DROPOUT_MAX_SAMPLES, PIPELINE_DEPTH, SCHEDULER_CHUNK_SIZE
+from ml.pipeline import run_pipeline
+from ml.registry import get_detector, get_weights_version
+from ml.scheduler import DEFAULT_PRIORITY, PRIORITY_LANES, DeadlineExceeded, get_scheduler
+from ml.singleflight import SingleFlight
+from structures.uniprot_af import find_protein_with_3d
+
+# 동시에 실행 중인 요청끼리 같은 단백질 서열 추론을 공유 (in-flight dedup)
+_PREDICT_FLIGHT = SingleFlight()
+
+
+def _new_dedup_context() -> dict:
+    """배치 1건 동안 유지되는 중복 제거 상태"""
+    # owned: 이 요청의 forward 가 _PREDICT_FLIGHT leader 로 맡은 key → call (뒤 chunk 가 결과 공유)
+    return {"items": {}, "preds": {}, "owned": {}, "inflight_shared": 0}
+
+
+def _mc_samples(value) -> int:
+    """mc_samples 검증: 0 ~ MC_DROPOUT_MAX_SAMPLES 정수가 아니면 ValueError (→ 400 / item 오류)"""
+    mc_samples = int(value)
+    if not 0 <= mc_samples <= MC_DROPOUT_MAX_SAMPLES:
+        raise ValueError(
+            f"mc_samples 는 0 ~ {MC_DROPOUT_MAX_SAMPLES} 사이여야 합니다. (받은 값: {mc_samples})"
+        )
+    return mc_samples
+
+
+def _item_params(payload: dict, default_params: dict) -> dict:
+    """item 개별 설정이 있으면 우선, 없으면 공통 기본값 사용"""
+    mc_samples = _mc_samples(payload.get("mc_samples", default_params.get("mc_samples", 0)))
+    return {
+        "seq_type": payload.get("seq_type", default_params.get("seq_type", "auto")),
+        "frame": int(payload.get("frame", default_params.get("frame", 0))),
+        "stop_at_stop": bool(
+            payload.get("stop_at_stop", default_params.get("stop_at_stop", False))
+        ),
+        "task3_threshold": float(
+            payload.get("task3_threshold", default_params.get("task3_threshold", 0.5))
+        ),
+        "organism_hint": payload.get(
+            "organism_hint", default_params.get("organism_hint")
+        ),
+        # 불확실성 추정은 전체 모델 경로에서만 가능 → mc_samples 가 있으면 early-exit 끔
+        "early_exit": mc_samples == 0 and bool(
+            payload.get("early_exit", default_params.get("early_exit", False))
+        ),
+        "mc_samples": mc_samples,
+    }
+
+
+def _dedup_key(payload: dict, default_params: dict):
+    """
+    정규화된 서열 + 결과에 영향을 주는 파라미터로 만든 key.
+    파라미터 파싱이 안 되면 None (중복 제거 대상에서 제외)
+    """
+    sequence = payload.get("sequence")
+    if not isinstance(sequence, str) or not sequence:
+        return None
+    try:
+        params = _item_params(payload, default_params)
+    except (TypeError, ValueError):
+        return None
+    return (
+        clean_sequence(sequence),
+        params["seq_type"],
+        params["frame"],
+        params["stop_at_stop"],
+        params["task3_threshold"],
+        params["organism_hint"],
+        params["early_exit"],
+        params["mc_samples"],
+    )
+
+
+def _predict_early_exit_batch(detector, protein_seqs: list, task3_threshold: float) -> list:
+    """
+    early-exit cascade 배치 추론 (layer 마다 confident 한 서열은 빠지고 나머지만 진행)
+    early_exit.pt 가 없으면 전체 모델 배치 추론으로 대체
+    """
+    # torch 가 필요한 모듈이라 실제로 쓸 때 import
+    from ml.early_exit import get_early_exit_runner
+
+    runner = get_early_exit_runner(detector)
+    if runner is not None:
+        return runner.predict_batch(protein_seqs, task3_threshold)
+    preds = detector.predict_batch(protein_seqs, task3_threshold=task3_threshold)
+    for pred in preds:
+        pred["early_exit"] = {"exited": False, "available": False}
+    return preds
+
+
+def _predict_shared(
+    protein_seq: str,
+    task3_threshold: float,
+    ctx: dict = None,
+    early_exit: bool = False,
+    mc_samples: int = 0,
+):
+    """
+    같은 단백질 서열 추론을 1회로 합침
+    - ctx["preds"]: 같은 배치 안의 중복 (입력 형태가 달라도 번역 결과가 같으면 공유)
+    - _PREDICT_FLIGHT: 동시에 실행 중인 다른 요청과의 중복 (singleflight, 배치 forward 가 계산 중인 key 포함)
+    - early_exit=True: 보정된 중간 layer head 가 있으면 cascade 추론 (task1 조기 종료)
+    - mc_samples > 0: MC-dropout 불확실성 (prediction["uncertainty"])
+    """
+    detector = get_detector()
+    key = (get_weights_version(), protein_seq, task3_threshold, early_exit, mc_samples)
+
+    if ctx is not None and key in ctx["preds"]:
+        return ctx["preds"][key]
+
+    def run():
+        if early_exit:
+            return _predict_early_exit_batch(detector, [protein_seq], task3_threshold)[0]
+        return detector.predict(
+            protein_seq, task3_threshold=task3_threshold, mc_samples=mc_samples
+        )
+
+    pred, shared = _PREDICT_FLIGHT.do(key, run)
+
+    if ctx is not None:
+        ctx["preds"][key] = pred
+        if shared:
+            ctx["inflight_shared"] += 1
+    return pred
+
+
+def translate_item(payload: dict, default_params: dict, index: int):
+    """
+    1) DNA/RNA/Protein → 단백질 서열 변환
+    반환: (실패 결과 dict, None) 또는 (None, 준비된 item dict)
+    """
+    sequence = payload.get("sequence", "")
+    if not sequence:
+        return {
+            "ok": False,
+            "index": index,
+            "id": payload.get("id"),
+            "error": "sequence 필드는 필수입니다.",
+        }, None
+
+    params = _item_params(payload, default_params)
+
+    try:
+        protein_seq, trans_info = translate_to_protein(
+            raw_sequence=sequence,
+            seq_type=params["seq_type"],
+            frame=params["frame"],
+            stop_at_stop=params["stop_at_stop"],
+        )
+    except Exception as e:
+        return {
+            "ok": False,
+            "index": index,
+            "id": payload.get("id"),
+            "error": f"서열 변환 실패: {e}",
+        }, None
+
+    if not protein_seq:
+        return {
+            "ok": False,
+            "index": index,
+            "id": payload.get("id"),
+            "error": "단백질 서열로 변환된 결과가 비어 있습니다.",
+            "translation_info": trans_info,
+        }, None
+
+    return None, {
+        "index": index,
+        "id": payload.get("id"),
+        "params": params,
+        "protein_seq": protein_seq,
+        "translation_info": trans_info,
+    }
+
+
+def _build_result(prepared: dict, pred: dict) -> dict:
+    """
+    3) Task3 Top-1 → UniProt/AlphaFold 3D 조회 후 item 결과 구성
+    """
+    # early-exit 으로 task1 에서 끝난 경우 task3 는 None
+    task3 = pred.get("task3") or {}
+    top_preds = task3.get("top_predictions", [])
+    structure_info = None
+    top1_name = None
+    top1_prob = None
+
+    if top_preds:
+        # top_predictions가 [(label, prob), ...] 형태라고 가정
+        top1_name, top1_prob = top_preds[0]
+        if top1_name and str(top1_name).lower() != "other":
+            try:
+                hits = find_protein_with_3d(
+                    protein_name=str(top1_name),
+                    organism=prepared["params"]["organism_hint"],
+                    max_results=3,
+                    reviewed=True,
+                )
+            except Exception as e:
+                print(f"[WARN] find_protein_with_3d 실패: {e}")
+                hits = []
+
+            preferred = hits[0].get("preferred_3d") if hits else None
+            structure_info = {
+                "protein_name": top1_name,
+                "top1_probability": top1_prob,
+                "uniprot_hits": hits,
+                "preferred_3d": preferred,
+            }
+        else:
+            # Other → 빈 자료
+            structure_info = {
+                "protein_name": top1_name,
+                "top1_probability": top1_prob,
+                "uniprot_hits": [],
+                "preferred_3d": None,
+            }
+
+    return {
+        "ok": True,
+        "index": prepared["index"],
+        "id": prepared["id"],
+        "translation": {
+            "protein_sequence": prepared["protein_seq"],
+            "info": prepared["translation_info"],
+        },
+        "prediction": pred,
+        "task3_structure": structure_info,
+    }
+
+
+def _inference_error(prepared: dict, error) -> dict:
+    return {
+        "ok": False,
+        "index": prepared["index"],
+        "id": prepared["id"],
+        "error": f"모델 추론 실패: {error}",
+    }
+
+
+def infer_single_item(payload: dict, default_params: dict, index: int, ctx: dict = None):
+    """
+    단일 item에 대해:
+    1) DNA/RNA/Protein → 단백질 서열 변환
+    2) 모델 추론
+    3) Task3 Top-1 → UniProt/AlphaFold 3D 조회
+    """
+    error, prepared = translate_item(payload, default_params, index)
+    if error is not None:
+        return error
+
+    params = prepared["params"]
+    try:
+        pred = _predict_shared(
+            prepared["protein_seq"],
+            params["task3_threshold"],
+            ctx,
+            early_exit=params["early_exit"],
+            mc_samples=params["mc_samples"],
+        )
+    except Exception as e:
+        return _inference_error(prepared, e)
+
+    return _build_result(prepared, pred)
+
+
+def deadline_error(index: int, item: dict) -> dict:
+    return {
+        "ok": False,
+        "index": index,
+        "id": item.get("id"),
+        "error": "deadline 이 지나 처리하지 않았습니다.",
+        "deadline_exceeded": True,
+    }
+
+
+def _plan_batch(items: list, default_params: dict):
+    """
+    같은 정규화 서열/파라미터를 가진 item 은 대표 1건만 남김.
+    반환: (unique [(index, item)], owners[unique 위치] = 그 결과를 받을 index 목록)
+    """
+    unique = []
+    owners = []
+    seen = {}
+    for idx, item in enumerate(items):
+        key = _dedup_key(item, default_params)
+        if key is not None and key in seen:
+            owners[seen[key]].append(idx)
+            continue
+        if key is not None:
+            seen[key] = len(unique)
+        unique.append((idx, item))
+        owners.append([idx])
+    return unique, owners
+
+
+def _prepare_chunk(chunk: list, default_params: dict, ctx: dict) -> dict:
+    """
+    [전처리 단계] micro-batch 번역 + 토크나이즈
+    - 같은 요청 안에서 이미 추론한 서열(ctx["preds"])과 chunk 내 중복은 forward 에서 제외
+    - early_exit item 은 따로 모아 forward 단계에서 배치 cascade 1회로 처리
+    """
+    entries = []
+    pending = {}
+    early_pending = {}
+    version = get_weights_version()
+    for idx, item in chunk:
+        try:
+            error, prepared = translate_item(item, default_params, idx)
+        except (TypeError, ValueError) as e:
+            # frame / task3_threshold 등 파라미터 형식 오류
+            error = {"ok": False, "index": idx, "id": item.get("id"), "error": str(e)}
+        if error is not None:
+            entries.append({"error": error})
+            continue
+
+        params = prepared["params"]
+        key = (
+            version,
+            prepared["protein_seq"],
+            params["task3_threshold"],
+            params["early_exit"],
+            params["mc_samples"],
+        )
+        prepared["key"] = key
+        entries.append(prepared)
+        if key in ctx["preds"]:
+            continue
+        if params["early_exit"]:
+            early_pending.setdefault(key, prepared["protein_seq"])
+        else:
+            pending.setdefault(key, prepared["protein_seq"])
+
+    keys = list(pending)
+    prepared_chunk = {
+        "entries": entries,
+        "keys": keys,
+        "early_keys": list(early_pending),
+        "tokens": None,
+        "error": None,
+    }
+    if keys:
+        try:
+            _, ids, mask = get_detector().tokenize(
+                [pending[k] for k in keys], padding="longest"
+            )
+            prepared_chunk["tokens"] = (ids, mask)
+        except Exception as e:
+            # 모델 로드 실패 등 → forward 단계에서 chunk 전체 추론 실패로 처리
+            prepared_chunk["error"] = e
+    return prepared_chunk
+
+
+def _claim_keys(keys: list, ctx: dict):
+    """
+    forward 시작 시점에 key 를 _PREDICT_FLIGHT 에 등록 (요청 간 in-flight dedup)
+    반환: (이 chunk 가 leader 인 {key: call}, 이미 계산 중인 {key: call}, 다른 요청과 공유한 수)
+    실제로 실행 중일 때만 leader 가 되므로, 대기하는 쪽은 항상 이미 돌고 있는 계산을 기다림
+    (스케줄러 큐에서 순서를 기다리는 작업을 기다리다 worker 가 막히는 일이 없음)
+    """
+    owned, joined, shared = {}, {}, 0
+    for key in keys:
+        call = ctx["owned"].get(key)
+        if call is not None:
+            # 같은 요청의 앞 chunk 가 맡은 key
+            joined[key] = call
+            continue
+        call, leader = _PREDICT_FLIGHT.claim(key)
+        if leader:
+            owned[key] = call
+            ctx["owned"][key] = call
+        else:
+            joined[key] = call
+            shared += 1
+    return owned, joined, shared
+
+
+def _forward_chunk(prepared_chunk: dict, ctx: dict, timings: dict) -> dict:
+    """
+    [forward 단계] 스케줄러 worker 에서 실행: 배치 1회 forward (+ early_exit 배치 cascade)
+    - 다른 요청이 이미 계산 중인 key 는 forward 에서 빼고 후처리에서 그 결과를 기다림
+    - 이 chunk 가 맡은 key 는 끝나는 즉시 대기자에게 전달 (그래서 logits → 응답 형식 변환도 여기서 함)
+    """
+    started = time.perf_counter()
+    keys = prepared_chunk["keys"]
+    owned, joined, shared = _claim_keys(keys + prepared_chunk["early_keys"], ctx)
+    out = {"preds": {}, "joined": joined, "shared": shared}
+    try:
+        if prepared_chunk["error"] is not None:
+            raise prepared_chunk["error"]
+        detector = get_detector()
+        forward_keys = [key for key in keys if key in owned]
+        if forward_keys:
+            if forward_keys == keys:
+                ids, mask = prepared_chunk["tokens"]
+            else:
+                # 토큰은 전처리 때 chunk 전체 기준 → 빠진 key 가 있으면 남은 key 만 다시 토크나이즈
+                _, ids, mask = detector.tokenize(
+                    [key[1] for key in forward_keys], padding="longest"
+                )
+            mc_samples = [key[4] for key in forward_keys]
+            mc = None
+            if any(mc_samples):
+                # backbone 은 1회, MC-dropout 은 head 만 샘플 수만큼 복제해서 배치 처리
+                (t1, t2, t3), mc = detector.forward_with_uncertainty(ids, mask, mc_samples)
+            else:
+                t1, t2, t3 = detector.forward_logits(ids, mask)
+            for i, key in enumerate(forward_keys):
+                _, protein_seq, task3_threshold, _, _ = key
+                pred = detector.format_prediction(
+                    len(protein_seq), t1[i], t2[i], t3[i], task3_threshold
+                )
+                if mc is not None and mc[i] is not None:
+                    pred["uncertainty"] = detector.summarize_uncertainty(mc[i])
+                out["preds"][key] = pred
+
+        # cascade 는 task3_threshold 하나로 실행 → threshold 별로 묶음 (보통 chunk 당 1회)
+        by_threshold = {}
+        for key in prepared_chunk["early_keys"]:
+            if key in owned:
+                by_threshold.setdefault(key[2], []).append(key)
+        for task3_threshold, early_keys in by_threshold.items():
+            try:
+                preds = _predict_early_exit_batch(
+                    detector, [key[1] for key in early_keys], task3_threshold
+                )
+            except Exception as e:
+                preds = [e] * len(early_keys)
+            out["preds"].update(zip(early_keys, preds))
+    except BaseException as e:
+        for key, call in owned.items():
+            _PREDICT_FLIGHT.finish(key, call, error=e)
+        raise
+    else:
+        for key, call in owned.items():
+            pred = out["preds"].get(key)
+            if isinstance(pred, Exception):
+                _PREDICT_FLIGHT.finish(key, call, error=pred)
+            else:
+                _PREDICT_FLIGHT.finish(key, call, result=pred)
+    finally:
+        timings["forward_ms"] += (time.perf_counter() - started) * 1000
+    return out
+
+
+def _postprocess_chunk(prepared_chunk: dict, forwarded: dict, ctx: dict) -> list:
+    """[후처리 단계] 응답 형식 조립, 3D 구조 조회 (+ 다른 요청이 계산 중이던 key 결과 대기)"""
+    preds = forwarded["preds"]
+    for key, pred in preds.items():
+        if not isinstance(pred, Exception):
+            ctx["preds"][key] = pred
+    # leader 는 이미 실행 중이므로 (_claim_keys) 여기서 기다려도 다른 작업을 막지 않음
+    for key, call in forwarded["joined"].items():
+        try:
+            ctx["preds"][key] = _PREDICT_FLIGHT.wait(call)
+        except Exception as e:
+            preds[key] = e
+    ctx["inflight_shared"] += forwarded["shared"]
+
+    results = []
+    for entry in prepared_chunk["entries"]:
+        if "error" in entry:
+            results.append(entry["error"])
+            continue
+        pred = ctx["preds"].get(entry["key"]) or preds.get(entry["key"])
+        if pred is None or isinstance(pred, Exception):
+            results.append(_inference_error(entry, pred or "결과 없음"))
+            continue
+        results.append(_build_result(entry, pred))
+    return results
+
+
+def iter_batch(
+    items: list,
+    default_params: dict,
+    priority: str,
+    deadline: float,
+    summary: dict,
+    pipeline_depth: int = None,
+    chunk_size: int = None,
+):
+    """
+    배치 추론 + 중복 제거 + 스케줄링 (generator)
+    1) 중복 item 제거 (_plan_batch)
+    2) 대표 item 들을 SCHEDULER_CHUNK_SIZE 단위 micro-batch 로 나눠 3단계 파이프라인 실행
+       - 전처리 (번역/토크나이즈): 별도 thread 에서 다음 micro-batch 를 미리 준비
+       - forward: micro-batch 당 1회, 스케줄러에 예약 (chunk 사이에 더 급한 lane 이 끼어들 수 있음)
+       - 후처리 (응답 형식/3D 조회): 이 generator 를 소비하는 thread 에서 다음 forward 와 겹쳐 실행
+    3) micro-batch 가 끝날 때마다 해당 결과를 원래 index 별로 복사해서 바로 yield
+    끝나면 summary 에 dedup / pipeline 통계를 채운다.
+    chunk_size 를 주면 SCHEDULER_CHUNK_SIZE 대신 사용 (예: 한 사람의 샘플 전체를 forward 1회로)
+    """
+    started = time.perf_counter()
+    depth = PIPELINE_DEPTH if pipeline_depth is None else pipeline_depth
+    chunk_size = max(1, chunk_size or SCHEDULER_CHUNK_SIZE)
+    ctx = _new_dedup_context()
+    items = [item or {} for item in items]
+    unique, owners = _plan_batch(items, default_params)
+
+    scheduler = get_scheduler()
+    timings = {"forward_ms": 0.0, "postprocess_ms": 0.0}
+    pipe_stats = {}
+    starts = list(range(0, len(unique), chunk_size))
+    chunks = [unique[i: i + chunk_size] for i in starts]
+
+    stages = run_pipeline(
+        chunks,
+        preprocess=lambda chunk: _prepare_chunk(chunk, default_params, ctx),
+        submit=lambda prepared: scheduler.submit(
+            lambda: _forward_chunk(prepared, ctx, timings),
+            priority=priority,
+            deadline=deadline,
+        ),
+        depth=depth,
+        stats=pipe_stats,
+    )
+
+    try:
+        for start, chunk, (prepared, future) in zip(starts, chunks, stages):
+            post_started = time.perf_counter()
+            try:
+                chunk_results = _postprocess_chunk(prepared, future.result(), ctx)
+            except DeadlineExceeded:
+                chunk_results = [deadline_error(idx, item) for idx, item in chunk]
+            except Exception as e:
+                chunk_results = [
+                    _inference_error({"index": idx, "id": item.get("id")}, e)
+                    for idx, item in chunk
+                ]
+            timings["postprocess_ms"] += (time.perf_counter() - post_started) * 1000
+
+            for offset, res in enumerate(chunk_results):
+                for idx in owners[start + offset]:
+                    if res["index"] == idx:
+                        yield res
+                    else:
+                        yield {**res, "index": idx, "id": items[idx].get("id")}
+    finally:
+        # 클라이언트가 중간에 끊으면 전처리 thread 정지 + 아직 시작 안 한 forward 취소
+        stages.close()
+
+    total = len(items)
+    summary["dedup"] = {
+        "total_items": total,
+        "unique_items": len(unique),
+        "unique_sequences": len(ctx["preds"]),
+        "inflight_shared": ctx["inflight_shared"],
+        "dedup_ratio": round(1 - len(unique) / total, 4) if total else 0.0,
+    }
+    wall_ms = (time.perf_counter() - started) * 1000
+    busy_ms = (
+        pipe_stats.get("preprocess_ms", 0.0) + timings["forward_ms"] + timings["postprocess_ms"]
+    )
+    summary["pipeline"] = {
+        "depth": depth,
+        "chunks": len(chunks),
+        "preprocess_ms": round(pipe_stats.get("preprocess_ms", 0.0), 1),
+        "forward_ms": round(timings["forward_ms"], 1),
+        "postprocess_ms": round(timings["postprocess_ms"], 1),
+        "wall_ms": round(wall_ms, 1),
+        # 1 보다 크면 단계들이 겹쳐 실행된 것 (단계 합 / 실제 소요 시간)
+        "overlap": round(busy_ms / wall_ms, 2) if wall_ms else 0.0,
+        "items_per_sec": round(total / (wall_ms / 1000), 2) if wall_ms else 0.0,
+    }
+
+
+def infer_batch(
+    items: list,
+    default_params: dict,
+    priority: str = DEFAULT_PRIORITY,
+    deadline: float = None,
+    summary: dict = None,
+    pipeline_depth: int = None,
+):
+    """배치 추론 결과를 index 순서 리스트로 모아서 반환: (results, dedup)"""
+    summary = {} if summary is None else summary
+    results = [None] * len(items)
+    for res in iter_batch(
+        items, default_params, priority, deadline, summary, pipeline_depth=pipeline_depth
+    ):
+        results[res["index"]] = res
+    return results, summary["dedup"]
+
+
+def common_params(data: dict) -> dict:
+    """공통 기본값 (배치 시 각 item에서 override 가능)"""
+    return {
+        "seq_type": data.get("seq_type", "auto"),
+        "frame": int(data.get("frame", 0)),
+        "stop_at_stop": bool(data.get("stop_at_stop", False)),
+        "task3_threshold": float(data.get("task3_threshold", 0.5)),
+        "organism_hint": data.get("organism_hint"),
+        "early_exit": bool(data.get("early_exit", False)),
+        "mc_samples": _mc_samples(data.get("mc_samples", 0)),
+    }
+
+
+def item_type_error(items: list, field: str = "items"):
+    """
+    item 이 객체(dict)가 아니면 400 용 오류 메시지, 모두 괜찮으면 None
+    null 은 빈 item 으로 보고 item 단위 오류로 처리하므로 허용
+    """
+    for idx, item in enumerate(items):
+        if item is not None and not isinstance(item, dict):
+            return f"{field}[{idx}] 는 객체(JSON object)여야 합니다."
+    return None
+
+
+def parse_schedule(data: dict, default_priority: str = DEFAULT_PRIORITY):
+    """
+    요청 body 의 priority / deadline_ms 파싱
+    - priority: stat / routine / bulk (기본 routine)
+    - deadline_ms: 요청 수신 시점부터 허용하는 최대 대기+처리 시간 (ms)
+    반환: (priority, deadline(monotonic 절대시각 또는 None), error 메시지 또는 None)
+    """
+    priority = data.get("priority", default_priority)
+    if priority not in PRIORITY_LANES:
+        return None, None, f"priority는 {' / '.join(PRIORITY_LANES)} 중 하나여야 합니다."
+
+    deadline_ms = data.get("deadline_ms")
+    if deadline_ms is None:
+        return priority, None, None
+    try:
+        deadline_ms = float(deadline_ms)
+    except (TypeError, ValueError):
+        return None, None, "deadline_ms는 숫자(ms)여야 합니다."
+
+    return priority, time.monotonic() + deadline_ms / 1000.0, None
+
+
+def overloaded_response(retry_after: int):
+    return (
+        jsonify(
+            {
+                "ok": False,
+                "error": "추론 서버가 과부하 상태입니다. 잠시 후 다시 시도하세요.",
+                "retry_after": retry_after,
+            }
+        ),
+        429,
+        {"Retry-After": str(retry_after)},
+    )
@@ -0,0 +1,197 @@
+# api/jobs.py
+import threading
+
+from flask import Blueprint, request, jsonify
+
+from api.inference import common_params, infer_batch, item_type_error, parse_schedule
+from config import (
+    JOB_DB_PATH,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ITEMS,
+    JOB_RESULT_TTL,
+    JOB_WORKERS,
+    SCHEDULER_CHUNK_SIZE,
+)
+from jobs.store import FINISHED_STATES, JobStore
+from jobs.worker import JobWorkerPool
+from ml.registry import get_model_version
+from utils.auth import check_api_key
+from utils.serialize import Projector, json_response, parse_projection
+
+jobs_bp = Blueprint("jobs", __name__, url_prefix="/api")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_job_pool() -> JobWorkerPool:
+    """JobStore + worker 풀 (프로세스당 1개, 최초 호출 시 시작)"""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                pool = JobWorkerPool(
+                    store=JobStore(JOB_DB_PATH, ttl=JOB_RESULT_TTL),
+                    run_batch=lambda items, params, priority: infer_batch(
+                        items, params, priority
+                    ),
+                    model_version=get_model_version,
+                    workers=JOB_WORKERS,
+                    chunk_size=SCHEDULER_CHUNK_SIZE,
+                    lease=JOB_LEASE_SECONDS,
+                )
+                pool.start()
+                _POOL = pool
+    return _POOL
+
+
+def _job_summary(job: dict) -> dict:
+    total = job["total"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "total": total,
+        "completed": job["completed"],
+        "failed": job["failed"],
+        "progress": round(job["completed"] / total, 4) if total else 1.0,
+        "model_version": job["model_version"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "expires_at": job["expires_at"],
+    }
+
+
+# ---------------------------------------------------------------------------
+# 비동기 추론 작업 등록
+# ---------------------------------------------------------------------------
+@jobs_bp.route("/jobs", methods=["POST"])
+def create_job():
+    """
+    /api/predict 배치 모드와 같은 body 를 받아 작업으로 등록하고 바로 job_id 반환.
+        {
+          "items": [ {...}, {...}, ... ],
+          "frame": 0, "task3_threshold": 0.5, ... (공통 기본값),
+          "priority": "bulk"   (기본 bulk)
+        }
+    결과는 GET /api/jobs/<job_id> 로 조회 (실행 중에도 완료된 item 부터 조회 가능)
+    """
+    auth_error = check_api_key(request)
+    if auth_error is not None:
+        return auth_error
+
+    data = request.get_json(silent=True) or {}
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"ok": False, "error": "items 는 1개 이상의 리스트여야 합니다."}), 400
+    if len(items) > JOB_MAX_ITEMS:
+        return (
+            jsonify(
+                {
+                    "ok": False,
+                    "error": f"작업 1건당 item 은 최대 {JOB_MAX_ITEMS}개입니다.",
+                }
+            ),
+            400,
+        )
+    type_error = item_type_error(items)
+    if type_error:
+        return jsonify({"ok": False, "error": type_error}), 400
+
+    priority, _, schedule_error = parse_schedule(data, default_priority="bulk")
+    if schedule_error:
+        return jsonify({"ok": False, "error": schedule_error}), 400
+
+    try:
+        params = common_params(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"ok": False, "error": f"파라미터 형식 오류: {e}"}), 400
+
+    pool = get_job_pool()
+    job_id = pool.store.create(items, params, priority)
+    pool.notify()
+
+    return (
+        jsonify(
+            {
+                "ok": True,
+                "job_id": job_id,
+                "status": "queued",
+                "total": len(items),
+                "status_url": f"/api/jobs/{job_id}",
+            }
+        ),
+        202,
+    )
+
+
+# ---------------------------------------------------------------------------
+# 작업 상태 + 결과 페이지 조회
+# ---------------------------------------------------------------------------
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id: str):
+    """
+    query:
+      - offset: 완료된 결과 중 시작 위치 (기본 0)
+      - limit: 페이지 크기 (기본 100, 최대 1000, 0 이면 상태만)
+      - view / fields: 결과 projection (/api/predict 와 동일)
+    """
+    auth_error = check_api_key(request)
+    if auth_error is not None:
+        return auth_error
+
+    try:
+        offset = max(0, int(request.args.get("offset", "0")))
+        limit = min(MAX_PAGE_SIZE, max(0, int(request.args.get("limit", DEFAULT_PAGE_SIZE))))
+    except ValueError:
+        return jsonify({"ok": False, "error": "offset, limit는 정수여야 합니다."}), 400
+
+    fields, projection_error = parse_projection(
+        request.args.get("view"), request.args.get("fields")
+    )
+    if projection_error:
+        return jsonify({"ok": False, "error": projection_error}), 400
+    project = Projector(fields)
+
+    store = get_job_pool().store
+    job = store.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "작업이 없거나 보관 기간이 지났습니다."}), 404
+
+    results = [project(r) for r in store.results(job_id, offset, limit)] if limit else []
+    next_offset = offset + len(results)
+    has_more = next_offset < job["completed"] or job["status"] not in FINISHED_STATES
+
+    return json_response(
+        {
+            "ok": True,
+            **_job_summary(job),
+            "offset": offset,
+            "limit": limit,
+            "next_offset": next_offset if has_more else None,
+            "results": results,
+        }
+    )
+
+
+# ---------------------------------------------------------------------------
+# 작업 취소
+# ---------------------------------------------------------------------------
+@jobs_bp.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id: str):
+    auth_error = check_api_key(request)
+    if auth_error is not None:
+        return auth_error
+
+    store = get_job_pool().store
+    if store.get(job_id) is None:
+        return jsonify({"ok": False, "error": "작업이 없거나 보관 기간이 지났습니다."}), 404
+    if not store.cancel(job_id):
+        return jsonify({"ok": False, "error": "이미 종료된 작업입니다."}), 409
+
+    return jsonify({"ok": True, "job_id": job_id, "status": "cancelled"})
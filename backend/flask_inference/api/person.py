@@ -0,0 +1,178 @@
+# api/person.py
+from collections import Counter
+
+from flask import Blueprint, request, jsonify
+
+from api.inference import (
+    common_params,
+    item_type_error,
+    iter_batch,
+    overloaded_response,
+    parse_schedule,
+)
+from config import PERSON_MAX_SAMPLES
+from ml.admission import estimate_tokens, get_admission_controller
+from ml.registry import get_model_version
+from ml.scheduler import get_scheduler
+from utils.auth import check_api_key
+from utils.serialize import Projector, json_response, parse_projection
+
+person_bp = Blueprint("person", __name__, url_prefix="/api")
+
+AGGREGATIONS = ("mean", "vote")
+DEFAULT_AGGREGATION = "mean"
+
+# task2 (질병) 라벨 → 프론트엔드 사람별 항원 라벨 (routes.ANTIGEN_LABELS)
+TASK2_TO_ANTIGEN = {
+    "None": "Normal",
+    "Common_Cold": "Cold",
+    "Influenza": "Flu",
+    "COVID-19": "COVID",
+}
+
+
+def _pool(preds: list, task: str, aggregation: str) -> dict:
+    """
+    샘플별 task1 / task2 결과 → 사람 단위 결과
+    - mean: 확률 평균 (probability pooling) 후 argmax
+    - vote: 샘플 예측 다수결, 동률이면 평균 확률이 높은 쪽. confidence = 득표율
+    """
+    labels = list(preds[0][task]["probabilities"])
+    mean = {
+        label: sum(p[task]["probabilities"][label] for p in preds) / len(preds)
+        for label in labels
+    }
+
+    if aggregation == "vote":
+        votes = Counter(p[task]["prediction"] for p in preds)
+        prediction = max(labels, key=lambda label: (votes.get(label, 0), mean[label]))
+        confidence = votes.get(prediction, 0) / len(preds)
+        return {
+            "prediction": prediction,
+            "confidence": confidence,
+            "votes": dict(votes),
+            "probabilities": mean,
+        }
+
+    prediction = max(labels, key=lambda label: mean[label])
+    return {
+        "prediction": prediction,
+        "confidence": mean[prediction],
+        "probabilities": mean,
+    }
+
+
+def aggregate_person(results: list, aggregation: str = DEFAULT_AGGREGATION) -> dict:
+    """성공한 샘플 결과들로 사람 단위 진단 계산 (task1: 병원체 여부, task2: 질병)"""
+    preds = [
+        r["prediction"]
+        for r in results
+        if r.get("ok")
+        and r["prediction"].get("task1")
+        and r["prediction"].get("task2")
+    ]
+    if not preds:
+        return {"aggregation": aggregation, "samples_used": 0, "antigen": None}
+
+    task1 = _pool(preds, "task1", aggregation)
+    task2 = _pool(preds, "task2", aggregation)
+    return {
+        "aggregation": aggregation,
+        "samples_used": len(preds),
+        "pathogen_samples": sum(1 for p in preds if p["task1"]["prediction"] == "Pathogen"),
+        "task1": task1,
+        "task2": task2,
+        "antigen": TASK2_TO_ANTIGEN.get(task2["prediction"], task2["prediction"]),
+    }
+
+
+@person_bp.route("/predict_person", methods=["POST"])
+def predict_person():
+    """
+    한 사람의 여러 샘플을 forward 1회로 추론하고 사람 단위 진단을 함께 반환
+        {
+          "person_id": "P001",
+          "samples": [ {"sequence": "...", "seq_type": "protein"}, ... ],
+          "aggregation": "mean" | "vote"      (기본 mean)
+          "frame": 0, "task3_threshold": 0.5, ... (공통 기본값, /api/predict 와 동일)
+          "priority", "deadline_ms", "view", "fields"   (/api/predict 와 동일)
+        }
+    /api/example_data 의 items[i] (person_id + samples) 를 그대로 보내도 됨
+    """
+    auth_error = check_api_key(request)
+    if auth_error is not None:
+        return auth_error
+
+    data = request.get_json(silent=True) or {}
+    samples = data.get("samples")
+    if not isinstance(samples, list) or not samples:
+        return jsonify({"ok": False, "error": "samples 는 1개 이상의 리스트여야 합니다."}), 400
+    if len(samples) > PERSON_MAX_SAMPLES:
+        return (
+            jsonify(
+                {"ok": False, "error": f"한 사람당 샘플은 최대 {PERSON_MAX_SAMPLES}개입니다."}
+            ),
+            400,
+        )
+    type_error = item_type_error(samples, field="samples")
+    if type_error:
+        return jsonify({"ok": False, "error": type_error}), 400
+
+    aggregation = data.get("aggregation", DEFAULT_AGGREGATION)
+    if aggregation not in AGGREGATIONS:
+        return (
+            jsonify(
+                {"ok": False, "error": f"aggregation은 {' / '.join(AGGREGATIONS)} 중 하나여야 합니다."}
+            ),
+            400,
+        )
+
+    priority, deadline, schedule_error = parse_schedule(data)
+    if schedule_error:
+        return jsonify({"ok": False, "error": schedule_error}), 400
+
+    fields, projection_error = parse_projection(
+        data.get("view") or request.args.get("view"),
+        data.get("fields") or request.args.get("fields"),
+    )
+    if projection_error:
+        return jsonify({"ok": False, "error": projection_error}), 400
+    project = Projector(fields)
+
+    try:
+        default_params = common_params(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"ok": False, "error": f"파라미터 형식 오류: {e}"}), 400
+    # 사람 단위 집계에 task2 가 필요하므로 early-exit (task1 만 계산) 은 쓰지 않음
+    default_params["early_exit"] = False
+    items = [{**(sample or {}), "early_exit": False} for sample in samples]
+
+    admission = get_admission_controller()
+    cost = estimate_tokens(items, default_params["seq_type"])
+    ticket, retry_after = admission.try_admit(cost, get_scheduler().queue_depth(), priority)
+    if ticket is None:
+        return overloaded_response(retry_after)
+
+    summary = {}
+    results = [None] * len(items)
+    try:
+        # chunk_size = 샘플 수 → 한 사람의 샘플 전체가 forward 1회
+        for res in iter_batch(
+            items, default_params, priority, deadline, summary, chunk_size=len(items)
+        ):
+            results[res["index"]] = res
+    finally:
+        admission.release(ticket)
+
+    return json_response(
+        {
+            "ok": True,
+            "person_id": data.get("person_id"),
+            "model_version": get_model_version(),
+            "priority": priority,
+            "diagnosis": aggregate_person(results, aggregation),
+            "dedup": summary.get("dedup"),
+            "pipeline": summary.get("pipeline"),
+            "samples": [project(res) for res in results],
+        }
+    )
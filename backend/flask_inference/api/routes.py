@@ -1,18 +1,40 @@
 # api/routes.py
 import random
 import pickle
+import threading
+import time
 from functools import lru_cache
 from pathlib import Path
 
-from flask import Blueprint, request, jsonify
-
-from bioseq.translate import translate_to_protein
-from ml.model import get_detector, load_model, get_model_version
-from structures.uniprot_af import find_protein_with_3d
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+
+from api.explain import clear_cache as clear_explain_cache
+from api.inference import (
+    common_params,
+    infer_batch,
+    infer_single_item,
+    item_type_error,
+    iter_batch,
+    overloaded_response,
+    parse_schedule,
+)
+from ml.admission import estimate_tokens, get_admission_controller
+from ml.registry import (
+    get_model_version,
+    get_weights_version,
+    is_model_loaded,
+    load_model,
+)
+from ml.scheduler import DeadlineExceeded, get_scheduler
+from ml.warmup import is_ready, rewarm
+from utils import startup
 from utils.auth import check_api_key
+from utils.serialize import Projector, dumps, json_response, parse_projection
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+
 # ./data/test_data.pkl (프로젝트 루트 기준)
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 TEST_DATA_PATH = PROJECT_ROOT / "data" / "test_data.pkl"
@@ -206,6 +228,7 @@ def health():
     간단 헬스 체크:
     - Flask 앱 살아있는지
     - 모델 버전은 뭔지
+    - 스케줄러 lane 별 대기/처리/버림 건수
     """
     try:
         version = get_model_version()
@@ -214,6 +237,12 @@ def health():
                 "ok": True,
                 "status": "alive",
                 "model_version": version,
+                "weights_version": get_weights_version(),
+                "ready": is_ready(),
+                "scheduler": get_scheduler().stats(),
+                "load": get_admission_controller().stats(
+                    queue_depth=get_scheduler().queue_depth()
+                ),
             }
         )
     except Exception as e:
@@ -255,6 +284,11 @@ def get_schema():
         "stop_at_stop": False,
         "task3_threshold": 0.5,
         "organism_hint": "Influenza A virus",
+        "early_exit": False,
+        "mc_samples": 0,
+        "priority": "routine",
+        "view": "standard",
+        "deadline_ms": 30000,
     }
 
     return jsonify(example)
@@ -263,19 +297,39 @@ def get_schema():
 # ---------------------------------------------------------------------------
 # 2. 모델 리로드
 # ---------------------------------------------------------------------------
-@api_bp.route("/reload_model", methods=["GET"])
+@api_bp.route("/startup", methods=["GET"])
+def startup_report():
+    """
+    기동 시간 리포트:
+    - app import / 모델 import / 모델 로드 각 구간 소요 시간 (ms)
+    - 모델은 첫 추론 요청 또는 명시적 warm-up 때 로드되므로, 아직이면 model_loaded=False
+    """
+    report = startup.report()
+    report["model_loaded"] = is_model_loaded()
+    report["model_version"] = get_model_version()
+    report["weights_version"] = get_weights_version()
+    return jsonify(report)
+
+
+@api_bp.route("/reload_model", methods=["GET", "POST"])
 def reload_model_api():
+    """모델 재로딩 (Django gateway 는 POST 로 replica 마다 순서대로 호출, GET 은 이전 호환용)"""
     auth_error = check_api_key(request)
     if auth_error is not None:
         return auth_error
 
     try:
         load_model()
+        # 이전 가중치로 계산한 attribution 은 버림
+        clear_explain_cache()
+        rewarm()
         return jsonify(
             {
                 "ok": True,
                 "message": "Model reloaded",
                 "model_version": get_model_version(),
+                "weights_version": get_weights_version(),
+                "ready": is_ready(),
             }
         )
     except Exception as e:
@@ -283,121 +337,8 @@ def reload_model_api():
 
 
 # ---------------------------------------------------------------------------
-# 3. 단일 item 추론 로직
+# 3. 단일 / 배치 추론 로직 → api/inference.py (explain / person / jobs 와 공유)
 # ---------------------------------------------------------------------------
-def _infer_single_item(payload: dict, default_params: dict, index: int):
-    """
-    단일 item에 대해:
-    1) DNA/RNA/Protein → 단백질 서열 변환
-    2) 모델 추론
-    3) Task3 Top-1 → UniProt/AlphaFold 3D 조회
-    """
-    sequence = payload.get("sequence", "")
-    if not sequence:
-        return {
-            "ok": False,
-            "index": index,
-            "id": payload.get("id"),
-            "error": "sequence 필드는 필수입니다.",
-        }
-
-    # item 개별 설정이 있으면 우선, 없으면 공통 기본값 사용
-    seq_type = payload.get("seq_type", default_params.get("seq_type", "auto"))
-    frame = int(payload.get("frame", default_params.get("frame", 0)))
-    stop_at_stop = bool(
-        payload.get("stop_at_stop", default_params.get("stop_at_stop", False))
-    )
-    task3_threshold = float(
-        payload.get("task3_threshold", default_params.get("task3_threshold", 0.5))
-    )
-    organism_hint = payload.get("organism_hint", default_params.get("organism_hint"))
-
-    # 1) DNA/RNA → Protein 변환
-    try:
-        protein_seq, trans_info = translate_to_protein(
-            raw_sequence=sequence,
-            seq_type=seq_type,
-            frame=frame,
-            stop_at_stop=stop_at_stop,
-        )
-    except Exception as e:
-        return {
-            "ok": False,
-            "index": index,
-            "id": payload.get("id"),
-            "error": f"서열 변환 실패: {e}",
-        }
-
-    if not protein_seq:
-        return {
-            "ok": False,
-            "index": index,
-            "id": payload.get("id"),
-            "error": "단백질 서열로 변환된 결과가 비어 있습니다.",
-            "translation_info": trans_info,
-        }
-
-    # 2) 모델 추론
-    try:
-        detector = get_detector()
-        pred = detector.predict(protein_seq, task3_threshold=task3_threshold)
-    except Exception as e:
-        return {
-            "ok": False,
-            "index": index,
-            "id": payload.get("id"),
-            "error": f"모델 추론 실패: {e}",
-        }
-
-    # 3) Task3 Top-1 protein → UniProt/AlphaFold 3D
-    task3 = pred.get("task3", {})
-    top_preds = task3.get("top_predictions", [])
-    structure_info = None
-    top1_name = None
-    top1_prob = None
-
-    if top_preds:
-        # top_predictions가 [(label, prob), ...] 형태라고 가정
-        top1_name, top1_prob = top_preds[0]
-        if top1_name and str(top1_name).lower() != "other":
-            try:
-                hits = find_protein_with_3d(
-                    protein_name=str(top1_name),
-                    organism=organism_hint,
-                    max_results=3,
-                    reviewed=True,
-                )
-            except Exception as e:
-                print(f"[WARN] find_protein_with_3d 실패: {e}")
-                hits = []
-
-            preferred = hits[0].get("preferred_3d") if hits else None
-            structure_info = {
-                "protein_name": top1_name,
-                "top1_probability": top1_prob,
-                "uniprot_hits": hits,
-                "preferred_3d": preferred,
-            }
-        else:
-            # Other → 빈 자료
-            structure_info = {
-                "protein_name": top1_name,
-                "top1_probability": top1_prob,
-                "uniprot_hits": [],
-                "preferred_3d": None,
-            }
-
-    return {
-        "ok": True,
-        "index": index,
-        "id": payload.get("id"),
-        "translation": {
-            "protein_sequence": protein_seq,
-            "info": trans_info,
-        },
-        "prediction": pred,
-        "task3_structure": structure_info,
-    }
 
 
 # ---------------------------------------------------------------------------
@@ -414,6 +355,25 @@ def infer():
           "items": [ {...}, {...}, ... ],
           "frame": 0, "task3_threshold": 0.5, ... (공통 기본값)
         }
+
+    - 스케줄링 (선택):
+        "priority": "stat" | "routine" | "bulk"   (기본 routine)
+        "deadline_ms": 30000                      (지나면 계산하지 않고 버림)
+
+    - 과부하 (추정 토큰 비용/대기열 한도 초과): 429 + Retry-After
+
+    - 불확실성 (선택, item 별 override 가능):
+        "mc_samples": 20    → prediction.uncertainty 에 task 별 평균 / 엔트로피 / 분산
+                              (backbone 1회 + dropout head 만 20회 배치 실행)
+                              0 ~ MC_DROPOUT_MAX_SAMPLES (기본 64), 벗어나면 400
+
+    - 응답 크기 (선택, body 또는 query):
+        "view": "full" | "standard" | "minimal"   (기본 full)
+        "fields": ["prediction.task1", ...]        (view 대신 경로 직접 지정)
+
+    - 스트리밍 (배치 모드 + Accept: application/x-ndjson):
+        micro-batch 가 끝날 때마다 item 결과를 한 줄씩 바로 전송
+        {"type": "meta", ...} → {"type": "result", ...} × N → {"type": "summary", ...}
     """
     auth_error = check_api_key(request)
     if auth_error is not None:
@@ -421,34 +381,150 @@ def infer():
 
     data = request.get_json(silent=True) or {}
     items = data.get("items")
+    if isinstance(items, list):
+        type_error = item_type_error(items)
+        if type_error:
+            return jsonify({"ok": False, "error": type_error}), 400
 
-    # 공통 기본값 (배치 시 각 item에서 override 가능)
-    default_params = {
-        "seq_type": data.get("seq_type", "auto"),
-        "frame": int(data.get("frame", 0)),
-        "stop_at_stop": bool(data.get("stop_at_stop", False)),
-        "task3_threshold": float(data.get("task3_threshold", 0.5)),
-        "organism_hint": data.get("organism_hint"),
-    }
+    priority, deadline, schedule_error = parse_schedule(data)
+    if schedule_error:
+        return jsonify({"ok": False, "error": schedule_error}), 400
 
+    fields, projection_error = parse_projection(
+        data.get("view") or request.args.get("view"),
+        data.get("fields") or request.args.get("fields"),
+    )
+    if projection_error:
+        return jsonify({"ok": False, "error": projection_error}), 400
+    project = Projector(fields)
+
+    try:
+        default_params = common_params(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"ok": False, "error": f"파라미터 형식 오류: {e}"}), 400
+
+    # === admission control: 과부하면 계산 전에 바로 429 ===
+    admission = get_admission_controller()
+    cost = estimate_tokens(
+        items if isinstance(items, list) else [data], default_params["seq_type"]
+    )
+    ticket, retry_after = admission.try_admit(
+        cost, get_scheduler().queue_depth(), priority
+    )
+    if ticket is None:
+        return overloaded_response(retry_after)
+
+    if isinstance(items, list) and _wants_ndjson():
+        # ticket 은 스트림이 끝날 때(또는 클라이언트가 끊을 때) 반납
+        return _stream_batch_response(
+            items, default_params, priority, deadline, project,
+            on_close=lambda: admission.release(ticket),
+        )
+
+    try:
+        return _predict_response(data, items, default_params, priority, deadline, project)
+    finally:
+        admission.release(ticket)
+
+
+def _wants_ndjson() -> bool:
+    return NDJSON_MIMETYPE in request.headers.get("Accept", "")
+
+
+def _ndjson_line(obj: dict) -> bytes:
+    return dumps(obj) + b"\n"
+
+
+def _stream_batch_response(items, default_params, priority, deadline, project, on_close):
+    """
+    배치 결과를 NDJSON 으로 스트리밍 (전체 결과를 메모리에 모으지 않음)
+    on_close 는 정확히 1번 실행: 스트림이 끝날 때, 또는 generator 가 시작되기 전에
+    클라이언트가 끊어도 WSGI 서버가 response 를 close 할 때 (call_on_close)
+    """
+    closed = threading.Lock()
+
+    def close_once():
+        if closed.acquire(blocking=False):
+            on_close()
+
+    def generate():
+        started = time.monotonic()
+        summary = {}
+        count = 0
+        try:
+            yield _ndjson_line(
+                {
+                    "type": "meta",
+                    "ok": True,
+                    "batch": True,
+                    "model_version": get_model_version(),
+                    "priority": priority,
+                    "total_items": len(items),
+                }
+            )
+            for res in iter_batch(items, default_params, priority, deadline, summary):
+                count += 1
+                yield _ndjson_line({"type": "result", **project(res)})
+            yield _ndjson_line(
+                {
+                    "type": "summary",
+                    "ok": True,
+                    "model_version": get_model_version(),
+                    "result_count": count,
+                    "dedup": summary.get("dedup"),
+                    "pipeline": summary.get("pipeline"),
+                    "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+                }
+            )
+        finally:
+            # 다 보냈으면 response close 를 기다리지 않고 바로 반납
+            close_once()
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE,
+        # nginx 등 앞단 프록시가 버퍼링하지 않도록
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
+    response.call_on_close(close_once)
+    return response
+
+
+def _predict_response(
+    data: dict,
+    items,
+    default_params: dict,
+    priority: str,
+    deadline,
+    project: Projector,
+):
     # === 배치 모드 ===
     if isinstance(items, list):
-        results = []
-        for idx, item in enumerate(items):
-            res = _infer_single_item(item or {}, default_params, index=idx)
-            results.append(res)
+        summary = {}
+        results, dedup = infer_batch(items, default_params, priority, deadline, summary)
 
-        return jsonify(
+        return json_response(
             {
                 "ok": True,
                 "batch": True,
                 "model_version": get_model_version(),
-                "results": results,
+                "priority": priority,
+                "dedup": dedup,
+                "pipeline": summary.get("pipeline"),
+                "results": [project(res) for res in results],
             }
         )
 
     # === 단일 모드 ===
-    res = _infer_single_item(data, default_params, index=0)
+    future = get_scheduler().submit(
+        lambda: infer_single_item(data, default_params, index=0),
+        priority=priority,
+        deadline=deadline,
+    )
+    try:
+        res = future.result()
+    except DeadlineExceeded as e:
+        return jsonify({"ok": False, "error": str(e), "deadline_exceeded": True}), 504
 
     if not res.get("ok"):
         err = res.get("error", "")
@@ -458,14 +534,16 @@ def infer():
             body["translation_info"] = res["translation_info"]
         return jsonify(body), status
 
-    return jsonify(
-        {
-            "ok": True,
-            "model_version": get_model_version(),
-            "translation": res["translation"],
-            "prediction": res["prediction"],
-            "task3_structure": res["task3_structure"],
-        }
+    return json_response(
+        project(
+            {
+                "ok": True,
+                "model_version": get_model_version(),
+                "translation": res["translation"],
+                "prediction": res["prediction"],
+                "task3_structure": res["task3_structure"],
+            }
+        )
     )
 
 
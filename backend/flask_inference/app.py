@@ -1,9 +1,19 @@
 # app.py
-from flask import Flask, jsonify
-from flask_cors import CORS
+from utils import startup  # 가장 먼저 import → 기동 시각 기준점
 
-from api.routes import api_bp
-from ml.model import load_model, get_model_version
+with startup.timed("import_app"):
+    from flask import Flask, jsonify
+    from flask_cors import CORS
+
+    from api.explain import explain_bp
+    from api.jobs import jobs_bp, get_job_pool
+    from api.person import person_bp
+    from api.routes import api_bp
+    from ml.registry import get_model_version, get_weights_version
+    from ml.warmup import readiness, start_warmup
+
+# torch / transformers 는 여기서 import 하지 않음
+#   → 모델은 warm-up thread 또는 첫 추론 요청 시 로드
 
 
 def create_app() -> Flask:
@@ -12,6 +22,12 @@ def create_app() -> Flask:
 
     # Blueprint 등록
     app.register_blueprint(api_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(explain_bp)
+    app.register_blueprint(person_bp)
+
+    # 비동기 작업 worker 시작 (재시작 전 남은 작업도 이어서 처리)
+    get_job_pool()
 
     @app.route("/health", methods=["GET"])
     def health():
@@ -23,17 +39,33 @@ def create_app() -> Flask:
             }
         )
 
+    @app.route("/ready", methods=["GET"])
+    def ready():
+        """
+        readiness probe (/health 는 liveness 용)
+        - warm-up 이 끝나야 200, 그 전/실패 시 503
+        - 로드밸런서 / Django 프록시가 트래픽을 보내기 전에 확인
+        """
+        state = readiness()
+        # Django gateway 예측 캐시 key 에는 weights_version 을 씀 (재로딩으로 가중치가 바뀌면 달라짐)
+        state["model_version"] = get_model_version()
+        state["weights_version"] = get_weights_version()
+        return jsonify({"ok": state["ready"], **state}), (200 if state["ready"] else 503)
+
+    # 모델 로드 + 길이 구간별 warm-up (background thread, 프로세스당 1번)
+    start_warmup()
+
+    startup.mark("app_created")
     return app
 
 
+# 모듈 수준 app 인스턴스는 두지 않음: import 만으로 job worker / warm-up(모델 로드) 이 시작되지 않도록
+# gunicorn 은 factory 형식으로 실행 (deploy/systemd/gunicorn_flask.service: app:create_app())
+#   → worker 프로세스마다 fork 후 create_app() 이 호출되어 각자 worker / warm-up 을 시작
+
+
 if __name__ == "__main__":
     from config import PORT
 
-    # 시작 시 모델 한 번 로드
-    try:
-        load_model()
-    except Exception as e:
-        print(f"[WARN] 초기 모델 로드 실패: {e}")
-
-    app = create_app()
-    app.run(host="0.0.0.0", port=PORT, debug=True)
+    # 모델 로드 / warm-up 은 create_app() 에서 background 로 시작됨 (/ready 로 확인)
+    create_app().run(host="0.0.0.0", port=PORT, debug=True, use_reloader=False)
@@ -2,7 +2,6 @@
 import os
 from pathlib import Path
 
-import torch
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -19,5 +18,83 @@ API_KEY = os.getenv("API_KEY")
 # Flask 포트
 PORT = int(os.getenv("PORT", "9000"))
 
-# 디바이스
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# 디바이스 (비우면 모델 로드 시 자동 감지)
+#   torch import 가 무거우므로 config import 시점에는 계산하지 않음
+DEVICE = os.getenv("DEVICE") or None
+
+
+def get_device() -> str:
+    global DEVICE
+    if DEVICE is None:
+        import torch
+
+        DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+    return DEVICE
+
+
+# 추론 스케줄러 (우선순위 lane)
+#   - SCHEDULER_WORKERS: 모델 연산을 실행하는 worker thread 수
+#   - SCHEDULER_CHUNK_SIZE: 배치를 나누는 단위 (chunk 경계에서 stat 요청이 끼어듦)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "1"))
+SCHEDULER_CHUNK_SIZE = int(os.getenv("SCHEDULER_CHUNK_SIZE", "8"))
+
+# 배치 파이프라인 (전처리 / forward / 후처리 단계 겹쳐 실행)
+#   - PIPELINE_DEPTH: 미리 전처리 / forward 예약해 두는 micro-batch 수 (0 이면 순차 실행)
+PIPELINE_DEPTH = int(os.getenv("PIPELINE_DEPTH", "2"))
+
+# Admission control (과부하 시 429 + Retry-After 로 빠르게 거절)
+#   - ADMISSION_MAX_INFLIGHT_TOKENS: 동시에 처리 중일 수 있는 추정 토큰 수 (서열 길이 × 배치 크기)
+#   - ADMISSION_MAX_QUEUE_DEPTH: 스케줄러 대기열(chunk) 최대 깊이
+#   - ADMISSION_STAT_RESERVE: stat lane 에 추가로 허용하는 여유 비율
+#   - ADMISSION_MAX_SEQ_TOKENS: 서열 1개 비용 상한 (모델 max_seq_length)
+ADMISSION_MAX_INFLIGHT_TOKENS = int(os.getenv("ADMISSION_MAX_INFLIGHT_TOKENS", "65536"))
+ADMISSION_MAX_QUEUE_DEPTH = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "64"))
+ADMISSION_STAT_RESERVE = float(os.getenv("ADMISSION_STAT_RESERVE", "0.25"))
+ADMISSION_MAX_SEQ_TOKENS = int(os.getenv("ADMISSION_MAX_SEQ_TOKENS", "1024"))
+
+# 비동기 추론 작업 (POST /api/jobs)
+#   - JOB_DB_PATH: 작업 큐/결과를 저장하는 SQLite 파일
+#   - JOB_WORKERS: 작업을 처리하는 worker thread 수 (프로세스당)
+#   - JOB_RESULT_TTL: 완료된 작업 결과 보관 시간 (초)
+#   - JOB_MAX_ITEMS: 작업 1건당 최대 item 수
+#   - JOB_LEASE_SECONDS: 실행 중 작업의 점유 유지 시간 (chunk 마다 갱신, 만료되면 다른 worker 가 이어서 처리)
+#     → chunk 1개 처리 시간보다 충분히 길어야 함
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", str(BASE_DIR / "var" / "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "86400"))
+JOB_MAX_ITEMS = int(os.getenv("JOB_MAX_ITEMS", "5000"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+# 기동 warm-up (대표 길이 구간별 배치를 미리 돌린 뒤 /ready 가 200 을 반환)
+#   - WARMUP_ON_START: 0 이면 warm-up 없이 바로 ready (모델은 첫 요청 때 로드)
+#   - WARMUP_LENGTHS: 길이 구간 (아미노산 수, 쉼표 구분)
+#   - WARMUP_BATCH_SIZE: 구간별 배치 크기 (기본: SCHEDULER_CHUNK_SIZE)
+#   - WARMUP_ROUNDS: 구간별 반복 횟수
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1").lower() in ("1", "true", "yes")
+WARMUP_LENGTHS = [
+    int(x) for x in os.getenv("WARMUP_LENGTHS", "64,256,1024").split(",") if x.strip()
+]
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", str(SCHEDULER_CHUNK_SIZE)))
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "2"))
+
+# MC-dropout 불확실성 (요청의 mc_samples, 0 이면 끔)
+#   - MC_DROPOUT_MAX_SAMPLES: 요청당 허용하는 최대 샘플 수
+MC_DROPOUT_MAX_SAMPLES = int(os.getenv("MC_DROPOUT_MAX_SAMPLES", "64"))
+
+# 잔기 단위 attribution (POST /api/explain)
+#   - EXPLAIN_BATCH_SIZE: forward/backward 1회에 묶는 서열 수 (backward 메모리 때문에 작게)
+#   - EXPLAIN_CACHE_SIZE: (모델 버전, 서열 hash) 기준 LRU 캐시 항목 수 (0 이면 캐시 끔)
+#   - EXPLAIN_MAX_ITEMS: 요청당 최대 item 수
+EXPLAIN_BATCH_SIZE = int(os.getenv("EXPLAIN_BATCH_SIZE", "4"))
+EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", "2048"))
+EXPLAIN_MAX_ITEMS = int(os.getenv("EXPLAIN_MAX_ITEMS", "64"))
+
+# 사람 단위 추론 (POST /api/predict_person)
+#   - PERSON_MAX_SAMPLES: 한 사람당 최대 샘플 수 (전체가 forward 1회로 묶임)
+PERSON_MAX_SAMPLES = int(os.getenv("PERSON_MAX_SAMPLES", "64"))
+
+# 최적화 모드 회귀 검사 (python -m ml.evaluate)
+#   - EVAL_MIN_AGREEMENT: baseline 과의 task 별 예측 일치율 하한
+#   - EVAL_MAX_ACCURACY_DROP: baseline 대비 허용하는 정확도 / macro-F1 하락폭 (절대값)
+EVAL_MIN_AGREEMENT = float(os.getenv("EVAL_MIN_AGREEMENT", "0.99"))
+EVAL_MAX_ACCURACY_DROP = float(os.getenv("EVAL_MAX_ACCURACY_DROP", "0.005"))
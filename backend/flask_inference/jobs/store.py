@@ -0,0 +1,271 @@
+# jobs/store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            TEXT PRIMARY KEY,
+    status        TEXT NOT NULL,
+    priority      TEXT NOT NULL,
+    params        TEXT NOT NULL,
+    total         INTEGER NOT NULL,
+    completed     INTEGER NOT NULL DEFAULT 0,
+    failed        INTEGER NOT NULL DEFAULT 0,
+    model_version TEXT,
+    error         TEXT,
+    created_at    REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    expires_at    REAL,
+    owner         TEXT,
+    lease_expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs (expires_at);
+
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id  TEXT NOT NULL,
+    idx     INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    result  TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+# 이전 버전 DB 파일에 없는 컬럼 (ALTER TABLE 로 추가)
+_ADDED_COLUMNS = {
+    "owner": "TEXT",
+    "lease_expires_at": "REAL",
+}
+
+
+class JobStore:
+    """
+    SQLite 기반 추론 작업 큐 (로컬 durable queue)
+
+    - gunicorn worker 프로세스 여러 개가 같은 파일을 공유해도 되도록
+      작업 점유(claim)는 조건부 UPDATE 로 원자적으로 처리
+    - running 작업은 owner + lease (만료 시각) 를 가짐. 실행 중인 worker 가 chunk 마다 갱신하고
+      lease 가 지난 작업만 다시 대기열로 보냄 (다른 worker 가 살아서 실행 중인 작업은 건드리지 않음)
+    - item 결과는 chunk 단위로 바로 저장 → 실행 중에도 부분 결과 조회 가능
+    - 완료 후 ttl 초가 지나면 purge_expired() 에서 삭제
+    """
+
+    def __init__(self, path: str, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for name, column_type in _ADDED_COLUMNS.items():
+            if name not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+                except sqlite3.OperationalError:
+                    # 다른 프로세스가 동시에 추가함
+                    pass
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # 생성 / 점유
+    # ------------------------------------------------------------------
+    def create(self, items: List[dict], params: dict, priority: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, status, priority, params, total, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, priority, json.dumps(params), len(items), now),
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, idx, payload) VALUES (?, ?, ?)",
+                ((job_id, idx, json.dumps(item or {})) for idx, item in enumerate(items)),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def claim_next(self, owner: str, lease: float) -> Optional[Dict[str, Any]]:
+        """가장 오래된 queued 작업을 owner 의 running 으로 바꾸고 반환 (없으면 None)"""
+        conn = self._conn()
+        while True:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_expires_at = ?, "
+                "started_at = COALESCE(started_at, ?) "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, owner, now + lease, now, row["id"], QUEUED),
+            )
+            if cur.rowcount == 1:
+                return self.get(row["id"])
+            # 다른 프로세스가 먼저 가져감 → 다음 후보
+
+    def heartbeat(self, job_id: str, owner: str, lease: float) -> bool:
+        """lease 연장. False 면 점유를 잃었음 (취소 / 만료되어 다른 worker 가 가져감) → 실행 중단"""
+        cur = self._conn().execute(
+            "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND owner = ? AND status = ?",
+            (time.time() + lease, job_id, owner, RUNNING),
+        )
+        return cur.rowcount == 1
+
+    def requeue_expired(self) -> int:
+        """
+        lease 가 만료된 running 작업 (worker 가 죽었거나 멈춤) 을 다시 대기열로 (남은 item 부터 재개)
+        lease 가 없는 running 작업은 이전 버전에서 남은 것이므로 함께 처리
+        """
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, owner = NULL, lease_expires_at = NULL "
+            "WHERE status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+            (QUEUED, RUNNING, time.time()),
+        )
+        return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # item 처리
+    # ------------------------------------------------------------------
+    def pending_items(self, job_id: str, limit: int) -> List[Tuple[int, dict]]:
+        rows = self._conn().execute(
+            "SELECT idx, payload FROM job_items "
+            "WHERE job_id = ? AND result IS NULL ORDER BY idx LIMIT ?",
+            (job_id, limit),
+        ).fetchall()
+        return [(r["idx"], json.loads(r["payload"])) for r in rows]
+
+    def save_results(
+        self, job_id: str, results: List[Tuple[int, dict]], model_version: Optional[str]
+    ) -> int:
+        """
+        아직 결과가 없는 item 만 저장하고 실제로 저장한 건수만 completed / failed 에 더함
+        (같은 item 을 두 번 처리해도 집계가 total 을 넘지 않음) → 저장한 건수
+        """
+        saved = failed = 0
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for idx, res in results:
+                cur = conn.execute(
+                    "UPDATE job_items SET result = ? "
+                    "WHERE job_id = ? AND idx = ? AND result IS NULL",
+                    (json.dumps(res), job_id, idx),
+                )
+                if cur.rowcount == 1:
+                    saved += 1
+                    if not res.get("ok"):
+                        failed += 1
+            conn.execute(
+                "UPDATE jobs SET completed = completed + ?, failed = failed + ?, "
+                "model_version = ? WHERE id = ?",
+                (saved, failed, model_version, job_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return saved
+
+    def finish(
+        self, job_id: str, status: str, error: Optional[str] = None, owner: Optional[str] = None
+    ) -> bool:
+        """종료 처리. owner 를 주면 그 worker 가 점유 중일 때만"""
+        now = time.time()
+        sql = (
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, expires_at = ?, "
+            "owner = NULL, lease_expires_at = NULL "
+            "WHERE id = ? AND status NOT IN (?, ?, ?)"
+        )
+        args = [status, error, now, now + self.ttl, job_id, *FINISHED_STATES]
+        if owner is not None:
+            sql += " AND owner = ?"
+            args.append(owner)
+        return self._conn().execute(sql, args).rowcount == 1
+
+    def cancel(self, job_id: str) -> bool:
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ? "
+            "WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, now, now + self.ttl, job_id, QUEUED, RUNNING),
+        )
+        return cur.rowcount == 1
+
+    # ------------------------------------------------------------------
+    # 조회 / 정리
+    # ------------------------------------------------------------------
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[dict]:
+        """완료된 item 결과를 idx 순서로 offset/limit 페이지 조회"""
+        rows = self._conn().execute(
+            "SELECT result FROM job_items "
+            "WHERE job_id = ? AND result IS NOT NULL ORDER BY idx LIMIT ? OFFSET ?",
+            (job_id, limit, offset),
+        ).fetchall()
+        return [json.loads(r["result"]) for r in rows]
+
+    def purge_expired(self) -> int:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM job_items WHERE job_id IN "
+                "(SELECT id FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?)",
+                (now,),
+            )
+            cur = conn.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (now,),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+        ).fetchall()
+        return {r["status"]: r["n"] for r in rows}
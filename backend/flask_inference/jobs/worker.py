@@ -0,0 +1,123 @@
+# jobs/worker.py
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Callable, List, Optional, Tuple
+
+from jobs.store import DONE, FAILED, JobStore
+
+# run_batch(items, default_params, priority) -> (results, meta)
+RunBatch = Callable[[List[dict], dict, str], Tuple[List[dict], dict]]
+
+
+class JobWorkerPool:
+    """
+    JobStore 의 queued 작업을 가져와 chunk 단위로 추론하는 worker thread 풀
+
+    - chunk 마다 결과를 바로 저장 (부분 결과 조회 / 재시작 시 이어서 처리)
+    - chunk 사이마다 lease 갱신 (heartbeat) + 취소 / 점유 상실 여부 확인
+    - lease 가 만료된 작업 (죽은 worker 의 작업) 만 주기적으로 다시 대기열에 넣음
+    - 새 작업은 notify() 로 즉시 깨우고, 다른 프로세스가 넣은 작업은 poll_interval 마다 확인
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        run_batch: RunBatch,
+        model_version: Callable[[], Optional[str]],
+        workers: int = 1,
+        chunk_size: int = 8,
+        poll_interval: float = 1.0,
+        lease: float = 300.0,
+    ):
+        self.store = store
+        self.run_batch = run_batch
+        self.model_version = model_version
+        self.workers = max(1, int(workers))
+        self.chunk_size = max(1, int(chunk_size))
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._requeue_expired()
+            for i in range(self.workers):
+                t = threading.Thread(
+                    target=self._loop, name=f"inference-job-{i}", daemon=True
+                )
+                self._threads.append(t)
+                t.start()
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _owner() -> str:
+        # 점유자: 호스트 + 프로세스 + thread (gunicorn worker 여러 개가 같은 DB 를 공유)
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+    def _requeue_expired(self) -> None:
+        recovered = self.store.requeue_expired()
+        if recovered:
+            print(f"[Jobs] lease 가 만료된 작업 {recovered}개를 다시 대기열에 넣었습니다.")
+
+    def _loop(self) -> None:
+        owner = self._owner()
+        while True:
+            self._maybe_maintain()
+            job = self.store.claim_next(owner, self.lease)
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run_job(job, owner)
+
+    def _run_job(self, job: dict, owner: str) -> None:
+        job_id = job["id"]
+        try:
+            while True:
+                if not self.store.heartbeat(job_id, owner, self.lease):
+                    # 취소됐거나, lease 가 만료되어 다른 worker 가 가져감
+                    return
+
+                chunk = self.store.pending_items(job_id, self.chunk_size)
+                if not chunk:
+                    break
+
+                results, _ = self.run_batch(
+                    [item for _, item in chunk], job["params"], job["priority"]
+                )
+                # run_batch 의 index 는 chunk 기준 → 원래 item index 로 되돌림
+                self.store.save_results(
+                    job_id,
+                    [
+                        (idx, {**res, "index": idx})
+                        for (idx, _), res in zip(chunk, results)
+                    ],
+                    self.model_version(),
+                )
+
+            self.store.finish(job_id, DONE, owner=owner)
+        except Exception as e:
+            traceback.print_exc()
+            self.store.finish(job_id, FAILED, error=str(e), owner=owner)
+
+    def _maybe_maintain(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        try:
+            self._requeue_expired()
+            self.store.purge_expired()
+        except Exception as e:
+            print(f"[WARN] 만료 작업 정리 실패: {e}")
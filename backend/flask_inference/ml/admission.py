@@ -0,0 +1,145 @@
+# ml/admission.py
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from config import (
+    ADMISSION_MAX_INFLIGHT_TOKENS,
+    ADMISSION_MAX_QUEUE_DEPTH,
+    ADMISSION_MAX_SEQ_TOKENS,
+    ADMISSION_STAT_RESERVE,
+)
+
+# 처리량(token/s) 추정치가 아직 없을 때 Retry-After 계산에 쓰는 기본값
+_DEFAULT_TOKENS_PER_SEC = 2000.0
+_EWMA_ALPHA = 0.2
+
+
+def estimate_tokens(items: Iterable[dict], default_seq_type: str = "auto") -> int:
+    """
+    요청 비용 추정 (서열 길이 × 배치 크기)
+    - DNA/RNA 는 번역 후 길이(1/3)로 환산
+    - 모델 최대 길이(ADMISSION_MAX_SEQ_TOKENS)에서 잘림
+    """
+    total = 0
+    for item in items:
+        item = item or {}
+        seq = item.get("sequence")
+        if not isinstance(seq, str) or not seq:
+            continue
+        length = len(seq)
+        if item.get("seq_type", default_seq_type) in ("dna", "rna"):
+            length //= 3
+        total += min(length, ADMISSION_MAX_SEQ_TOKENS) + 2  # <cls>, <eos>
+    return total
+
+
+class Ticket:
+    __slots__ = ("tokens", "started_at")
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.started_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    토큰 비용 + 스케줄러 대기열 깊이 기반 admission control
+
+    - 처리 중 토큰(inflight) + 새 요청 비용이 한도를 넘거나
+      스케줄러 대기열이 한도를 넘으면 즉시 거절 (429 + Retry-After)
+    - stat lane 은 한도의 ADMISSION_STAT_RESERVE 만큼 추가 여유를 가짐
+    - 서버가 비어 있으면 한도보다 큰 요청도 1건은 받음 (큰 배치가 영원히 거절되는 것 방지)
+    - Retry-After 는 현재 inflight 토큰 / 최근 처리량(EWMA)으로 계산
+    """
+
+    def __init__(
+        self,
+        max_inflight_tokens: int,
+        max_queue_depth: int,
+        stat_reserve: float = 0.25,
+    ):
+        self.max_inflight_tokens = max(1, int(max_inflight_tokens))
+        self.max_queue_depth = max(1, int(max_queue_depth))
+        self.stat_reserve = max(0.0, float(stat_reserve))
+        self._lock = threading.Lock()
+        self._inflight_tokens = 0
+        self._inflight_requests = 0
+        self._tokens_per_sec: Optional[float] = None
+        self._admitted = 0
+        self._rejected = 0
+
+    def try_admit(self, tokens: int, queue_depth: int, priority: str = "routine"):
+        """(Ticket, None) 또는 (None, retry_after 초) 반환"""
+        limit = self.max_inflight_tokens
+        depth_limit = self.max_queue_depth
+        if priority == "stat":
+            limit = int(limit * (1 + self.stat_reserve))
+            depth_limit = int(depth_limit * (1 + self.stat_reserve))
+
+        with self._lock:
+            idle = self._inflight_requests == 0
+            over_tokens = self._inflight_tokens + tokens > limit
+            over_depth = queue_depth >= depth_limit
+            if not idle and (over_tokens or over_depth):
+                self._rejected += 1
+                return None, self._retry_after_locked()
+
+            self._inflight_tokens += tokens
+            self._inflight_requests += 1
+            self._admitted += 1
+            return Ticket(tokens), None
+
+    def release(self, ticket: Ticket) -> None:
+        elapsed = max(time.monotonic() - ticket.started_at, 1e-3)
+        with self._lock:
+            self._inflight_tokens -= ticket.tokens
+            self._inflight_requests -= 1
+            if ticket.tokens > 0:
+                rate = ticket.tokens / elapsed
+                if self._tokens_per_sec is None:
+                    self._tokens_per_sec = rate
+                else:
+                    self._tokens_per_sec = (
+                        _EWMA_ALPHA * rate + (1 - _EWMA_ALPHA) * self._tokens_per_sec
+                    )
+
+    def stats(self, queue_depth: int = 0) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "inflight_tokens": self._inflight_tokens,
+                "inflight_requests": self._inflight_requests,
+                "max_inflight_tokens": self.max_inflight_tokens,
+                "utilization": round(self._inflight_tokens / self.max_inflight_tokens, 4),
+                "queue_depth": queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "tokens_per_sec": (
+                    round(self._tokens_per_sec, 1) if self._tokens_per_sec else None
+                ),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "retry_after": self._retry_after_locked(),
+            }
+
+    def _retry_after_locked(self) -> int:
+        # 지금 처리 중인 토큰을 다 소화하는 데 걸리는 예상 시간 (초)
+        rate = self._tokens_per_sec or _DEFAULT_TOKENS_PER_SEC
+        return max(1, int(math.ceil(self._inflight_tokens / rate)))
+
+
+_CONTROLLER: Optional[AdmissionController] = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    global _CONTROLLER
+    if _CONTROLLER is None:
+        with _CONTROLLER_LOCK:
+            if _CONTROLLER is None:
+                _CONTROLLER = AdmissionController(
+                    max_inflight_tokens=ADMISSION_MAX_INFLIGHT_TOKENS,
+                    max_queue_depth=ADMISSION_MAX_QUEUE_DEPTH,
+                    stat_reserve=ADMISSION_STAT_RESERVE,
+                )
+    return _CONTROLLER
@@ -0,0 +1,406 @@
+# ml/early_exit.py
+"""
+Early-exit cascade (task1: Host vs Pathogen)
+
+ESM-2 중간 layer 의 CLS 임베딩 위에 가벼운 task1 head 를 붙이고,
+중간 head 의 confidence 가 layer 별 threshold 를 넘으면 그 layer 에서 추론을 멈춘다.
+못 넘으면 남은 layer 를 끝까지 실행하고 원래 3-task head 를 그대로 사용.
+
+사용법:
+    # 1) val_data.pkl 로 중간 head 학습 + threshold 보정 → <MODEL_DIR>/early_exit.pt
+    python -m ml.early_exit calibrate --layers 12,18,24 --target-agreement 0.995
+
+    # 2) test_data.pkl 로 비용/정확도 리포트 → <MODEL_DIR>/early_exit_report.json
+    python -m ml.early_exit report
+"""
+import argparse
+import json
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import torch
+import torch.nn as nn
+
+from config import BASE_DIR
+
+EARLY_EXIT_FILE = "early_exit.pt"
+REPORT_FILE = "early_exit_report.json"
+DEFAULT_LAYERS = (12, 18, 24)
+DEFAULT_TARGET_AGREEMENT = 0.995
+VAL_DATA_PATH = BASE_DIR / "data" / "val_data.pkl"
+TEST_DATA_PATH = BASE_DIR / "data" / "test_data.pkl"
+
+# threshold 후보 (max softmax 확률)
+_THRESHOLD_GRID = [0.5 + 0.005 * i for i in range(100)]
+
+
+class EarlyExitHeads(nn.Module):
+    """layer 번호 → Linear(hidden, task1 클래스 수)"""
+
+    def __init__(self, layers: Sequence[int], hidden_size: int, num_classes: int):
+        super().__init__()
+        self.layers = [int(l) for l in layers]
+        self.heads = nn.ModuleDict(
+            {str(l): nn.Linear(hidden_size, num_classes) for l in self.layers}
+        )
+
+    def forward(self, layer: int, cls: torch.Tensor) -> torch.Tensor:
+        return self.heads[str(layer)](cls)
+
+
+# ---------------------------------------------------------------------------
+# backbone 을 layer 단위로 나눠 실행
+# ---------------------------------------------------------------------------
+def _final_norm(backbone):
+    return getattr(backbone.encoder, "emb_layer_norm_after", None)
+
+
+def _cls(backbone, hidden: torch.Tensor) -> torch.Tensor:
+    """중간 layer 출력도 마지막 layer 와 같은 LayerNorm 을 거친 CLS 를 사용"""
+    norm = _final_norm(backbone)
+    if norm is not None:
+        hidden = norm(hidden)
+    return hidden[:, 0, :]
+
+
+def _embed(backbone, ids: torch.Tensor, mask: torch.Tensor):
+    hidden = backbone.embeddings(input_ids=ids, attention_mask=mask)
+    ext_mask = backbone.get_extended_attention_mask(mask, ids.shape)
+    return hidden, ext_mask
+
+
+def _run_layers(backbone, hidden, ext_mask, start: int, end: int) -> torch.Tensor:
+    for layer in backbone.encoder.layer[start:end]:
+        out = layer(hidden, attention_mask=ext_mask)
+        hidden = out[0] if isinstance(out, tuple) else out
+    return hidden
+
+
+def _num_layers(detector) -> int:
+    return len(detector.model.backbone.encoder.layer)
+
+
+# ---------------------------------------------------------------------------
+# 추론
+# ---------------------------------------------------------------------------
+class EarlyExitRunner:
+    """보정된 중간 head + threshold 로 cascade 추론"""
+
+    def __init__(self, detector, state: Dict[str, Any]):
+        self.detector = detector
+        self.layers: List[int] = sorted(int(l) for l in state["layers"])
+        self.thresholds: Dict[int, float] = {
+            int(k): float(v) for k, v in state["thresholds"].items()
+        }
+        backbone = detector.model.backbone
+        self.heads = EarlyExitHeads(
+            self.layers,
+            backbone.config.hidden_size,
+            detector.metadata["num_task1_classes"],
+        )
+        self.heads.load_state_dict(state["state_dict"])
+        self.heads.to(detector.device_t)
+        self.heads.eval()
+        self.num_layers = _num_layers(detector)
+
+    def predict_batch(
+        self, sequences: List[str], task3_threshold: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """
+        배치 cascade: exit layer 마다 confident 한 서열은 빼고 나머지만 다음 layer 로 진행.
+        - 일찍 끝난 서열: task1 만 (task2/task3 는 None)
+        - 끝까지 간 서열: 원래 모델과 같은 3-task 결과
+        """
+        det = self.detector
+        model = det.model
+        backbone = model.backbone
+        seqs, ids, mask = det.tokenize(sequences, padding="longest")
+        out: List[Optional[Dict[str, Any]]] = [None] * len(seqs)
+
+        with torch.no_grad():
+            hidden, ext_mask = _embed(backbone, ids, mask)
+            alive = torch.arange(len(seqs), device=ids.device)
+            done_layers = 0
+
+            for layer in self.layers:
+                hidden = _run_layers(backbone, hidden, ext_mask, done_layers, layer)
+                done_layers = layer
+
+                probs = torch.softmax(self.heads(layer, _cls(backbone, hidden)), dim=-1)
+                exit_mask = probs.max(dim=-1).values >= self.thresholds[layer]
+
+                for row in torch.nonzero(exit_mask).flatten().tolist():
+                    i = int(alive[row])
+                    out[i] = self._early_result(len(seqs[i]), probs[row], layer)
+
+                keep = ~exit_mask
+                if not bool(keep.any()):
+                    return out
+                alive, hidden, ext_mask = alive[keep], hidden[keep], ext_mask[keep]
+
+            hidden = _run_layers(backbone, hidden, ext_mask, done_layers, self.num_layers)
+            cls = _cls(backbone, hidden)
+            t1, t2, t3 = model.task1_head(cls), model.task2_head(cls), model.task3_head(cls)
+
+        for row, i in enumerate(alive.tolist()):
+            pred = det.format_prediction(
+                len(seqs[i]), t1[row], t2[row], t3[row], task3_threshold
+            )
+            pred["early_exit"] = {"exited": False, "layers_executed": self.num_layers}
+            out[i] = pred
+        return out
+
+    def _early_result(self, seq_len: int, probs: torch.Tensor, layer: int) -> Dict[str, Any]:
+        id2label = self.detector.task1_id2label
+        pred = int(torch.argmax(probs))
+        return {
+            "sequence_length": seq_len,
+            "task1": {
+                "prediction": id2label[pred],
+                "confidence": float(probs[pred].item()),
+                "probabilities": {
+                    id2label[i]: float(probs[i].item()) for i in range(probs.shape[0])
+                },
+            },
+            "task2": None,
+            "task3": None,
+            "early_exit": {"exited": True, "layers_executed": layer},
+        }
+
+
+_RUNNERS: Dict[int, Optional[EarlyExitRunner]] = {}
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_early_exit_runner(detector) -> Optional[EarlyExitRunner]:
+    """detector 별 runner (early_exit.pt 가 없으면 None)"""
+    key = id(detector)
+    if key not in _RUNNERS:
+        with _RUNNER_LOCK:
+            if key not in _RUNNERS:
+                path = os.path.join(detector.model_dir, EARLY_EXIT_FILE)
+                runner = None
+                if os.path.exists(path):
+                    state = torch.load(path, map_location=detector.device_t)
+                    runner = EarlyExitRunner(detector, state)
+                _RUNNERS.clear()  # 모델 리로드 시 이전 detector runner 정리
+                _RUNNERS[key] = runner
+    return _RUNNERS[key]
+
+
+# ---------------------------------------------------------------------------
+# 보정 / 리포트
+# ---------------------------------------------------------------------------
+def _load_pickle(path) -> List[dict]:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def collect_layer_outputs(
+    detector, sequences: List[str], layers: Sequence[int], batch_size: int = 8
+) -> Dict[str, Any]:
+    """
+    전체 모델을 1회 실행하면서
+    - 지정 layer 의 CLS 특징
+    - 원래 모델의 task1 예측
+    을 함께 수집 (길이순 정렬로 padding 최소화)
+    """
+    layers = sorted(int(l) for l in layers)
+    backbone = detector.model.backbone
+    n = len(sequences)
+    order = sorted(range(n), key=lambda i: len(sequences[i]))
+    feats = {l: [None] * n for l in layers}
+    full_pred = [0] * n
+
+    with torch.no_grad():
+        for start in range(0, n, batch_size):
+            idx = order[start: start + batch_size]
+            _, ids, mask = detector.tokenize([sequences[i] for i in idx], padding="longest")
+            out = backbone(input_ids=ids, attention_mask=mask, output_hidden_states=True)
+            # hidden_states[k] = k 번째 layer 출력 (마지막은 LayerNorm 적용 후)
+            for l in layers:
+                cls = _cls(backbone, out.hidden_states[l]).cpu()
+                for row, i in enumerate(idx):
+                    feats[l][i] = cls[row]
+            t1 = detector.model.task1_head(out.last_hidden_state[:, 0, :])
+            for row, i in enumerate(idx):
+                full_pred[i] = int(torch.argmax(t1[row]))
+
+    return {
+        "features": {l: torch.stack(feats[l]) for l in layers},
+        "full_pred": torch.tensor(full_pred),
+    }
+
+
+def _train_head(x: torch.Tensor, y: torch.Tensor, num_classes: int, epochs: int = 300):
+    head = nn.Linear(x.shape[1], num_classes)
+    opt = torch.optim.Adam(head.parameters(), lr=1e-3, weight_decay=1e-4)
+    loss_fn = nn.CrossEntropyLoss()
+    for _ in range(epochs):
+        opt.zero_grad()
+        loss = loss_fn(head(x), y)
+        loss.backward()
+        opt.step()
+    return head
+
+
+def _simulate(probs: Dict[int, torch.Tensor], thresholds: Dict[int, float], full_pred, num_layers):
+    """layer 별 head 확률로 cascade 를 재현 → (최종 예측, 실행 layer 수)"""
+    n = full_pred.shape[0]
+    final = full_pred.clone()
+    executed = torch.full((n,), num_layers, dtype=torch.long)
+    alive = torch.ones(n, dtype=torch.bool)
+    for layer in sorted(probs):
+        conf, pred = probs[layer].max(dim=-1)
+        exit_now = alive & (conf >= thresholds[layer])
+        final[exit_now] = pred[exit_now]
+        executed[exit_now] = layer
+        alive &= ~exit_now
+    return final, executed
+
+
+def calibrate(
+    detector,
+    layers: Sequence[int] = DEFAULT_LAYERS,
+    target_agreement: float = DEFAULT_TARGET_AGREEMENT,
+    data_path=VAL_DATA_PATH,
+) -> Dict[str, Any]:
+    data = _load_pickle(data_path)
+    seqs = [d["sequence"] for d in data]
+    labels = torch.tensor([int(d["host_pathogen_label"]) for d in data])
+    num_classes = detector.metadata["num_task1_classes"]
+    num_layers = _num_layers(detector)
+    layers = sorted(int(l) for l in layers if 0 < int(l) < num_layers)
+
+    collected = collect_layer_outputs(detector, seqs, layers)
+    full_pred = collected["full_pred"]
+
+    heads = EarlyExitHeads(layers, detector.model.backbone.config.hidden_size, num_classes)
+    probs = {}
+    with torch.enable_grad():
+        for l in layers:
+            trained = _train_head(collected["features"][l], labels, num_classes)
+            heads.heads[str(l)].load_state_dict(trained.state_dict())
+    with torch.no_grad():
+        for l in layers:
+            probs[l] = torch.softmax(heads(l, collected["features"][l]), dim=-1)
+
+    # 앞 layer 부터, 아직 남은 서열 중 exit 했을 때 원래 모델과의 일치율이
+    # target 이상이 되는 가장 낮은 threshold 선택 (없으면 exit 안 함 = 1.01)
+    thresholds: Dict[int, float] = {}
+    alive = torch.ones(len(seqs), dtype=torch.bool)
+    for l in layers:
+        conf, pred = probs[l].max(dim=-1)
+        chosen = 1.01
+        for t in _THRESHOLD_GRID:
+            sel = alive & (conf >= t)
+            if int(sel.sum()) == 0:
+                break
+            agree = float((pred[sel] == full_pred[sel]).float().mean())
+            if agree >= target_agreement:
+                chosen = t
+                break
+        thresholds[l] = chosen
+        alive &= ~(conf >= chosen)
+
+    final, executed = _simulate(probs, thresholds, full_pred, num_layers)
+    summary = _summary(final, executed, full_pred, labels, num_layers)
+
+    state = {
+        "layers": layers,
+        "thresholds": thresholds,
+        "state_dict": heads.state_dict(),
+        "model_name": detector.model_name,
+        "target_agreement": target_agreement,
+        "calibration": summary,
+        "created_at": time.time(),
+    }
+    torch.save(state, os.path.join(detector.model_dir, EARLY_EXIT_FILE))
+    return {"layers": layers, "thresholds": thresholds, "val": summary}
+
+
+def _summary(final, executed, full_pred, labels, num_layers) -> Dict[str, Any]:
+    n = int(full_pred.shape[0])
+    avg_layers = float(executed.float().mean())
+    exits = {
+        int(l): int((executed == l).sum()) for l in torch.unique(executed).tolist()
+    }
+    return {
+        "num_samples": n,
+        "avg_layers_executed": round(avg_layers, 3),
+        "compute_saving": round(1 - avg_layers / num_layers, 4),
+        "exit_counts": exits,
+        "disagreement_rate": round(float((final != full_pred).float().mean()), 5),
+        "accuracy_full": round(float((full_pred == labels).float().mean()), 5),
+        "accuracy_early_exit": round(float((final == labels).float().mean()), 5),
+    }
+
+
+def report(detector, data_path=TEST_DATA_PATH) -> Dict[str, Any]:
+    """
+    test 셋 비용/정확도 리포트.
+    layer 출력은 결정적이므로 전체 모델 1회 실행 결과로 cascade 를 정확히 재현한다.
+    """
+    path = os.path.join(detector.model_dir, EARLY_EXIT_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{EARLY_EXIT_FILE} not found. 먼저 calibrate 를 실행하세요.")
+    state = torch.load(path, map_location=detector.device_t)
+    runner = EarlyExitRunner(detector, state)
+
+    data = _load_pickle(data_path)
+    seqs = [d["sequence"] for d in data]
+    labels = torch.tensor([int(d["host_pathogen_label"]) for d in data])
+
+    collected = collect_layer_outputs(detector, seqs, runner.layers)
+    with torch.no_grad():
+        probs = {
+            l: torch.softmax(
+                runner.heads(l, collected["features"][l].to(detector.device_t)), dim=-1
+            ).cpu()
+            for l in runner.layers
+        }
+    final, executed = _simulate(
+        probs, runner.thresholds, collected["full_pred"], runner.num_layers
+    )
+    result = {
+        "layers": runner.layers,
+        "thresholds": runner.thresholds,
+        "num_layers": runner.num_layers,
+        "test": _summary(final, executed, collected["full_pred"], labels, runner.num_layers),
+    }
+    with open(os.path.join(detector.model_dir, REPORT_FILE), "w") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def main(argv=None) -> None:
+    from ml.registry import get_detector
+
+    parser = argparse.ArgumentParser(description="Early-exit cascade 보정/리포트")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_cal = sub.add_parser("calibrate", help="val_data.pkl 로 중간 head 학습 + threshold 보정")
+    p_cal.add_argument("--layers", default=",".join(map(str, DEFAULT_LAYERS)))
+    p_cal.add_argument("--target-agreement", type=float, default=DEFAULT_TARGET_AGREEMENT)
+    p_cal.add_argument("--data", default=str(VAL_DATA_PATH))
+
+    p_rep = sub.add_parser("report", help="test_data.pkl 비용/정확도 리포트")
+    p_rep.add_argument("--data", default=str(TEST_DATA_PATH))
+
+    args = parser.parse_args(argv)
+    detector = get_detector()
+
+    if args.command == "calibrate":
+        layers = [int(x) for x in args.layers.split(",") if x.strip()]
+        result = calibrate(detector, layers, args.target_agreement, args.data)
+    else:
+        result = report(detector, args.data)
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+# ml/evaluate.py
+"""
+최적화 추론 모드 정확도 / 지연 회귀 검사 (regression gate)
+
+test_data.pkl 을 기준(baseline) 설정과 후보(candidate) 설정으로 각각 실행해
+- task 별 정확도 / macro-F1 (정답 라벨 기준)
+- baseline 과의 예측 일치율 (agreement)
+- 지연 (ms/서열, 배치 p50/p95) / 최대 메모리 차이 (CUDA 만, CPU 는 null)
+를 비교하고, 기준 미달이면 실패 리포트와 함께 exit code 1 로 종료한다.
+
+baseline = 서버 단건 경로와 같은 설정 (batch 1, max_length padding, fp32).
+baseline logits 는 <MODEL_DIR>/eval_cache/ 에 (모델, 데이터, 설정) 별로 캐시되므로
+후보만 바꿔 가며 반복 실행해도 baseline 은 1번만 계산한다.
+
+후보 모드:
+    dynamic_padding   : batch + longest padding (predict_batch / 배치 파이프라인 경로)
+    early_exit        : early_exit.pt 기반 cascade (task1 만 조기 종료, task2/3 는 끝까지 간 서열만 비교)
+    bf16 / fp16       : autocast 반정밀도 (fp16 은 CUDA 전용)
+    int8_dynamic      : Linear layer 동적 int8 양자화 (CPU 전용)
+
+사용법:
+    python -m ml.evaluate --candidates dynamic_padding,early_exit,int8_dynamic
+    python -m ml.evaluate --candidates bf16 --min-agreement 0.995 --max-accuracy-drop 0.002
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+from sklearn.metrics import accuracy_score, f1_score
+
+from config import EVAL_MAX_ACCURACY_DROP, EVAL_MIN_AGREEMENT
+from ml.early_exit import TEST_DATA_PATH, _load_pickle, get_early_exit_runner
+
+REPORT_FILE = "eval_report.json"
+CACHE_DIR = "eval_cache"
+DEFAULT_BATCH_SIZE = 8
+
+
+# ---------------------------------------------------------------------------
+# 실행 모드
+# ---------------------------------------------------------------------------
+def _peak_memory_mb(device: str) -> Optional[float]:
+    """
+    reset 이후 최대 할당 메모리 (CUDA 만).
+    CPU 는 None: ru_maxrss 는 프로세스 전체 최대값이라 후보별로 reset 할 수 없고
+    (baseline 뒤 후보는 모두 같은 값) 캐시된 baseline 은 다른 프로세스 값이라 비교가 안 됨
+    """
+    if device.startswith("cuda"):
+        return torch.cuda.max_memory_allocated() / 2 ** 20
+    return None
+
+
+def _reset_peak_memory(device: str) -> None:
+    if device.startswith("cuda"):
+        torch.cuda.reset_peak_memory_stats()
+
+
+def _sync(device: str) -> None:
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+
+
+def _run_model(
+    detector,
+    model: nn.Module,
+    sequences: List[str],
+    batch_size: int,
+    padding: str,
+    dtype: Optional[torch.dtype] = None,
+) -> Dict[str, Any]:
+    """전체 모델 실행 → logits (CPU fp32) + 배치별 소요 시간"""
+    device = detector.device
+    autocast = (
+        torch.autocast(device_type=detector.device_t.type, dtype=dtype)
+        if dtype is not None
+        else nullcontext()
+    )
+    t1s, t2s, t3s, batch_ms = [], [], [], []
+    with torch.no_grad(), autocast:
+        for start in range(0, len(sequences), batch_size):
+            chunk = sequences[start: start + batch_size]
+            _, ids, mask = detector.tokenize(chunk, padding=padding)
+            _sync(device)
+            began = time.perf_counter()
+            t1, t2, t3 = model(ids, mask)
+            _sync(device)
+            batch_ms.append((time.perf_counter() - began) * 1000)
+            t1s.append(t1.float().cpu())
+            t2s.append(t2.float().cpu())
+            t3s.append(t3.float().cpu())
+    return {
+        "t1": torch.cat(t1s),
+        "t2": torch.cat(t2s),
+        "t3": torch.cat(t3s),
+        "batch_ms": batch_ms,
+    }
+
+
+def _run_early_exit(detector, sequences: List[str], batch_size: int) -> Dict[str, Any]:
+    runner = get_early_exit_runner(detector)
+    if runner is None:
+        raise FileNotFoundError("early_exit.pt 가 없습니다. 먼저 python -m ml.early_exit calibrate")
+
+    t1_ids = detector.task1_label2id
+    t2_ids = detector.task2_label2id
+    n1, n2, n3 = (
+        len(t1_ids),
+        len(t2_ids),
+        len(detector.task3_label2id),
+    )
+    t1 = torch.zeros(len(sequences), n1)
+    t2 = torch.full((len(sequences), n2), float("nan"))
+    t3 = torch.full((len(sequences), n3), float("nan"))
+    batch_ms = []
+    layers = []
+    for start in range(0, len(sequences), batch_size):
+        chunk = sequences[start: start + batch_size]
+        _sync(detector.device)
+        began = time.perf_counter()
+        preds = runner.predict_batch(chunk)
+        _sync(detector.device)
+        batch_ms.append((time.perf_counter() - began) * 1000)
+        for offset, pred in enumerate(preds):
+            i = start + offset
+            # 확률을 logit 자리에 그대로 넣어도 argmax 비교에는 영향 없음
+            for label, p in pred["task1"]["probabilities"].items():
+                t1[i, t1_ids[label]] = p
+            if pred.get("task2"):
+                for label, p in pred["task2"]["probabilities"].items():
+                    t2[i, t2_ids[label]] = p
+            if pred.get("task3"):
+                t3[i] = torch.tensor(pred["task3"]["binary_preds"], dtype=torch.float) * 2 - 1
+            layers.append(pred["early_exit"]["layers_executed"])
+    return {
+        "t1": t1,
+        "t2": t2,
+        "t3": t3,
+        "batch_ms": batch_ms,
+        "extra": {"avg_layers_executed": round(float(np.mean(layers)), 3)},
+    }
+
+
+def _int8_model(detector) -> nn.Module:
+    if detector.device != "cpu":
+        raise RuntimeError("int8_dynamic 은 CPU 에서만 지원됩니다 (DEVICE=cpu 로 실행).")
+    return torch.quantization.quantize_dynamic(
+        copy.deepcopy(detector.model), {nn.Linear}, dtype=torch.qint8
+    )
+
+
+def _candidate_runners(batch_size: int) -> Dict[str, Callable]:
+    def half(dtype):
+        def run(det, seqs):
+            if dtype is torch.float16 and det.device == "cpu":
+                raise RuntimeError("fp16 autocast 는 CUDA 에서만 지원됩니다.")
+            return _run_model(det, det.model, seqs, batch_size, "longest", dtype)
+
+        return run
+
+    return {
+        "dynamic_padding": lambda det, seqs: _run_model(
+            det, det.model, seqs, batch_size, "longest"
+        ),
+        "early_exit": lambda det, seqs: _run_early_exit(det, seqs, batch_size),
+        "bf16": half(torch.bfloat16),
+        "fp16": half(torch.float16),
+        "int8_dynamic": lambda det, seqs: _run_model(
+            det, _int8_model(det), seqs, batch_size, "longest"
+        ),
+    }
+
+
+def _measure(detector, run: Callable, sequences: List[str]) -> Dict[str, Any]:
+    _reset_peak_memory(detector.device)
+    before = _peak_memory_mb(detector.device)
+    began = time.perf_counter()
+    out = run(detector, sequences)
+    total_s = time.perf_counter() - began
+    out["latency"] = {
+        "total_s": round(total_s, 3),
+        "ms_per_sequence": round(total_s * 1000 / max(1, len(sequences)), 3),
+        "batch_p50_ms": round(float(np.percentile(out["batch_ms"], 50)), 2),
+        "batch_p95_ms": round(float(np.percentile(out["batch_ms"], 95)), 2),
+    }
+    peak = _peak_memory_mb(detector.device)
+    if peak is None:
+        out["memory"] = {"peak_mb": None, "growth_mb": None, "note": "CPU 메모리는 측정하지 않음"}
+    else:
+        out["memory"] = {"peak_mb": round(peak, 1), "growth_mb": round(peak - before, 1)}
+    return out
+
+
+def _memory_delta(memory: Dict[str, Any], base_memory: Dict[str, Any]) -> Optional[float]:
+    """후보 - baseline 최대 메모리 (한쪽이라도 측정하지 않았으면 None)"""
+    if memory.get("peak_mb") is None or base_memory.get("peak_mb") is None:
+        return None
+    return round(memory["peak_mb"] - base_memory["peak_mb"], 1)
+
+
+# ---------------------------------------------------------------------------
+# baseline 캐시
+# ---------------------------------------------------------------------------
+def _baseline_cache_path(detector, data_path, limit: Optional[int]) -> str:
+    h = hashlib.sha256()
+    with open(data_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    state = os.path.join(detector.model_dir, "model.pt")
+    h.update(f"{os.path.getsize(state)}:{os.path.getmtime(state)}".encode())
+    h.update(f"{detector.max_length}:{detector.device}:{limit}".encode())
+    name = f"baseline_{h.hexdigest()[:16]}.pt"
+    return os.path.join(detector.model_dir, CACHE_DIR, name)
+
+
+def load_or_run_baseline(detector, sequences, data_path, limit, refresh: bool = False):
+    path = _baseline_cache_path(detector, data_path, limit)
+    if not refresh and os.path.exists(path):
+        cached = torch.load(path)
+        cached["cached"] = True
+        return cached
+
+    out = _measure(
+        detector,
+        lambda det, seqs: _run_model(det, det.model, seqs, 1, "max_length"),
+        sequences,
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save(out, path)
+    out["cached"] = False
+    return out
+
+
+# ---------------------------------------------------------------------------
+# 지표
+# ---------------------------------------------------------------------------
+def _task_metrics(out: Dict[str, Any], base: Dict[str, Any], labels: Dict[str, np.ndarray]):
+    metrics = {}
+    for task in ("t1", "t2"):
+        logits = out[task]
+        valid = ~torch.isnan(logits).any(dim=-1)
+        pred = logits.argmax(dim=-1).numpy()
+        base_pred = base[task].argmax(dim=-1).numpy()
+        v = valid.numpy()
+        y = labels[task]
+        metrics[task] = {
+            "coverage": round(float(v.mean()), 5),
+            "accuracy": round(float(accuracy_score(y[v], pred[v])), 5) if v.any() else None,
+            "macro_f1": (
+                round(float(f1_score(y[v], pred[v], average="macro", zero_division=0)), 5)
+                if v.any()
+                else None
+            ),
+            "agreement": round(float((pred[v] == base_pred[v]).mean()), 5) if v.any() else None,
+        }
+
+    logits = out["t3"]
+    valid = (~torch.isnan(logits).any(dim=-1)).numpy()
+    pred = (logits > 0).int().numpy()  # sigmoid(x) > 0.5
+    base_pred = (base["t3"] > 0).int().numpy()
+    y = labels["t3"]
+    metrics["t3"] = {
+        "coverage": round(float(valid.mean()), 5),
+        "accuracy": (
+            round(float((pred[valid] == y[valid]).all(axis=1).mean()), 5) if valid.any() else None
+        ),
+        "macro_f1": (
+            round(float(f1_score(y[valid], pred[valid], average="macro", zero_division=0)), 5)
+            if valid.any()
+            else None
+        ),
+        "agreement": (
+            round(float((pred[valid] == base_pred[valid]).all(axis=1).mean()), 5)
+            if valid.any()
+            else None
+        ),
+    }
+    return {"task1": metrics["t1"], "task2": metrics["t2"], "task3": metrics["t3"]}
+
+
+def _check(name, cand, base, min_agreement: float, max_drop: float) -> List[str]:
+    failures = []
+    for task, m in cand["metrics"].items():
+        b = base["metrics"][task]
+        if m["agreement"] is not None and m["agreement"] < min_agreement:
+            failures.append(
+                f"{name}: {task} agreement {m['agreement']:.4f} < {min_agreement:.4f}"
+            )
+        for key in ("accuracy", "macro_f1"):
+            if m[key] is None or b[key] is None:
+                continue
+            drop = b[key] - m[key]
+            if drop > max_drop:
+                failures.append(
+                    f"{name}: {task} {key} {m[key]:.4f} (baseline {b[key]:.4f}, "
+                    f"-{drop:.4f} > {max_drop:.4f})"
+                )
+    return failures
+
+
+def evaluate(
+    detector,
+    candidates: List[str],
+    data_path=TEST_DATA_PATH,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    min_agreement: float = EVAL_MIN_AGREEMENT,
+    max_accuracy_drop: float = EVAL_MAX_ACCURACY_DROP,
+    limit: Optional[int] = None,
+    refresh_baseline: bool = False,
+) -> Dict[str, Any]:
+    data = _load_pickle(data_path)
+    if limit:
+        data = data[:limit]
+    sequences = [d["sequence"] for d in data]
+    labels = {
+        "t1": np.array([int(d["host_pathogen_label"]) for d in data]),
+        "t2": np.array([int(d["pathogen_type_label"]) for d in data]),
+        "t3": np.array([list(d["protein_labels"]) for d in data]).astype(int),
+    }
+
+    base = load_or_run_baseline(detector, sequences, data_path, limit, refresh_baseline)
+    base["metrics"] = _task_metrics(base, base, labels)
+
+    runners = _candidate_runners(batch_size)
+    results = {}
+    failures: List[str] = []
+    for name in candidates:
+        if name not in runners:
+            failures.append(f"{name}: 알 수 없는 후보 모드 ({' / '.join(runners)})")
+            continue
+        try:
+            out = _measure(detector, runners[name], sequences)
+        except Exception as e:
+            failures.append(f"{name}: 실행 실패 ({e})")
+            results[name] = {"error": str(e)}
+            continue
+        out["metrics"] = _task_metrics(out, base, labels)
+        failures.extend(_check(name, out, base, min_agreement, max_accuracy_drop))
+        results[name] = {
+            "metrics": out["metrics"],
+            "latency": out["latency"],
+            "memory": out["memory"],
+            "speedup": round(
+                base["latency"]["ms_per_sequence"] / max(out["latency"]["ms_per_sequence"], 1e-9),
+                3,
+            ),
+            "memory_delta_mb": _memory_delta(out["memory"], base["memory"]),
+            **out.get("extra", {}),
+        }
+
+    report = {
+        "model_name": detector.model_name,
+        "device": detector.device,
+        "num_samples": len(sequences),
+        "batch_size": batch_size,
+        "thresholds": {
+            "min_agreement": min_agreement,
+            "max_accuracy_drop": max_accuracy_drop,
+        },
+        "baseline": {
+            "cached": base["cached"],
+            "metrics": base["metrics"],
+            "latency": base["latency"],
+            "memory": base["memory"],
+        },
+        "candidates": results,
+        "passed": not failures,
+        "failures": failures,
+    }
+    with open(os.path.join(detector.model_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def main(argv=None) -> None:
+    from ml.registry import get_detector
+
+    parser = argparse.ArgumentParser(description="최적화 추론 모드 정확도/지연 회귀 검사")
+    parser.add_argument("--candidates", default="dynamic_padding")
+    parser.add_argument("--data", default=str(TEST_DATA_PATH))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--min-agreement", type=float, default=EVAL_MIN_AGREEMENT)
+    parser.add_argument("--max-accuracy-drop", type=float, default=EVAL_MAX_ACCURACY_DROP)
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 N 개만 사용")
+    parser.add_argument("--refresh-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = evaluate(
+        get_detector(),
+        [c.strip() for c in args.candidates.split(",") if c.strip()],
+        data_path=args.data,
+        batch_size=args.batch_size,
+        min_agreement=args.min_agreement,
+        max_accuracy_drop=args.max_accuracy_drop,
+        limit=args.limit,
+        refresh_baseline=args.refresh_baseline,
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if not report["passed"]:
+        print("\n[FAIL] 회귀 검사 실패:", file=sys.stderr)
+        for line in report["failures"]:
+            print(f"  - {line}", file=sys.stderr)
+        sys.exit(1)
+    print("\n[PASS] 모든 후보가 기준을 통과했습니다.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# ml/explain.py
+"""
+잔기(residue) 단위 attribution (gradient × input)
+
+task1 / task2 의 예측 클래스 logit 을 embedding 출력에 대해 미분하고,
+grad · embedding 을 hidden 차원으로 합쳐 잔기별 기여도를 만든다.
+여러 서열을 한 번의 forward/backward 로 처리하고,
+결과는 (모델 버전, 서열 hash) 기준 LRU 캐시에 보관.
+
+응답 형식 (UI heat strip 용):
+    {"target": "Pathogen", "scale": 0.0123, "values": [-12, 40, 100, ...]}
+    values[i] = 잔기 i 의 기여도 / scale × 100 (정수, -100 ~ 100)
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# torch / ml.early_exit 는 explain_batch 안에서 import (앱 기동 시 ML 라이브러리 로드 방지)
+
+METHOD = "grad_x_input"
+
+
+def sequence_hash(sequence: str) -> str:
+    return hashlib.sha256(sequence.encode("utf-8")).hexdigest()
+
+
+class AttributionCache:
+    """(weights_version, method, sequence hash) → attribution 결과 (thread-safe LRU)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, int(max_entries))
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: tuple, value: Dict[str, Any]) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+def _quantize(values) -> Dict[str, Any]:
+    import torch
+
+    scale = float(values.abs().max()) if values.numel() else 0.0
+    if scale == 0.0:
+        return {"scale": 0.0, "values": [0] * values.numel()}
+    return {
+        "scale": scale,
+        "values": torch.round(values / scale * 100).to(torch.int16).tolist(),
+    }
+
+
+def explain_batch(detector, sequences: List[str]) -> List[Dict[str, Any]]:
+    """
+    서열 목록 → 서열별 task1 / task2 attribution (forward 1회 + backward 2회)
+    - 대상 클래스: 각 task 의 예측 클래스
+    - max_seq_length 를 넘는 서열은 잘린 부분까지만 값이 있음 (truncated=True)
+    """
+    import torch
+
+    from ml.early_exit import _cls, _embed, _num_layers, _run_layers
+
+    model = detector.model
+    backbone = model.backbone
+    seqs, ids, mask = detector.tokenize(sequences, padding="longest")
+
+    # 모델 파라미터의 .grad 는 건드리지 않도록 embedding 출력에 대해서만 미분
+    with torch.enable_grad():
+        hidden, ext_mask = _embed(backbone, ids, mask)
+        emb = hidden.detach().requires_grad_(True)
+        out = _run_layers(backbone, emb, ext_mask, 0, _num_layers(detector))
+        cls = _cls(backbone, out)
+        t1 = model.task1_head(cls)
+        t2 = model.task2_head(cls)
+
+        c1 = t1.argmax(dim=-1)
+        c2 = t2.argmax(dim=-1)
+        # 서열끼리는 독립이므로 선택 logit 합의 gradient = 서열별 gradient
+        (g1,) = torch.autograd.grad(t1.gather(1, c1[:, None]).sum(), emb, retain_graph=True)
+        (g2,) = torch.autograd.grad(t2.gather(1, c2[:, None]).sum(), emb)
+
+    emb = emb.detach()
+    a1 = (g1 * emb).sum(dim=-1).float().cpu()
+    a2 = (g2 * emb).sum(dim=-1).float().cpu()
+    p1 = torch.softmax(t1.detach().float(), dim=-1).cpu()
+    p2 = torch.softmax(t2.detach().float(), dim=-1).cpu()
+    lengths = mask.sum(dim=-1).cpu().tolist()
+
+    results = []
+    for i, seq in enumerate(seqs):
+        n = int(lengths[i]) - 2  # <cls>, <eos> 제외
+        k1, k2 = int(c1[i]), int(c2[i])
+        results.append(
+            {
+                "method": METHOD,
+                "sequence_length": len(seq),
+                "attributed_length": n,
+                "truncated": n < len(seq),
+                "task1": {
+                    "target": detector.task1_id2label[k1],
+                    "probability": float(p1[i, k1]),
+                    **_quantize(a1[i, 1: n + 1]),
+                },
+                "task2": {
+                    "target": detector.task2_id2label[k2],
+                    "probability": float(p2[i, k2]),
+                    **_quantize(a2[i, 1: n + 1]),
+                },
+            }
+        )
+    return results
@@ -1,16 +1,15 @@
 # ml/model.py
 import json
 import os
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from transformers import AutoTokenizer, AutoModel
 
-from config import MODEL_DIR, DEVICE
-
-_DETECTOR = None
-_MODEL_VERSION: Optional[str] = None
+from config import get_device
 
 
 class PathogenDetectionModel(nn.Module):
@@ -56,13 +55,38 @@ class PathogenDetectionModel(nn.Module):
             nn.Linear(512, num_task3_classes),
         )
 
-    def forward(self, input_ids, attention_mask):
+    def encode(self, input_ids, attention_mask):
+        """backbone → <cls> embedding [B, H]"""
         out = self.backbone(input_ids=input_ids, attention_mask=attention_mask)
-        cls = out.last_hidden_state[:, 0, :]
-        t1 = self.task1_head(cls)
-        t2 = self.task2_head(cls)
-        t3 = self.task3_head(cls)
-        return t1, t2, t3
+        return out.last_hidden_state[:, 0, :]
+
+    def heads(self, cls):
+        return self.task1_head(cls), self.task2_head(cls), self.task3_head(cls)
+
+    def mc_dropout_heads(self, cls, samples: int):
+        """
+        MC-dropout: <cls> embedding 을 samples 번 복제해 dropout 을 켠 head 를 한 번에 통과
+        반환 logits 모양: [samples, B, C]
+
+        model.train() 으로 전환하지 않고 F.dropout(training=True) 를 직접 적용
+        → 같은 모델을 쓰는 다른 thread 의 추론(eval)에는 영향 없음
+        """
+        batch = cls.shape[0]
+        rep = cls.unsqueeze(0).expand(samples, -1, -1).reshape(samples * batch, -1)
+
+        def run(head):
+            x = rep
+            for layer in head:
+                if isinstance(layer, nn.Dropout):
+                    x = F.dropout(x, p=layer.p, training=True)
+                else:
+                    x = layer(x)
+            return x.reshape(samples, batch, -1)
+
+        return run(self.task1_head), run(self.task2_head), run(self.task3_head)
+
+    def forward(self, input_ids, attention_mask):
+        return self.heads(self.encode(input_ids, attention_mask))
 
 
 class PathogenDetector:
@@ -70,7 +94,7 @@ class PathogenDetector:
 
     def __init__(self, model_dir: str, device: Optional[str] = None):
         self.model_dir = model_dir
-        self.device = device or DEVICE
+        self.device = device or get_device()
         self.device_t = torch.device(self.device)
 
         meta_path = os.path.join(model_dir, "metadata.json")
@@ -92,6 +116,8 @@ class PathogenDetector:
         self.task3_id2label = {v: k for k, v in self.task3_label2id.items()}
 
         self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        # fast tokenizer 는 여러 thread 가 동시에 쓰면 "Already borrowed" 오류가 날 수 있음
+        self._tokenize_lock = threading.Lock()
 
         freeze_layers = self.metadata.get("freeze_layers", 20)
         dropout = self.metadata.get("dropout", 0.2)
@@ -114,30 +140,127 @@ class PathogenDetector:
         self.model.to(self.device_t)
         self.model.eval()
 
-    def predict(self, sequence: str, task3_threshold: float = 0.5) -> Dict[str, Any]:
-        seq = sequence.upper().replace(" ", "").replace("\n", "")
-        enc = self.tokenizer(
-            seq,
-            max_length=self.max_length,
-            padding="max_length",
-            truncation=True,
-            return_tensors="pt",
-        )
+    @staticmethod
+    def normalize(sequence: str) -> str:
+        return sequence.upper().replace(" ", "").replace("\n", "")
+
+    def tokenize(self, sequences: List[str], padding: str = "max_length"):
+        """
+        서열 목록 → (정규화 서열, input_ids, attention_mask)
+        padding="longest" 면 배치 안에서 가장 긴 서열 길이까지만 padding
+        """
+        seqs = [self.normalize(s) for s in sequences]
+        with self._tokenize_lock:
+            enc = self.tokenizer(
+                seqs,
+                max_length=self.max_length,
+                padding=padding,
+                truncation=True,
+                return_tensors="pt",
+            )
         ids = enc["input_ids"].to(self.device_t)
         mask = enc["attention_mask"].to(self.device_t)
+        return seqs, ids, mask
 
+    def forward_logits(self, ids: torch.Tensor, mask: torch.Tensor):
+        """토크나이즈된 배치 1회 forward → CPU 로 옮긴 (task1, task2, task3) logits"""
         with torch.no_grad():
             t1_logits, t2_logits, t3_logits = self.model(ids, mask)
+        return t1_logits.float().cpu(), t2_logits.float().cpu(), t3_logits.float().cpu()
+
+    def forward_with_uncertainty(
+        self, ids: torch.Tensor, mask: torch.Tensor, mc_samples: List[int]
+    ):
+        """
+        backbone 1회 + (행별 mc_samples > 0 이면) MC-dropout head 배치 1회
+        반환: ((task1, task2, task3) logits, 행별 MC 확률 샘플 또는 None)
+          MC 샘플: (task1 softmax [S, C1], task2 softmax [S, C2], task3 sigmoid [S, C3])
+        """
+        mc: List[Optional[tuple]] = [None] * len(mc_samples)
+        with torch.no_grad():
+            cls = self.model.encode(ids, mask)
+            t1, t2, t3 = self.model.heads(cls)
+
+            # 같은 샘플 수끼리 묶어서 head 한 번에 통과
+            for samples in sorted({n for n in mc_samples if n > 0}):
+                rows = [i for i, n in enumerate(mc_samples) if n == samples]
+                m1, m2, m3 = self.model.mc_dropout_heads(cls[rows], samples)
+                p1 = torch.softmax(m1.float(), dim=-1).cpu()
+                p2 = torch.softmax(m2.float(), dim=-1).cpu()
+                p3 = torch.sigmoid(m3.float()).cpu()
+                for j, row in enumerate(rows):
+                    mc[row] = (p1[:, j], p2[:, j], p3[:, j])
+
+        return (t1.float().cpu(), t2.float().cpu(), t3.float().cpu()), mc
+
+    def summarize_uncertainty(self, mc) -> Dict[str, Any]:
+        """
+        MC-dropout 확률 샘플 → task 별 예측 평균 / 엔트로피 / 분산
+        - predictive_entropy: 평균 확률의 엔트로피 (전체 불확실성)
+        - mutual_information: predictive_entropy - 샘플별 엔트로피 평균 (모델 불확실성)
+        """
+        p1, p2, p3 = mc
+        eps = 1e-12
+
+        def categorical(probs: torch.Tensor, id2label: Dict[int, str]) -> Dict[str, Any]:
+            mean = probs.mean(dim=0)
+            var = probs.var(dim=0, unbiased=False)
+            entropy = float(-(mean * (mean + eps).log()).sum())
+            expected = float(-(probs * (probs + eps).log()).sum(dim=-1).mean())
+            return {
+                "mean": {id2label[i]: float(mean[i]) for i in range(mean.shape[0])},
+                "variance": {id2label[i]: float(var[i]) for i in range(var.shape[0])},
+                "predictive_entropy": entropy,
+                "mutual_information": max(0.0, entropy - expected),
+            }
+
+        def bernoulli(probs: torch.Tensor) -> Dict[str, Any]:
+            mean = probs.mean(dim=0)
+            var = probs.var(dim=0, unbiased=False)
+
+            def h(p):
+                return -(p * (p + eps).log() + (1 - p) * (1 - p + eps).log())
+
+            entropy = h(mean)
+            expected = h(probs).mean(dim=0)
+            return {
+                "mean": {self.task3_id2label[i]: float(mean[i]) for i in range(mean.shape[0])},
+                "variance": {self.task3_id2label[i]: float(var[i]) for i in range(var.shape[0])},
+                "predictive_entropy": {
+                    self.task3_id2label[i]: float(entropy[i]) for i in range(entropy.shape[0])
+                },
+                "mutual_information": {
+                    self.task3_id2label[i]: max(0.0, float(entropy[i] - expected[i]))
+                    for i in range(entropy.shape[0])
+                },
+            }
+
+        return {
+            "method": "mc_dropout",
+            "samples": int(p1.shape[0]),
+            "task1": categorical(p1, self.task1_id2label),
+            "task2": categorical(p2, self.task2_id2label),
+            "task3": bernoulli(p3),
+        }
 
-        t1_probs = torch.softmax(t1_logits, dim=1)[0]
+    def format_prediction(
+        self,
+        sequence_length: int,
+        t1_logits: torch.Tensor,
+        t2_logits: torch.Tensor,
+        t3_logits: torch.Tensor,
+        task3_threshold: float = 0.5,
+    ) -> Dict[str, Any]:
+        """서열 1개의 (1차원) logits → API 응답 형식"""
+        t1_probs = torch.softmax(t1_logits, dim=-1)
         t1_pred = int(torch.argmax(t1_probs))
         t1_label = self.task1_id2label[t1_pred]
 
-        t2_probs = torch.softmax(t2_logits, dim=1)[0]
+        t2_probs = torch.softmax(t2_logits, dim=-1)
         t2_pred = int(torch.argmax(t2_probs))
         t2_label = self.task2_id2label[t2_pred]
 
-        t3_probs = torch.sigmoid(t3_logits)[0]
+        t3_probs = torch.sigmoid(t3_logits)
         t3_bin = (t3_probs > task3_threshold).cpu().numpy().astype(int)
 
         top_idx = torch.argsort(t3_probs, descending=True)[:3].cpu().numpy().tolist()
@@ -146,7 +269,7 @@ class PathogenDetector:
         ]
 
         return {
-            "sequence_length": len(seq),
+            "sequence_length": sequence_length,
             "task1": {
                 "prediction": t1_label,
                 "confidence": float(t1_probs[t1_pred].item()),
@@ -170,23 +293,49 @@ class PathogenDetector:
             },
         }
 
+    def predict(
+        self, sequence: str, task3_threshold: float = 0.5, mc_samples: int = 0
+    ) -> Dict[str, Any]:
+        seqs, ids, mask = self.tokenize([sequence])
+
+        if mc_samples > 0:
+            (t1_logits, t2_logits, t3_logits), mc = self.forward_with_uncertainty(
+                ids, mask, [mc_samples]
+            )
+            pred = self.format_prediction(
+                len(seqs[0]), t1_logits[0], t2_logits[0], t3_logits[0], task3_threshold
+            )
+            pred["uncertainty"] = self.summarize_uncertainty(mc[0])
+            return pred
+
+        with torch.no_grad():
+            t1_logits, t2_logits, t3_logits = self.model(ids, mask)
+
+        return self.format_prediction(
+            len(seqs[0]), t1_logits[0], t2_logits[0], t3_logits[0], task3_threshold
+        )
 
-def load_model() -> None:
-    """전역 PathogenDetector 로드/리셋"""
-    global _DETECTOR, _MODEL_VERSION
-    print(f"[Model] Loading model from: {MODEL_DIR}")
-    detector = PathogenDetector(MODEL_DIR)
-    _DETECTOR = detector
-    _MODEL_VERSION = detector.metadata.get("model_name", "unknown")
-    print("[Model] Loaded successfully.")
+    def predict_batch(
+        self,
+        sequences: List[str],
+        task3_threshold: float = 0.5,
+        padding: str = "longest",
+    ) -> List[Dict[str, Any]]:
+        """여러 서열을 한 번의 forward 로 추론 (기본: 배치 내 최장 길이까지만 padding)"""
+        if not sequences:
+            return []
+        seqs, ids, mask = self.tokenize(sequences, padding=padding)
 
+        with torch.no_grad():
+            t1_logits, t2_logits, t3_logits = self.model(ids, mask)
 
-def get_detector() -> PathogenDetector:
-    global _DETECTOR
-    if _DETECTOR is None:
-        load_model()
-    return _DETECTOR
+        return [
+            self.format_prediction(
+                len(seq), t1_logits[i], t2_logits[i], t3_logits[i], task3_threshold
+            )
+            for i, seq in enumerate(seqs)
+        ]
 
 
-def get_model_version() -> Optional[str]:
-    return _MODEL_VERSION
+# 하위 호환: 예전처럼 ml.model 에서 바로 import 해도 동작
+from ml.registry import get_detector, get_model_version, load_model  # noqa: E402,F401
@@ -0,0 +1,121 @@
+# ml/pipeline.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+_DONE = object()
+_POLL_SEC = 0.1
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def run_pipeline(
+    chunks: Iterable[Any],
+    preprocess: Callable[[Any], Any],
+    submit: Callable[[Any], Future],
+    depth: int = 2,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[Tuple[Any, Future]]:
+    """
+    micro-batch 단위 3단계 파이프라인 (generator)
+
+        [전처리 thread] --Queue(depth)--> [forward: submit() → Future] --> [후처리: 호출 측]
+
+    - preprocess(chunk): 번역/토크나이즈 등 CPU 작업. 별도 thread 에서 최대 depth 개 앞서 실행
+    - submit(prepared): forward 를 예약하고 Future 반환 (보통 스케줄러 worker 에서 실행)
+      최대 depth 개까지 동시에 예약해 두므로, 호출 측이 chunk k 를 후처리하는 동안
+      chunk k+1 의 forward 가 진행됨
+    - 호출 측은 순서대로 (prepared, future) 를 받아 future.result() 후 후처리
+    - depth <= 0 이면 겹치지 않고 한 단계씩 순차 실행 (비교 측정용)
+
+    generator 를 중간에 닫으면 전처리 thread 를 멈추고 아직 시작 안 한 forward 는 취소.
+    stats 를 넘기면 preprocess_ms (전처리 thread 누적 시간) / chunks 를 채움.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("preprocess_ms", 0.0)
+    stats.setdefault("chunks", 0)
+
+    def timed_preprocess(chunk):
+        started = time.perf_counter()
+        try:
+            return preprocess(chunk)
+        finally:
+            stats["preprocess_ms"] += (time.perf_counter() - started) * 1000
+            stats["chunks"] += 1
+
+    if depth <= 0:
+        for chunk in chunks:
+            prepared = timed_preprocess(chunk)
+            future = submit(prepared)
+            future.exception()  # forward 가 끝날 때까지 대기 (순차 실행)
+            yield prepared, future
+        return
+
+    prepared_q: "queue.Queue" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                prepared_q.put(item, timeout=_POLL_SEC)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    return
+                try:
+                    prepared = timed_preprocess(chunk)
+                except BaseException as e:
+                    put(_Failure(e))
+                    return
+                if not put(prepared):
+                    return
+        finally:
+            put(_DONE)
+
+    thread = threading.Thread(target=producer, name="pipeline-preprocess", daemon=True)
+    thread.start()
+
+    window = []  # 예약된 (prepared, future), 도착 순서 유지
+    exhausted = False
+    try:
+        while True:
+            # forward 예약 창을 depth 개까지 채움
+            while not exhausted and len(window) < depth:
+                try:
+                    # 처리할 forward 가 남아 있으면 전처리를 기다리지 않음
+                    item = prepared_q.get(block=not window, timeout=None if not window else 0)
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    exhausted = True
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                window.append((item, submit(item)))
+
+            if not window:
+                if exhausted:
+                    return
+                continue
+
+            prepared, future = window.pop(0)
+            future.exception()  # 완료 대기 (예외는 호출 측이 result() 에서 처리)
+            yield prepared, future
+    finally:
+        stop.set()
+        for _, future in window:
+            future.cancel()
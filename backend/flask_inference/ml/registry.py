@@ -0,0 +1,77 @@
+# ml/registry.py
+"""
+전역 PathogenDetector 보관소.
+
+torch / transformers import 는 수 초가 걸리므로 이 모듈은 가볍게 유지하고,
+ml.model 은 모델이 처음 필요할 때(get_detector / load_model)만 import 한다.
+/health, /api/schema, /api/example_data 같은 엔드포인트는 ML 라이브러리를 전혀 로드하지 않음.
+"""
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from config import MODEL_DIR
+from utils import startup
+
+_DETECTOR = None
+_MODEL_VERSION: Optional[str] = None
+_WEIGHTS_VERSION: Optional[str] = None
+_LOAD_LOCK = threading.Lock()
+
+
+def _weights_version(detector) -> str:
+    """
+    실제 가중치 기준 버전: model_name@hash(model.pt / metadata.json 크기 + 수정 시각)
+    (ml/evaluate.py baseline 캐시와 같은 기준) → 재학습 후 재로딩하면 값이 바뀜
+    """
+    h = hashlib.sha256()
+    for name in ("model.pt", "metadata.json"):
+        path = os.path.join(detector.model_dir, name)
+        h.update(f"{name}:{os.path.getsize(path)}:{os.path.getmtime(path)}".encode())
+    return f"{detector.metadata.get('model_name', 'unknown')}@{h.hexdigest()[:12]}"
+
+
+def _load_locked() -> None:
+    # _LOAD_LOCK 을 잡은 상태에서만 호출
+    global _DETECTOR, _MODEL_VERSION, _WEIGHTS_VERSION
+    with startup.timed("import_ml"):
+        from ml.model import PathogenDetector
+
+    print(f"[Model] Loading model from: {MODEL_DIR}")
+    with startup.timed("model_load"):
+        detector = PathogenDetector(MODEL_DIR)
+    _DETECTOR = detector
+    _MODEL_VERSION = detector.metadata.get("model_name", "unknown")
+    _WEIGHTS_VERSION = _weights_version(detector)
+    startup.mark("model_ready")
+    print("[Model] Loaded successfully.")
+
+
+def load_model() -> None:
+    """전역 PathogenDetector 로드/리셋"""
+    with _LOAD_LOCK:
+        _load_locked()
+
+
+def get_detector():
+    """첫 호출 시 모델 로드 (동시 요청이 와도 1번만 로드)"""
+    if _DETECTOR is None:
+        with _LOAD_LOCK:
+            if _DETECTOR is None:
+                _load_locked()
+    return _DETECTOR
+
+
+def get_model_version() -> Optional[str]:
+    """backbone 이름 (가중치가 바뀌어도 같음 → 캐시 key 로 쓰지 말 것)"""
+    return _MODEL_VERSION
+
+
+def get_weights_version() -> Optional[str]:
+    """로드된 가중치 버전 (예측 / 설명 캐시, in-flight dedup key 용)"""
+    return _WEIGHTS_VERSION
+
+
+def is_model_loaded() -> bool:
+    return _DETECTOR is not None
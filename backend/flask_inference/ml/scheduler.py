@@ -0,0 +1,147 @@
+# ml/scheduler.py
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from config import SCHEDULER_WORKERS
+
+# 우선순위 lane (앞쪽일수록 먼저 처리)
+#   stat    : 응급 단건 조회
+#   routine : 일반 진료 요청 (기본값)
+#   bulk    : 대량 스크리닝 배치
+PRIORITY_LANES = ("stat", "routine", "bulk")
+DEFAULT_PRIORITY = "routine"
+_LANE_RANK = {name: rank for rank, name in enumerate(PRIORITY_LANES)}
+
+
+class DeadlineExceeded(Exception):
+    """클라이언트 deadline 이 지나 계산하지 않고 버린 작업"""
+
+
+class InferenceScheduler:
+    """
+    우선순위 lane + deadline 기반 추론 작업 스케줄러
+
+    - 모델 연산은 worker thread 에서만 실행 (요청 thread 는 Future 대기)
+    - 정렬 기준: lane → deadline 빠른 순 (EDF) → 도착 순
+    - 큰 배치는 호출 측에서 chunk 단위로 나눠 submit → chunk 경계마다 stat 요청이 끼어들 수 있음
+    - 꺼낸 시점에 deadline 이 지났으면 실행하지 않고 DeadlineExceeded 로 종료
+    """
+
+    def __init__(self, workers: int = 1):
+        self._workers = max(1, int(workers))
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._threads = []
+        self._running = 0
+        self._stats = {
+            "executed": {lane: 0 for lane in PRIORITY_LANES},
+            "dropped": {lane: 0 for lane in PRIORITY_LANES},
+        }
+
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        priority: str = DEFAULT_PRIORITY,
+        deadline: Optional[float] = None,
+    ) -> Future:
+        """
+        fn 을 예약하고 Future 반환.
+        deadline: time.monotonic() 기준 절대 시각 (None 이면 무제한)
+        """
+        if priority not in _LANE_RANK:
+            raise ValueError(f"알 수 없는 priority 입니다: {priority}")
+
+        future: Future = Future()
+        if deadline is not None and time.monotonic() >= deadline:
+            self._drop(future, priority)
+            return future
+
+        order = deadline if deadline is not None else float("inf")
+        with self._cond:
+            self._ensure_workers()
+            heapq.heappush(
+                self._heap,
+                (_LANE_RANK[priority], order, next(self._seq), priority, deadline, fn, future),
+            )
+            self._cond.notify()
+        return future
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            queued = {lane: 0 for lane in PRIORITY_LANES}
+            for entry in self._heap:
+                queued[entry[3]] += 1
+            return {
+                "workers": self._workers,
+                "running": self._running,
+                "queued": queued,
+                "queue_depth": len(self._heap),
+                "executed": dict(self._stats["executed"]),
+                "dropped": dict(self._stats["dropped"]),
+            }
+
+    # ------------------------------------------------------------------
+    def _ensure_workers(self) -> None:
+        # _cond 를 잡은 상태에서만 호출
+        while len(self._threads) < self._workers:
+            t = threading.Thread(
+                target=self._worker_loop,
+                name=f"inference-scheduler-{len(self._threads)}",
+                daemon=True,
+            )
+            self._threads.append(t)
+            t.start()
+
+    def _drop(self, future: Future, priority: str) -> None:
+        with self._cond:
+            self._stats["dropped"][priority] += 1
+        if future.set_running_or_notify_cancel():
+            future.set_exception(DeadlineExceeded("deadline 이 지나 처리하지 않았습니다."))
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, _, priority, deadline, fn, future = heapq.heappop(self._heap)
+
+            if deadline is not None and time.monotonic() >= deadline:
+                self._drop(future, priority)
+                continue
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self._cond:
+                self._running += 1
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._stats["executed"][priority] += 1
+
+
+_SCHEDULER: Optional[InferenceScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> InferenceScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                _SCHEDULER = InferenceScheduler(workers=SCHEDULER_WORKERS)
+    return _SCHEDULER
@@ -0,0 +1,76 @@
+# ml/singleflight.py
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    동일 key 에 대한 동시 실행을 하나로 합치는 헬퍼 (Go singleflight 와 동일한 개념)
+
+    - 먼저 들어온 호출(leader)만 fn() 을 실제로 실행
+    - 같은 key 로 실행 중에 들어온 호출은 leader 결과를 기다렸다가 그대로 공유
+    - 실행이 끝나면 key 는 바로 제거됨 (결과 캐시 아님)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(결과, 다른 요청과 공유했는지 여부) 반환"""
+        call, leader = self.claim(key)
+        if not leader:
+            return self.wait(call), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result, False
+
+    # ------------------------------------------------------------------
+    # do() 를 나눈 저수준 API: 실행을 다른 thread 에 예약하는 경우 (배치 micro-batch forward)
+    #   claim() 으로 leader 가 되면 반드시 finish() 를 호출해야 함 (안 하면 대기자가 영원히 기다림)
+    def claim(self, key: Hashable) -> Tuple[_Call, bool]:
+        """key 실행 권한 요청 → (call, leader 여부). leader 가 아니면 wait(call) 로 결과 공유"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        return call, leader
+
+    def finish(self, key: Hashable, call: _Call, result: Any = None, error: BaseException = None) -> None:
+        """leader 결과(또는 예외)를 대기자에게 전달하고 key 제거. 이미 끝난 call 이면 무시"""
+        with self._lock:
+            if call.event.is_set():
+                return
+            call.result = result
+            call.error = error
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            call.event.set()
+
+    @staticmethod
+    def wait(call: _Call) -> Any:
+        """leader 가 finish() 할 때까지 대기 후 결과 반환 (leader 가 실패했으면 같은 예외)"""
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,124 @@
+# ml/warmup.py
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import WARMUP_BATCH_SIZE, WARMUP_LENGTHS, WARMUP_ON_START, WARMUP_ROUNDS
+from ml.registry import get_detector
+from utils import startup
+
+_AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+# 상태: pending → warming → ready / failed
+_STATE: Dict[str, Any] = {
+    "status": "pending",
+    "enabled": WARMUP_ON_START,
+    "buckets": [],
+    "error": None,
+}
+_STATE_LOCK = threading.Lock()
+_STARTED = False
+
+
+def _synthetic_sequence(length: int, seed: int) -> str:
+    # 길이별로 항상 같은 서열 (재현 가능한 warm-up)
+    rng = random.Random(seed)
+    return "".join(rng.choice(_AMINO_ACIDS) for _ in range(length))
+
+
+def run_warmup(
+    lengths: Optional[List[int]] = None,
+    batch_size: int = WARMUP_BATCH_SIZE,
+    rounds: int = WARMUP_ROUNDS,
+) -> List[Dict[str, Any]]:
+    """
+    모델 로드 후 길이 구간별로 실제 추론 경로를 미리 실행
+    - 단건 predict (max_length padding) 1회
+    - 구간별 predict_batch (longest padding) × rounds
+    첫 요청이 메모리 할당 / thread pool 생성 / page fault 비용을 떠안지 않게 하는 목적
+    """
+    detector = get_detector()
+    lengths = lengths if lengths is not None else WARMUP_LENGTHS
+    batch_size = max(1, int(batch_size))
+    rounds = max(1, int(rounds))
+
+    buckets = []
+    with startup.timed("warmup_single"):
+        detector.predict(_synthetic_sequence(32, seed=0))
+
+    for length in lengths:
+        length = max(1, min(int(length), detector.max_length - 2))
+        batch = [_synthetic_sequence(length, seed=length + i) for i in range(batch_size)]
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            detector.predict_batch(batch)
+            timings.append(round((time.perf_counter() - started) * 1000, 1))
+        buckets.append({"length": length, "batch_size": batch_size, "ms": timings})
+        with _STATE_LOCK:
+            _STATE["buckets"] = list(buckets)
+    return buckets
+
+
+def _warmup_thread() -> None:
+    _set_status("warming")
+    try:
+        with startup.timed("warmup"):
+            run_warmup()
+    except Exception as e:
+        print(f"[WARN] warm-up 실패: {e}")
+        with _STATE_LOCK:
+            _STATE["error"] = str(e)
+        _set_status("failed")
+        return
+    startup.mark("ready")
+    _set_status("ready")
+
+
+def _set_status(status: str) -> None:
+    with _STATE_LOCK:
+        _STATE["status"] = status
+
+
+def start_warmup(background: bool = True) -> None:
+    """
+    프로세스당 1번만 실행.
+    WARMUP_ON_START=0 이면 바로 ready (모델은 첫 요청 때 지연 로드)
+    """
+    global _STARTED
+    with _STATE_LOCK:
+        if _STARTED:
+            return
+        _STARTED = True
+
+    if not WARMUP_ON_START:
+        startup.mark("ready")
+        _set_status("ready")
+        return
+
+    if background:
+        threading.Thread(target=_warmup_thread, name="model-warmup", daemon=True).start()
+    else:
+        _warmup_thread()
+
+
+def rewarm() -> None:
+    """모델 재로드 후 동기 warm-up (실패 상태에서 /reload_model 로 복구하는 경우 포함)"""
+    if not WARMUP_ON_START:
+        _set_status("ready")
+        return
+    _warmup_thread()
+
+
+def is_ready() -> bool:
+    with _STATE_LOCK:
+        return _STATE["status"] == "ready"
+
+
+def readiness() -> Dict[str, Any]:
+    with _STATE_LOCK:
+        state = dict(_STATE)
+        state["buckets"] = list(_STATE["buckets"])
+    state["ready"] = state["status"] == "ready"
+    return state
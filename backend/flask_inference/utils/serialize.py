@@ -0,0 +1,138 @@
+# utils/serialize.py
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 으로 동작
+    orjson = None
+    import json
+
+# ---------------------------------------------------------------------------
+# 응답 projection (view / fields)
+# ---------------------------------------------------------------------------
+# full     : 기존 응답 그대로 (기본값)
+# standard : 번역 서열/UniProt hit 목록/unknown_codons 제외, 확률 맵은 유지
+# minimal  : 대시보드용 예측 라벨 + confidence + 3D 구조 링크만
+VIEW_FULL = "full"
+_MINIMAL_FIELDS = [
+    "ok",
+    "index",
+    "id",
+    "error",
+    "deadline_exceeded",
+    "model_version",
+    "prediction.task1.prediction",
+    "prediction.task1.confidence",
+    "prediction.task2.prediction",
+    "prediction.task2.confidence",
+    "prediction.task3.top_predictions",
+    "prediction.early_exit",
+    "task3_structure.protein_name",
+    "task3_structure.preferred_3d",
+]
+VIEWS: Dict[str, Optional[List[str]]] = {
+    VIEW_FULL: None,
+    "standard": _MINIMAL_FIELDS
+    + [
+        "prediction.sequence_length",
+        "prediction.task1.probabilities",
+        "prediction.task2.probabilities",
+        "prediction.task3.threshold",
+        "prediction.task3.binary_preds",
+        "translation.info.used_type",
+        "translation.info.detected_type",
+        "translation.info.warnings",
+        "translation_info.warnings",
+        "task3_structure.top1_probability",
+        "prediction.uncertainty",
+    ],
+    "minimal": _MINIMAL_FIELDS,
+}
+
+# full 이 아닌 view 에서 float 반올림 자릿수
+_FLOAT_DIGITS = 4
+
+
+def parse_projection(view: Optional[str], fields: Any):
+    """
+    view / fields 파라미터 → (field 경로 목록 또는 None, error 메시지 또는 None)
+    fields 가 있으면 view 보다 우선 (리스트 또는 "a.b,c" 문자열)
+    """
+    if fields:
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+        if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+            return None, "fields는 문자열 리스트 또는 콤마로 구분된 문자열이어야 합니다."
+        # 실패 item 은 항상 에러를 알 수 있게
+        return sorted(set(fields) | {"ok", "index", "id", "error"}), None
+
+    view = view or VIEW_FULL
+    if view not in VIEWS:
+        return None, f"view는 {' / '.join(VIEWS)} 중 하나여야 합니다."
+    return VIEWS[view], None
+
+
+def _build_tree(paths: Iterable[str]) -> Dict[str, Any]:
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        parts = path.split(".")
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = True
+            else:
+                child = node.get(part)
+                if child is True:
+                    break  # 상위 경로가 이미 통째로 포함됨
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _round(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, _FLOAT_DIGITS)
+    if isinstance(value, dict):
+        return {k: _round(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round(v) for v in value]
+    return value
+
+
+def _apply(obj: Any, tree: Dict[str, Any]) -> Any:
+    if not isinstance(obj, dict):
+        return obj
+    out = {}
+    for key, sub in tree.items():
+        if key not in obj:
+            continue
+        value = obj[key]
+        out[key] = _round(value) if sub is True else _apply(value, sub)
+    return out
+
+
+class Projector:
+    """field 경로 목록으로 결과 dict 를 잘라내는 함수 객체 (경로 tree 는 1회만 생성)"""
+
+    def __init__(self, fields: Optional[List[str]]):
+        self.tree = _build_tree(fields) if fields else None
+
+    def __call__(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        if self.tree is None:
+            return obj
+        return _apply(obj, self.tree)
+
+
+# ---------------------------------------------------------------------------
+# 직렬화 (orjson 이 있으면 사용)
+# ---------------------------------------------------------------------------
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(obj: Any, status: int = 200, headers: Optional[dict] = None) -> Response:
+    """jsonify 대체: 공백 없는 compact JSON + orjson 가속"""
+    return Response(dumps(obj), status=status, headers=headers, mimetype="application/json")
@@ -0,0 +1,38 @@
+# utils/startup.py
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+# 이 모듈이 처음 import 된 시점 (app.py 가 가장 먼저 import → 프로세스 시작과 거의 같음)
+_T0 = time.perf_counter()
+_EVENTS: List[Dict[str, Any]] = []
+
+
+def _elapsed_ms() -> float:
+    return round((time.perf_counter() - _T0) * 1000, 1)
+
+
+def mark(name: str) -> None:
+    """시작 후 경과 시간과 함께 이벤트 기록 (예: app_imported, model_ready)"""
+    _EVENTS.append({"event": name, "at_ms": _elapsed_ms()})
+
+
+@contextmanager
+def timed(name: str):
+    """구간 소요 시간 기록 (예: import_ml, model_load)"""
+    started = time.perf_counter()
+    at = _elapsed_ms()
+    try:
+        yield
+    finally:
+        _EVENTS.append(
+            {
+                "event": name,
+                "at_ms": at,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+        )
+
+
+def report() -> Dict[str, Any]:
+    return {"uptime_ms": _elapsed_ms(), "events": list(_EVENTS)}